@@ -19,6 +19,13 @@ class Activity(Worker):
         self.name = name
         self.image = None
 
+    def warm_up(self):
+        """
+        Override this method to start loading anything the activity needs in the background,
+        it is called when the activity is highlighted in the activity selector.
+        """
+        return
+
     def __str__(self):
         return f"Activity({self.name})"
 
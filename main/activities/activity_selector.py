@@ -45,17 +45,19 @@ class ActivitySelector(Activity):
     Main activity that allows the user to select which activity to run.
     """
 
-    def __init__(self, activities: List[Activity], left_display: LeftDisplay, right_display: RightDisplay, button: Button):
+    def __init__(self, activities: List[Activity], left_display: LeftDisplay, right_display: RightDisplay, button: Button, warm_up: bool = True):
         super().__init__("activity_selector")
         self.activities = activities
         self.left_display = left_display
         self.right_display = right_display
         self.button = button
+        self.warm_up_activities = warm_up
 
         self.current_activity_index = 0
 
     def work(self):
         LOGGER.debug("Starting activity selector")
+        self.highlight_activity()
         while not self.is_stopped():
             self.left_display.display_number(self.current_activity_index + 1)
             self.right_display.image = self.activities[self.current_activity_index].image
@@ -74,5 +76,13 @@ class ActivitySelector(Activity):
                 else:
                     self.current_activity_index = (self.current_activity_index + 1) % len(self.activities)
                     LOGGER.debug("Changing activity to %s", self.activities[self.current_activity_index])
+                    self.highlight_activity()
 
             time.sleep(0.1)
+
+    def highlight_activity(self):
+        """
+        Warms up the currently selected activity, if enabled.
+        """
+        if self.warm_up_activities:
+            self.activities[self.current_activity_index].warm_up()
@@ -4,56 +4,95 @@ Author: Benjamin Dodd (1901386)
 """
 
 import time
-from os import path
-import cv2 as cv
-
 
 from main.activities.activity import Activity
 
 from main.threading.worker_manager import WorkerManager
 from main.display.circular_display import LeftDisplay, RightDisplay
+from main.display.asset_manager import AssetManager
+from main.display.animation import AnimationLibrary
+from main.display.display_pair import DisplayPair
 from main.camera.emotion_detection import EmotionDetection
-from main.camera.video_feed import VideoFeed, CAMERA_WIDTH
+from main.camera.perception_pipeline import PerceptionPipeline
+from main.camera.video_feed import CAMERA_WIDTH
 from main.motor.stepper_motor import StepperMotor
 
-IMAGE_PATH = path.join("res", "emotion")
+EMOTION_DETECTION_RATE = 10
+# Seconds without a change of emotion before the eyes blink
+BLINK_INTERVAL = 5
 
-IMAGES = {
-    "happy": cv.imread(path.join(IMAGE_PATH, "happy.png")),
-    "sad": cv.imread(path.join(IMAGE_PATH, "sad.png")),
-    "angry": cv.imread(path.join(IMAGE_PATH, "angry.png")),
-    "disgust": cv.imread(path.join(IMAGE_PATH, "disgust.png")),
-    "fear": cv.imread(path.join(IMAGE_PATH, "fear.png")),
-    "surprise": cv.imread(path.join(IMAGE_PATH, "surprise.png")),
-    "neutral": cv.imread(path.join(IMAGE_PATH, "neutral.png"))
-}
+EMOTIONS = ("happy", "sad", "angry", "disgust", "fear", "surprise", "neutral")
 
 class EmotionReactionActivity(Activity):
     """
     Class for displaying emotions on the circular display based on the current detected emotion.
     """
 
-    def __init__(self, left_display: LeftDisplay, right_display: RightDisplay, emotion_detection: EmotionDetection, video_feed: VideoFeed, stepper_motor: StepperMotor):
+    def __init__(self, left_display: LeftDisplay, right_display: RightDisplay, emotion_detection: EmotionDetection, perception_pipeline: PerceptionPipeline, stepper_motor: StepperMotor):
         super().__init__("EmotionReaction")
         self.left_display = left_display
         self.right_display = right_display
         self.emotion_detection = emotion_detection
-        self.video_feed = video_feed
-        self.left_display.image = IMAGES["neutral"]
-        self.right_display.image = IMAGES["neutral"]
+        self.perception_pipeline = perception_pipeline
+        self.assets = AssetManager()
+        self.animations = AnimationLibrary()
+        self.display_pair = DisplayPair(left_display, right_display)
+        self.shown_emotion = None
+        self.last_animation = time.monotonic()
+        self.show_emotion("neutral")
         self.stepper_motor = stepper_motor
 
+    def warm_up(self):
+        self.emotion_detection.warm_up()
+
     def work(self):
+        self.perception_pipeline.subscribe(self.name, self.emotion_detection.submit, max_rate=EMOTION_DETECTION_RATE)
+        try:
+            self.react()
+        finally:
+            self.perception_pipeline.unsubscribe(self.name)
+
+    def show_emotion(self, emotion: str):
+        """Shows the image of an emotion on both displays at the same time, crossfading from the emotion shown before.
+
+        Args:
+            emotion (str): The emotion to show, one of `EMOTIONS`.
+        """
+        if emotion == self.shown_emotion:
+            return
+        if self.shown_emotion is not None:
+            self.display_pair.play(
+                self.animations.crossfade(f"emotion/{self.shown_emotion}", f"emotion/{emotion}", self.left_display.diameter),
+                self.animations.crossfade(f"emotion/{self.shown_emotion}", f"emotion/{emotion}", self.right_display.diameter)
+            )
+        self.display_pair.submit(
+            self.assets.get(f"emotion/{emotion}", self.left_display.diameter),
+            self.assets.get(f"emotion/{emotion}", self.right_display.diameter)
+        )
+        self.shown_emotion = emotion
+        self.last_animation = time.monotonic()
+
+    def blink(self):
+        """
+        Blinks both eyes over the emotion shown.
+        """
+        self.display_pair.play(
+            self.animations.blink(f"emotion/{self.shown_emotion}", self.left_display.diameter),
+            self.animations.blink(f"emotion/{self.shown_emotion}", self.right_display.diameter)
+        )
+        self.last_animation = time.monotonic()
+
+    def react(self):
+        """
+        Reacts to the latest detection results until the activity is stopped.
+        """
+        # The displays may have shown other activities since the emotion was last shown
+        self.shown_emotion = None
         while not self.is_stopped():
-            capture = self.video_feed.capture()
-            self.emotion_detection.image = capture
             emotion = self.emotion_detection.current_emotion
-            if emotion is not None:
-                self.left_display.image = IMAGES[emotion]
-                self.right_display.image = IMAGES[emotion]
-            else:
-                self.left_display.image = IMAGES["neutral"]
-                self.right_display.image = IMAGES["neutral"]
+            self.show_emotion(emotion if emotion is not None else "neutral")
+            if time.monotonic() - self.last_animation > BLINK_INTERVAL:
+                self.blink()
             face_position = self.emotion_detection.face_position
             if face_position is not None:
                 face_center = face_position[0] + (face_position[2] / 2)
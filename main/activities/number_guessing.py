@@ -4,6 +4,7 @@ Author: Benjamin Dodd (1901386)
 """
 
 import time
+from functools import partial
 from random import randint
 
 from main.activities.activity import Activity
@@ -11,35 +12,59 @@ from main.activities.activity import Activity
 from main.threading.worker_manager import WorkerManager
 from main.display.circular_display import LeftDisplay, RightDisplay
 from main.camera.gesture_detection import GestureDetection
-from main.camera.video_feed import VideoFeed
+from main.camera.perception_pipeline import PerceptionPipeline
+
+GESTURE_DETECTION_RATE = 10
+PREVIEW_RATE = 15
+# The preview shares the SPI bus with the numbers on the left display
+PREVIEW_FPS = 10
 
 class NumberGuessingActivity(Activity):
     """
     Number guessing game where the user has to gesture with their fingers to guess the number.
     """
 
-    def __init__(self, left_display: LeftDisplay, right_display: RightDisplay, video_feed: VideoFeed, gesture_detection: GestureDetection):
+    def __init__(self, left_display: LeftDisplay, right_display: RightDisplay, perception_pipeline: PerceptionPipeline, gesture_detection: GestureDetection):
         super().__init__("NumberGuessing")
         self.left_display = left_display
         self.right_display = right_display
-        self.video_feed = video_feed
+        self.perception_pipeline = perception_pipeline
         self.gesture_detection = gesture_detection
 
         self.random_number = randint(1, 8)
 
+    def warm_up(self):
+        self.gesture_detection.warm_up()
+
     def work(self):
+        self.perception_pipeline.subscribe(self.name, self.gesture_detection.submit, max_rate=GESTURE_DETECTION_RATE)
+        self.perception_pipeline.subscribe(f"{self.name}Preview", partial(self.right_display.show_frame, layer="background"), max_rate=PREVIEW_RATE)
+        self.right_display.frame_limiter.max_fps = PREVIEW_FPS
+        self.right_display.frame_limiter.pacing = True
+        try:
+            self.play()
+        finally:
+            self.right_display.frame_limiter.pacing = False
+            self.right_display.frame_limiter.max_fps = None
+            self.right_display.compositor.clear()
+            self.perception_pipeline.unsubscribe(self.name)
+            self.perception_pipeline.unsubscribe(f"{self.name}Preview")
+
+    def play(self):
+        """
+        Plays the game with the latest detection results until the activity is stopped.
+        """
         while not self.is_stopped():
-            capture = self.video_feed.capture()
-            self.gesture_detection.image = capture
             finger_count = self.gesture_detection.finger_count
             correct_guess = finger_count == self.random_number
             colour = (0, 255, 0) if correct_guess else (0, 0, 255)
             if finger_count is not None:
                 self.left_display.display_number(finger_count, colour)
-                self.right_display.image = capture.image
             else:
                 self.left_display.display_number(0, colour)
-                self.right_display.image = capture.image
+            # Shown over the camera preview by the next frame
+            self.right_display.compositor.set_layer("overlay",
+                self.right_display.render_cache.render(str(finger_count or 0), colour, self.right_display.diameter))
 
             if correct_guess:
                 self.random_number = randint(1, 8)
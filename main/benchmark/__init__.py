@@ -0,0 +1,72 @@
+import logging
+import statistics
+from os import path, makedirs
+from typing import List
+
+import cv2 as cv
+
+from main.camera.frame_source import ImageDirectoryFrameSource
+
+LOGGER = logging.getLogger(__name__)
+
+RECORDED_FRAMES_PATH = path.join("data", "frames")
+
+def load_recorded_frames(count: int = 100) -> List[cv.Mat]:
+    """Loads the recorded benchmark frames, recording them from the camera first if none exist.
+
+    Args:
+        count (int, optional): Number of frames to record if none exist. Defaults to 100.
+
+    Returns:
+        List[cv.Mat]: Recorded BGR frames.
+    """
+    if not path.exists(RECORDED_FRAMES_PATH):
+        from main.camera.video_feed import VideoFeed
+
+        LOGGER.warning("No recorded frames found, recording %d frames to %s", count, RECORDED_FRAMES_PATH)
+        makedirs(RECORDED_FRAMES_PATH)
+        video_feed = VideoFeed()
+        for index in range(count):
+            frame = video_feed.capture()
+            if frame is not None:
+                cv.imwrite(path.join(RECORDED_FRAMES_PATH, f"{index:05d}.png"), frame.image)
+
+    source = ImageDirectoryFrameSource(RECORDED_FRAMES_PATH, realtime=False)
+    source.open()
+    frames = []
+    success, frame = source.read()
+    while success:
+        frames.append(frame)
+        success, frame = source.read()
+    source.release()
+    return frames
+
+def report(name: str, latencies: List[float]):
+    """Logs a summary of measured latencies.
+
+    Args:
+        name (str): Name of the measurement.
+        latencies (List[float]): Latencies in seconds.
+    """
+    if not latencies:
+        LOGGER.info("%s: no samples", name)
+        return
+    ordered = sorted(latencies)
+    LOGGER.info("%s: %d samples, mean %.2f ms, median %.2f ms, p95 %.2f ms, max %.2f ms",
+        name,
+        len(ordered),
+        statistics.mean(ordered) * 1000,
+        statistics.median(ordered) * 1000,
+        ordered[int(0.95 * (len(ordered) - 1))] * 1000,
+        ordered[-1] * 1000)
+
+def report_throughput(name: str, frames: int, seconds: float, unit: str = "frames"):
+    """Logs the throughput of a measurement.
+
+    Args:
+        name (str): Name of the measurement.
+        frames (int): Number of frames processed.
+        seconds (float): Total time taken in seconds.
+        unit (str, optional): What was processed. Defaults to "frames".
+    """
+    LOGGER.info("%s: %d %s in %.2f s, %.2f %s/s", name, frames, unit, seconds, frames / seconds if seconds > 0 else 0, unit)
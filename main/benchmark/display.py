@@ -0,0 +1,82 @@
+"""
+Benchmark of the bytes sent to a display for clock and finger count updates, and of RGB565 conversion, using the mock ST7789.
+Author: Benjamin Dodd (1901386)
+"""
+
+import time
+
+import numpy as np
+
+from main.benchmark import LOGGER, report
+
+from main.display.circular_display import LeftDisplay
+from main.threading.worker_manager import WorkerManager
+from main.threading.worker_thread import Worker
+from main.display.rgb565 import RGB565, RGB565Encoder
+from main.util import mock_st77789
+
+CLOCK_MINUTES = [f"{minute:02d}" for minute in range(60)]
+FINGER_COUNTS = [str(count) for count in range(9)]
+
+def transferred_bytes(display: LeftDisplay, texts, partial_updates: bool):
+    """Pushes each text to the display and returns the bytes the panel received.
+
+    Args:
+        display (LeftDisplay): The display to push to.
+        texts (list): Texts to display in order.
+        partial_updates (bool): Whether to send only the changed rectangles.
+
+    Returns:
+        int: Number of bytes transferred.
+    """
+    display.partial_updates = partial_updates
+    display.push(display.render_cache.render("", (0, 0, 0), display.diameter))
+    display.st7798.reset_statistics()
+    for text in texts:
+        display.push(display.render_cache.render(text, (255, 255, 255), display.diameter))
+    return display.st7798.bytes_transferred
+
+def conversion_latencies(display: LeftDisplay, frames: int = 200):
+    """Times converting camera-sized frames to RGB565 with the driver and with the vectorised encoder.
+
+    Args:
+        display (LeftDisplay): The display whose panel geometry to use.
+        frames (int, optional): Number of frames to convert. Defaults to 200.
+
+    Returns:
+        tuple: Driver and encoder conversion times in seconds.
+    """
+    images = np.random.default_rng(0).integers(0, 256, (8, display.diameter, display.diameter, 3), dtype=np.uint8)
+    encoder = RGB565Encoder()
+    out = np.empty((display.diameter, display.diameter), dtype=RGB565)
+    driver, encoded = [], []
+    for i in range(frames):
+        image = images[i % len(images)]
+        start = time.perf_counter()
+        display.st7798.image_to_data(image, display.rotation)
+        driver.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        encoder.encode(np.rot90(image, display.rotation // 90), out).tobytes()
+        encoded.append(time.perf_counter() - start)
+    return driver, encoded
+
+if __name__ == "__main__":
+    WORKER_MANAGER = WorkerManager()
+    Worker.set_manager(WORKER_MANAGER)
+
+    DISPLAY = LeftDisplay()
+    DISPLAY.st7798 = mock_st77789.ST7789(DISPLAY.diameter, DISPLAY.rotation, DISPLAY.port, DISPLAY.cs_pin,
+        DISPLAY.dc_pin, DISPLAY.backlight, DISPLAY.spi_speed_hz, DISPLAY.offset_left, DISPLAY.offset_top)
+
+    for NAME, TEXTS in (("Clock minutes", CLOCK_MINUTES), ("Finger counts", FINGER_COUNTS)):
+        FULL = transferred_bytes(DISPLAY, TEXTS, False)
+        PARTIAL = transferred_bytes(DISPLAY, TEXTS, True)
+        LOGGER.info("%s: full frames %d bytes/frame, dirty rectangles %d bytes/frame (%.1f%% of full)",
+            NAME, FULL // len(TEXTS), PARTIAL // len(TEXTS), 100 * PARTIAL / FULL)
+
+    DRIVER, ENCODER = conversion_latencies(DISPLAY)
+    report("Driver RGB565 conversion", DRIVER)
+    report("Vectorised RGB565 conversion", ENCODER)
+    LOGGER.info("%s", DISPLAY.push_time)
+
+    WORKER_MANAGER.stop_all_workers()
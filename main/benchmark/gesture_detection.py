@@ -0,0 +1,48 @@
+"""
+Benchmark comparing a MediaPipe Hands session per frame against the long-lived gesture engine.
+Author: Benjamin Dodd (1901386)
+"""
+
+import time
+
+import cv2 as cv
+
+from main.benchmark import LOGGER, load_recorded_frames, report
+
+from main.camera.gesture_detection import GestureEngine, count_fingers
+
+def per_frame_session(frames):
+    """
+    Measures the previous behaviour, where a new Hands session is created for every frame.
+    """
+    hands_solution = GestureEngine.load_hands_solution()
+    latencies = []
+    for frame in frames:
+        start = time.perf_counter()
+        with hands_solution.Hands(
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5) as hands:
+            count_fingers(hands.process(frame))
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def long_lived_session(frames):
+    """
+    Measures the gesture engine, which keeps one Hands session in tracking mode.
+    """
+    latencies = []
+    engine = GestureEngine()
+    try:
+        for frame in frames:
+            start = time.perf_counter()
+            engine.process(frame)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        engine.close()
+    return latencies
+
+if __name__ == "__main__":
+    FRAMES = [cv.cvtColor(frame, cv.COLOR_BGR2RGB) for frame in load_recorded_frames()]
+    LOGGER.info("Benchmarking gesture detection on %d frames", len(FRAMES))
+    report("Hands session per frame", per_frame_session(FRAMES))
+    report("Long-lived gesture engine", long_lived_session(FRAMES))
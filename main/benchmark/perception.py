@@ -0,0 +1,57 @@
+"""
+Benchmark of emotion and gesture detection throughput on replayed frames.
+Author: Benjamin Dodd (1901386)
+"""
+
+import time
+from os import path
+
+from main.benchmark import LOGGER, RECORDED_FRAMES_PATH, report, report_throughput
+
+from main.camera.frame_source import ImageDirectoryFrameSource, SyntheticFrameSource
+from main.camera.video_feed import VideoFeed
+from main.camera.emotion_detection import EmotionDetection
+from main.camera.gesture_detection import GestureEngine
+
+SYNTHETIC_FRAME_COUNT = 100
+
+def replay(video_feed: VideoFeed, analyse):
+    """Passes every frame of the video feed source to an analyser.
+
+    Args:
+        video_feed (VideoFeed): Video feed to read frames from.
+        analyse (function): Function called with each frame.
+
+    Returns:
+        tuple: Latency of each call in seconds and the total time taken.
+    """
+    latencies = []
+    video_feed.close()
+    start = time.perf_counter()
+    while True:
+        frame = video_feed.capture()
+        if frame is None or frame.stale:
+            break
+        frame_start = time.perf_counter()
+        analyse(frame)
+        latencies.append(time.perf_counter() - frame_start)
+    return latencies, time.perf_counter() - start
+
+if __name__ == "__main__":
+    VIDEO_FEED = VideoFeed()
+    if path.exists(RECORDED_FRAMES_PATH):
+        VIDEO_FEED.set_source(ImageDirectoryFrameSource(RECORDED_FRAMES_PATH, realtime=False))
+    else:
+        LOGGER.warning("No recorded frames found in %s, using synthetic frames", RECORDED_FRAMES_PATH)
+        VIDEO_FEED.set_source(SyntheticFrameSource(count=SYNTHETIC_FRAME_COUNT, realtime=False))
+
+    EmotionDetection.get_detector()
+    LATENCIES, SECONDS = replay(VIDEO_FEED, EmotionDetection.analyse)
+    report("Emotion detection", LATENCIES)
+    report_throughput("Emotion detection", len(LATENCIES), SECONDS)
+
+    ENGINE = GestureEngine()
+    LATENCIES, SECONDS = replay(VIDEO_FEED, lambda frame: ENGINE.process(frame.rgb))
+    ENGINE.close()
+    report("Gesture detection", LATENCIES)
+    report_throughput("Gesture detection", len(LATENCIES), SECONDS)
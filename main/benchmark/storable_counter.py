@@ -0,0 +1,70 @@
+"""
+Stress benchmark of StorableType and StorableCounter under concurrent increments and reads.
+Author: Benjamin Dodd (1901386)
+"""
+
+import tempfile
+import threading
+import time
+from os import path
+
+from main.benchmark import LOGGER, report_throughput
+
+from main.util.storable_type import StorableType, StorableCounter
+from main.util.variable_storage import JSONStorage
+from main.util.variable_store import VariableStore
+
+THREADS = 4
+INCREMENTS = 2000
+READS_PER_INCREMENT = 10
+
+def stress(counter, increment, threads: int = THREADS, increments: int = INCREMENTS):
+    """Increments and reads a counter from several threads at once.
+
+    Args:
+        counter (StorableType): The counter to stress.
+        increment (Callable[[], None]): Increments the counter once.
+        threads (int, optional): Number of threads. Defaults to THREADS.
+        increments (int, optional): Increments made by each thread. Defaults to INCREMENTS.
+
+    Returns:
+        tuple: Total time in seconds and the number of increments that were lost.
+    """
+    start_value = counter.value
+    barrier = threading.Barrier(threads)
+
+    def run():
+        barrier.wait()
+        for _ in range(increments):
+            increment()
+            for _ in range(READS_PER_INCREMENT):
+                _ = counter < 0
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    return elapsed, start_value + threads * increments - counter.value
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as DIRECTORY:
+        # The variable store is created here first, so the benchmark keys never reach the robot's store
+        VariableStore(JSONStorage(path.join(DIRECTORY, "variable_store.json")))
+
+        STORABLE = StorableType("benchmark_storable_type", 0)
+
+        def increment_storable():
+            STORABLE.value += 1
+
+        SECONDS, LOST = stress(STORABLE, increment_storable)
+        report_throughput("StorableType value += 1", THREADS * INCREMENTS, SECONDS, "increments")
+        LOGGER.info("StorableType lost %d of %d increments", LOST, THREADS * INCREMENTS)
+
+        COUNTER = StorableCounter("benchmark_storable_counter", 0)
+        SECONDS, LOST = stress(COUNTER, COUNTER.increment)
+        COUNTER.flush()
+        report_throughput("StorableCounter increment", THREADS * INCREMENTS, SECONDS, "increments")
+        LOGGER.info("StorableCounter lost %d of %d increments, %d contended", LOST, THREADS * INCREMENTS, COUNTER.contended)
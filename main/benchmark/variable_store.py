@@ -0,0 +1,71 @@
+"""
+Benchmark comparing the write throughput and recovery time of the variable store's storage engines.
+Author: Benjamin Dodd (1901386)
+"""
+
+import tempfile
+import time
+from os import path
+
+from main.benchmark import LOGGER, report, report_throughput
+
+from main.util.variable_storage import JSONStorage, JournalStorage
+
+UPDATES = 2000
+# Other variables in the store, rewritten by the JSON engine on every update
+VARIABLES = 50
+
+def write_through(storage, updates: int = UPDATES):
+    """Saves a step counter after every step, as the stepper motor did before write-behind.
+
+    Args:
+        storage (StorageEngine): The storage engine to write to.
+        updates (int, optional): Number of updates. Defaults to UPDATES.
+
+    Returns:
+        tuple: Latency of each write and the total time in seconds.
+    """
+    data = storage.load()
+    data.update({f"variable_{index}": index for index in range(VARIABLES)})
+    storage.write(dict(data), dict(data))
+    latencies = []
+    start = time.perf_counter()
+    for step in range(updates):
+        data["stepper_motor_steps"] = step
+        write_start = time.perf_counter()
+        storage.write(data, {"stepper_motor_steps": step})
+        latencies.append(time.perf_counter() - write_start)
+    return latencies, time.perf_counter() - start
+
+def recovery_time(create):
+    """Measures how long a storage engine takes to load what it saved.
+
+    Args:
+        create (Callable[[], StorageEngine]): Creates the storage engine.
+
+    Returns:
+        float: Load time in seconds.
+    """
+    storage = create()
+    start = time.perf_counter()
+    storage.load()
+    elapsed = time.perf_counter() - start
+    storage.close()
+    return elapsed
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as DIRECTORY:
+        SNAPSHOT_PATH = path.join(DIRECTORY, "variable_store.json")
+        JOURNAL_PATH = path.join(DIRECTORY, "variable_store.journal")
+        ENGINES = (
+            ("JSON rewrite", lambda: JSONStorage(SNAPSHOT_PATH)),
+            ("Journal", lambda: JournalStorage(SNAPSHOT_PATH, JOURNAL_PATH, sync=False)),
+            ("Journal with fsync", lambda: JournalStorage(SNAPSHOT_PATH, JOURNAL_PATH, sync=True)),
+        )
+        for NAME, CREATE in ENGINES:
+            STORAGE = CREATE()
+            LATENCIES, SECONDS = write_through(STORAGE)
+            STORAGE.close()
+            report(f"{NAME} write", LATENCIES)
+            report_throughput(f"{NAME} write", len(LATENCIES), SECONDS, "updates")
+            LOGGER.info("%s recovery: %.2f ms", NAME, recovery_time(CREATE) * 1000)
@@ -3,10 +3,11 @@ Emotion detection using OpenCV and SkiKit
 Author: Benjamin Dodd (1901386)
 """
 
+import queue
 import threading
-import cv2 as cv
+from typing import List
 
-from fer import FER
+import cv2 as cv
 
 from main.camera import LOGGER
 
@@ -14,18 +15,32 @@ from main.camera.video_feed import VideoFrame
 
 from main.threading.worker_manager import WorkerManager
 from main.threading.worker_thread import Worker
+from main.util.latest_queue import put_latest
+from main.util.startup_timer import StartupTimer
 
-DETECTOR = FER()
+# The FER detector is loaded on first use and shared between workers, so only
+# increase this if the underlying face detector and model are safe to call concurrently.
+WORKER_COUNT = 1
+QUEUE_SIZE = 2
+POLL_INTERVAL = 0.1
 
 class EmotionDetection:
     """
     Class for detecting emotions in a video frame.
+
+    Frames are placed on a bounded queue that is consumed by a fixed pool of
+    long-lived worker threads. When the queue is full the oldest frame is
+    dropped so the workers always analyse the most recent frames.
     """
 
     _lock = threading.Lock()
     _image = None
     _dominant_emotion = None
     _face_position = None
+    _faces = []
+
+    _detector = None
+    _detector_lock = threading.Lock()
 
     _instance = None
     _instance_lock = threading.Lock()
@@ -40,7 +55,15 @@ class EmotionDetection:
 
     def __init__(self):
         if not self._intitialized:
-            self.worker = None
+            self.workers: List[EmotionDetectionWorker] = []
+            self.frames = queue.Queue(maxsize=QUEUE_SIZE)
+            self._submit_lock = threading.Lock()
+            self._statistics_lock = threading.Lock()
+            self._frames_accepted = 0
+            self._frames_dropped = 0
+            self._frames_processed = 0
+            self._frames_skipped = 0
+            self._last_sequence = 0
             self._intitialized = True
 
     @property
@@ -56,14 +79,165 @@ class EmotionDetection:
         """
         Set the image to analyse.
         """
+        self.submit(frame)
+
+    def submit(self, frame: VideoFrame):
+        """Queues a frame for analysis by the worker pool.
+
+        Stale frames and frames that have already been submitted are skipped.
+
+        Args:
+            frame (VideoFrame): Frame to analyse.
+
+        Returns:
+            bool: True if the frame was queued, False if it was skipped.
+        """
+        self.start_workers()
+
+        with self._submit_lock:
+            if frame.stale or (frame.sequence and frame.sequence <= self._last_sequence):
+                with self._statistics_lock:
+                    self._frames_skipped += 1
+                return False
+            self._last_sequence = frame.sequence
+
+            with self._lock:
+                self._image = frame.image
+
+            dropped = put_latest(self.frames, frame)
+
+        with self._statistics_lock:
+            self._frames_dropped += dropped
+            self._frames_accepted += 1
+        return True
+
+    def start_workers(self):
+        """
+        Starts the worker pool, replacing any workers that have stopped.
+        """
+        with self._submit_lock:
+            self.workers = [worker for worker in self.workers if worker.is_alive() and not worker.is_stopped()]
+            while len(self.workers) < WORKER_COUNT:
+                worker = EmotionDetectionWorker(self)
+                worker.start()
+                self.workers.append(worker)
+
+    def stop_workers(self):
+        """
+        Stops the worker pool.
+        """
+        with self._submit_lock:
+            for worker in self.workers:
+                worker.stop()
+            self.workers = []
+
+    def record_processed(self):
+        """
+        Records that a worker has finished analysing a frame.
+        """
+        with self._statistics_lock:
+            self._frames_processed += 1
+
+    @property
+    def frames_accepted(self):
+        """
+        Get the number of frames that have been queued for analysis.
+        """
+        with self._statistics_lock:
+            return self._frames_accepted
+
+    @property
+    def frames_dropped(self):
+        """
+        Get the number of queued frames that were discarded before being analysed.
+        """
+        with self._statistics_lock:
+            return self._frames_dropped
+
+    @property
+    def frames_skipped(self):
+        """
+        Get the number of stale or duplicate frames that were not queued.
+        """
+        with self._statistics_lock:
+            return self._frames_skipped
+
+    @property
+    def frames_processed(self):
+        """
+        Get the number of frames that have been analysed.
+        """
+        with self._statistics_lock:
+            return self._frames_processed
+
+    @classmethod
+    def get_detector(cls):
+        """Gets the FER detector, loading TensorFlow and the model on first use.
+
+        Returns:
+            FER: The emotion detector.
+        """
+        if cls._detector is None:
+            with cls._detector_lock:
+                if cls._detector is None:
+                    startup_timer = StartupTimer()
+                    with startup_timer.measure("import fer"):
+                        from fer import FER
+                    with startup_timer.measure("load FER model"):
+                        cls._detector = FER()
+        return cls._detector
+
+    def warm_up(self):
+        """
+        Starts the worker pool in the background so the model is loaded before the first frame arrives.
+        """
+        self.start_workers()
+
+    @classmethod
+    def analyse(cls, frame: VideoFrame):
+        """Detects the faces in a frame and classifies the emotion of each face in a single pass.
+
+        Args:
+            frame (VideoFrame): Frame to analyse.
+
+        Returns:
+            list: A dictionary for each face with the face bounding box under `box`
+            and the score of every emotion under `emotions`.
+        """
+        detector = cls.get_detector()
+        face_rectangles = detector.find_faces(frame.gray, bgr=False)
+        if len(face_rectangles) == 0:
+            return []
+        return detector.detect_emotions(frame.image, face_rectangles=face_rectangles)
+
+    def update(self, faces: list):
+        """Updates the detection results from the result of `analyse`.
+
+        The dominant emotion and face position are taken from the first face.
+
+        Args:
+            faces (list): Faces returned by `analyse`.
+        """
+        if len(faces) > 0:
+            emotions = faces[0]["emotions"]
+            dominant_emotion = max(emotions, key=emotions.get)
+            face_position = faces[0]["box"]
+        else:
+            dominant_emotion = None
+            face_position = None
+
         with self._lock:
-            if self.worker is not None:
-                if self.worker.is_running():
-                    return
+            self._faces = faces
+            self._dominant_emotion = dominant_emotion
+            self._face_position = face_position
 
-            self._image = frame.image
-            self.worker = EmotionDetectionWorker(self)
-            self.worker.start()
+    @property
+    def faces(self):
+        """
+        Get the faces found in the last analysed frame, with the scores of every emotion.
+        """
+        with self._lock:
+            return self._faces
 
     @property
     def current_emotion(self):
@@ -99,49 +273,40 @@ class EmotionDetection:
 
 class EmotionDetectionWorker(Worker):
     """
-    Worker thread for the emotion detection.
+    Long-lived worker thread that analyses queued frames.
     """
-    _running = False
 
     def __init__(self, emotion_detection: EmotionDetection):
         """Create a new instance of the EmotionDetectionWorker class."""
         super().__init__()
         self.emotion_detection = emotion_detection
 
-    def is_running(self):
-        """
-        Check if the worker thread is running.
-        """
-        return self._running
-
     def work(self):
         """
         Run the worker thread.
         """
-        if self._running or self.emotion_detection.image is None:
-            return
-
-        try:
-            self._running = True
-            dominant_emotion, _ = DETECTOR.top_emotion(self.emotion_detection.image)
-            faces = DETECTOR.find_faces(self.emotion_detection.image)
-            if len(faces) > 0:
-                face_position = faces[0]
-            else:
-                face_position = None
-            self.emotion_detection.current_emotion = dominant_emotion
-            self.emotion_detection.face_position = face_position
-        except cv.error:
-            self._running = False
-            return
-        self._running = False
+        self.emotion_detection.get_detector()
+        while not self.is_stopped():
+            try:
+                frame = self.emotion_detection.frames.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+            try:
+                faces = self.emotion_detection.analyse(frame)
+            except cv.error:
+                continue
+
+            self.emotion_detection.update(faces)
+            self.emotion_detection.record_processed()
 
 if __name__ == "__main__":
     from .video_feed import VideoFeed
 
     WORKER_MANAGER = WorkerManager()
+    Worker.set_manager(WORKER_MANAGER)
     VIDEO_FEED = VideoFeed()
-    EMOTION_DETECTION = EmotionDetection(WORKER_MANAGER)
+    EMOTION_DETECTION = EmotionDetection()
 
     while True:
         video_frame = VIDEO_FEED.capture()
@@ -151,5 +316,7 @@ if __name__ == "__main__":
             cv.putText(video_frame.image, EMOTION_DETECTION.current_emotion, (10, 30), cv.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
             cv.imshow('Video', video_frame.image)
         if cv.waitKey(1) & 0xFF == ord('q'):
+            LOGGER.debug("Frames accepted: %d, dropped: %d, processed: %d",
+                EMOTION_DETECTION.frames_accepted, EMOTION_DETECTION.frames_dropped, EMOTION_DETECTION.frames_processed)
             WORKER_MANAGER.stop_all_workers()
             break
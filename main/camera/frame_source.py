@@ -0,0 +1,252 @@
+"""
+Sources of frames for the video feed: a camera, a video file, a directory of images or generated frames.
+Author: Benjamin Dodd (1901386)
+"""
+
+import time
+from os import path, listdir
+
+import cv2 as cv
+import numpy as np
+
+from main.camera import LOGGER
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+class FrameSource:
+    """
+    Base class for a source of BGR frames.
+
+    The interface mirrors `cv.VideoCapture` so the video feed can use any
+    source in place of the camera. When `realtime` is set, `read()` paces
+    the frames to `fps`, otherwise frames are returned as fast as possible.
+
+    Args:
+        fps (float): Frame rate used for real-time pacing.
+        realtime (bool): Whether to pace frames to `fps`.
+    """
+
+    def __init__(self, fps: float, realtime: bool):
+        self.fps = fps
+        self.realtime = realtime
+        self._next_frame_time = None
+
+    def __str__(self):
+        return f"{self.__class__.__name__}({self.fps} fps, {'realtime' if self.realtime else 'as fast as possible'})"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def open(self) -> bool:
+        """Opens the source.
+
+        Returns:
+            bool: True if the source is open, False otherwise.
+        """
+        self._next_frame_time = None
+        return self.is_opened()
+
+    def is_opened(self) -> bool:
+        """Returns whether the source is open.
+
+        Returns:
+            bool: True if the source is open, False otherwise.
+        """
+        return True
+
+    def release(self):
+        """
+        Closes the source.
+        """
+        return
+
+    def read(self):
+        """Reads the next frame, waiting for its presentation time if pacing in real time.
+
+        Returns:
+            tuple: Whether a frame was read, and the frame.
+        """
+        if self.realtime and self.fps:
+            now = time.monotonic()
+            if self._next_frame_time is None or self._next_frame_time < now:
+                # Behind schedule, continue from now rather than catching up in a burst
+                self._next_frame_time = now
+            else:
+                time.sleep(self._next_frame_time - now)
+            self._next_frame_time += 1 / self.fps
+        return self.read_frame()
+
+    def read_frame(self):
+        """Override this method to return the next frame.
+
+        Returns:
+            tuple: Whether a frame was read, and the frame.
+        """
+        return False, None
+
+class DeviceFrameSource(FrameSource):
+    """
+    Frames from a camera. The camera paces itself, so no pacing is applied.
+
+    Args:
+        index (int): Index of the camera.
+        width (int): Requested frame width.
+        height (int): Requested frame height.
+        fps (float): Requested frame rate.
+    """
+
+    def __init__(self, index: int, width: int, height: int, fps: float):
+        super().__init__(fps, realtime=False)
+        self.index = index
+        self.width = width
+        self.height = height
+        self._capture = None
+
+    def open(self):
+        if self._capture is None or not self._capture.isOpened():
+            self._capture = cv.VideoCapture(self.index)
+            self._capture.set(cv.CAP_PROP_FPS, self.fps)
+            self._capture.set(cv.CAP_PROP_FRAME_WIDTH, self.width)
+            self._capture.set(cv.CAP_PROP_FRAME_HEIGHT, self.height)
+        return super().open()
+
+    def is_opened(self):
+        return self._capture is not None and self._capture.isOpened()
+
+    def release(self):
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+    def read_frame(self):
+        if self._capture is None:
+            return False, None
+        return self._capture.read()
+
+class VideoFileFrameSource(FrameSource):
+    """
+    Frames from a video file.
+
+    Args:
+        file_path (str): Path of the video file.
+        realtime (bool, optional): Whether to pace frames to the frame rate of the file. Defaults to True.
+        loop (bool, optional): Whether to restart from the beginning at the end of the file. Defaults to False.
+    """
+
+    def __init__(self, file_path: str, realtime: bool = True, loop: bool = False):
+        super().__init__(0, realtime)
+        self.file_path = file_path
+        self.loop = loop
+        self._capture = None
+
+    def open(self):
+        if self._capture is None or not self._capture.isOpened():
+            self._capture = cv.VideoCapture(self.file_path)
+            self.fps = self._capture.get(cv.CAP_PROP_FPS)
+            if not self._capture.isOpened():
+                LOGGER.error("Failed to open video file %s", self.file_path)
+        return super().open()
+
+    def is_opened(self):
+        return self._capture is not None and self._capture.isOpened()
+
+    def release(self):
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+    def read_frame(self):
+        if self._capture is None:
+            return False, None
+        success, frame = self._capture.read()
+        if not success and self.loop:
+            self._capture.set(cv.CAP_PROP_POS_FRAMES, 0)
+            success, frame = self._capture.read()
+        return success, frame
+
+class ImageDirectoryFrameSource(FrameSource):
+    """
+    Frames from the images in a directory, in file name order.
+
+    Args:
+        directory (str): Directory containing the images.
+        fps (float, optional): Frame rate used for real-time pacing. Defaults to 15.
+        realtime (bool, optional): Whether to pace frames to `fps`. Defaults to True.
+        loop (bool, optional): Whether to restart from the first image after the last one. Defaults to False.
+    """
+
+    def __init__(self, directory: str, fps: float = 15, realtime: bool = True, loop: bool = False):
+        super().__init__(fps, realtime)
+        self.directory = directory
+        self.loop = loop
+        self._files = None
+        self._index = 0
+
+    def __len__(self):
+        if self._files is None:
+            self.open()
+        return len(self._files)
+
+    def open(self):
+        if self._files is None:
+            if path.isdir(self.directory):
+                self._files = [path.join(self.directory, name) for name in sorted(listdir(self.directory)) if name.lower().endswith(IMAGE_EXTENSIONS)]
+            else:
+                LOGGER.error("Image directory %s does not exist", self.directory)
+                self._files = []
+        self._index = 0
+        return super().open()
+
+    def is_opened(self):
+        return bool(self._files)
+
+    def release(self):
+        self._files = None
+        self._index = 0
+
+    def read_frame(self):
+        if not self._files:
+            return False, None
+        if self._index >= len(self._files):
+            if not self.loop:
+                return False, None
+            self._index = 0
+        frame = cv.imread(self._files[self._index])
+        self._index += 1
+        return frame is not None, frame
+
+class SyntheticFrameSource(FrameSource):
+    """
+    Generated frames of a square moving across a gradient, the same for every run.
+
+    Args:
+        width (int, optional): Frame width. Defaults to 480.
+        height (int, optional): Frame height. Defaults to 240.
+        fps (float, optional): Frame rate used for real-time pacing. Defaults to 15.
+        realtime (bool, optional): Whether to pace frames to `fps`. Defaults to True.
+        count (int, optional): Number of frames to generate, or None for no limit. Defaults to None.
+    """
+
+    def __init__(self, width: int = 480, height: int = 240, fps: float = 15, realtime: bool = True, count: int = None):
+        super().__init__(fps, realtime)
+        self.width = width
+        self.height = height
+        self.count = count
+        self._index = 0
+        gradient = np.linspace(0, 255, width, dtype=np.uint8)
+        self._background = np.dstack([np.tile(gradient, (height, 1))] * 3)
+
+    def open(self):
+        self._index = 0
+        return super().open()
+
+    def read_frame(self):
+        if self.count is not None and self._index >= self.count:
+            return False, None
+        frame = self._background.copy()
+        size = self.height // 4
+        x = (self._index * 8) % max(self.width - size, 1)
+        y = (self.height - size) // 2
+        frame[y:y + size, x:x + size] = (0, 0, 255)
+        self._index += 1
+        return True, frame
@@ -3,10 +3,10 @@ Gesture detection using MediaPipe
 Author: Benjamin Dodd (1901386)
 """
 
+import queue
 import threading
 
 import cv2 as cv
-import mediapipe as mp
 
 from main.camera import LOGGER
 
@@ -14,11 +14,83 @@ from main.camera.video_feed import VideoFrame
 
 from main.threading.worker_manager import WorkerManager
 from main.threading.worker_thread import Worker
+from main.util.latest_queue import put_latest
+from main.util.startup_timer import StartupTimer
 
+QUEUE_SIZE = 1
+POLL_INTERVAL = 0.1
 
-MP_DRAWING = mp.solutions.drawing_utils
-MP_DRAWING_STYLES = mp.solutions.drawing_styles
-MP_HANDS = mp.solutions.hands
+# (tip, dip) indices of `mp.solutions.hands.HandLandmark` for the index, middle, ring and pinky
+# fingers, so the landmarks can be compared without importing MediaPipe.
+FINGERS = [(8, 7), (12, 11), (16, 15), (20, 19)]
+
+def count_fingers(results) -> int:
+    """Counts the raised fingers in a MediaPipe Hands result.
+
+    Args:
+        results: Result of `Hands.process`.
+
+    Returns:
+        int: Number of raised fingers across all detected hands.
+    """
+    finger_count = 0
+    if results.multi_hand_landmarks:
+        for hand_landmarks in results.multi_hand_landmarks:
+            for tip, dip in FINGERS:
+                if hand_landmarks.landmark[tip].y < hand_landmarks.landmark[dip].y:
+                    finger_count += 1
+    return finger_count
+
+class GestureEngine:
+    """
+    Owns a single MediaPipe Hands session running in video mode, so hand
+    landmarks are tracked between frames instead of re-running palm detection
+    on every frame.
+    """
+
+    _hands_solution = None
+    _hands_solution_lock = threading.Lock()
+
+    @classmethod
+    def load_hands_solution(cls):
+        """Gets `mp.solutions.hands`, importing MediaPipe on first use.
+
+        Returns:
+            module: The MediaPipe Hands solution.
+        """
+        if cls._hands_solution is None:
+            with cls._hands_solution_lock:
+                if cls._hands_solution is None:
+                    with StartupTimer().measure("import mediapipe"):
+                        import mediapipe as mp
+                    cls._hands_solution = mp.solutions.hands
+        return cls._hands_solution
+
+    def __init__(self, static_image_mode: bool = False):
+        hands_solution = self.load_hands_solution()
+        with StartupTimer().measure("load MediaPipe Hands graph"):
+            self.hands = hands_solution.Hands(
+                static_image_mode=static_image_mode,
+                # model_complexity=0,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5)
+
+    def process(self, image: cv.Mat) -> int:
+        """Counts the raised fingers in an RGB image.
+
+        Args:
+            image (cv.Mat): RGB image to analyse.
+
+        Returns:
+            int: Number of raised fingers.
+        """
+        return count_fingers(self.hands.process(image))
+
+    def close(self):
+        """
+        Releases the MediaPipe graph.
+        """
+        self.hands.close()
 
 class GestureDetection:
     """
@@ -43,6 +115,9 @@ class GestureDetection:
     def __init__(self):
         if not self._intitialized:
             self.worker = None
+            self.frames = queue.Queue(maxsize=QUEUE_SIZE)
+            self._submit_lock = threading.Lock()
+            self._last_sequence = 0
             self._intitialized = True
 
     @property
@@ -58,16 +133,44 @@ class GestureDetection:
         """
         Set the image to analyse.
         """
-        with self._lock:
-            # Ignore if the worker is already running
-            if self.worker is not None:
-                if self.worker.is_running():
-                    return
+        self.submit(image)
+
+    def submit(self, frame: VideoFrame):
+        """Queues a frame for the gesture engine, replacing any frame that has not been analysed yet.
+
+        Stale frames and frames that have already been submitted are skipped.
+
+        Args:
+            frame (VideoFrame): Frame to analyse.
 
-            self._image = image.to_pillow()
+        Returns:
+            bool: True if the frame was queued, False if it was skipped.
+        """
+        with self._submit_lock:
+            if frame.stale or (frame.sequence and frame.sequence <= self._last_sequence):
+                return False
+            self._last_sequence = frame.sequence
+
+            image = frame.rgb
+            with self._lock:
+                self._image = image
+
+            self._start_worker()
+            put_latest(self.frames, image)
+        return True
+
+    def _start_worker(self):
+        if self.worker is None or not self.worker.is_alive() or self.worker.is_stopped():
             self.worker = GestureDetectionWorker(self)
             self.worker.start()
 
+    def warm_up(self):
+        """
+        Starts the worker in the background so the MediaPipe graph is loaded before the first frame arrives.
+        """
+        with self._submit_lock:
+            self._start_worker()
+
     @property
     def finger_count(self):
         """
@@ -86,60 +189,38 @@ class GestureDetection:
 
 class GestureDetectionWorker(Worker):
     """
-    Worker thread for the gesture detection.
+    Long-lived worker thread for the gesture detection.
+    The MediaPipe session is created when the worker starts and closed when it is stopped.
     """
-    _running = False
 
     def __init__(self, gesture_detection: GestureDetection):
         """Create a new instance of the GestureDetectionWorker class."""
         super().__init__()
         self.gesture_detection = gesture_detection
 
-    def is_running(self):
-        """
-        Check if the worker thread is running.
-        """
-        return self._running
-
     def work(self):
         """
         Run the worker thread.
         """
-        if self._running or self.gesture_detection.image is None:
-            return
-
-        self._running = True
-
-        finger_count = 0
-        with MP_HANDS.Hands(
-            # model_complexity=0,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5) as hands:
-            results = hands.process(self.gesture_detection.image)
-
-            if results.multi_hand_landmarks:
-                for hand_landmarks in results.multi_hand_landmarks:
-                    if hand_landmarks.landmark[MP_HANDS.HandLandmark.INDEX_FINGER_TIP].y < hand_landmarks.landmark[MP_HANDS.HandLandmark.INDEX_FINGER_DIP].y:
-                        finger_count += 1
-
-                    if hand_landmarks.landmark[MP_HANDS.HandLandmark.MIDDLE_FINGER_TIP].y < hand_landmarks.landmark[MP_HANDS.HandLandmark.MIDDLE_FINGER_DIP].y:
-                        finger_count += 1
-
-                    if hand_landmarks.landmark[MP_HANDS.HandLandmark.RING_FINGER_TIP].y < hand_landmarks.landmark[MP_HANDS.HandLandmark.RING_FINGER_DIP].y:
-                        finger_count += 1
-
-                    if hand_landmarks.landmark[MP_HANDS.HandLandmark.PINKY_TIP].y < hand_landmarks.landmark[MP_HANDS.HandLandmark.PINKY_DIP].y:
-                        finger_count += 1
-
-        self.gesture_detection.finger_count = finger_count
-        self._running = False
+        engine = GestureEngine()
+        try:
+            while not self.is_stopped():
+                try:
+                    image = self.gesture_detection.frames.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                self.gesture_detection.finger_count = engine.process(image)
+        finally:
+            engine.close()
+            LOGGER.debug("Gesture engine closed")
 
 if __name__ == "__main__":
     from .video_feed import VideoFeed
 
     WORKER_MANAGER = WorkerManager()
+    Worker.set_manager(WORKER_MANAGER)
     VIDEO_FEED = VideoFeed()
-    GESTURE_DETECTION = GestureDetection(WORKER_MANAGER)
+    GESTURE_DETECTION = GestureDetection()
 
     while True:
         video_frame = VIDEO_FEED.capture()
@@ -0,0 +1,262 @@
+"""
+Perception pipeline that captures each frame once and publishes it to every subscribed analyser.
+Author: Benjamin Dodd (1901386)
+"""
+
+import time
+import queue
+import threading
+from enum import Enum
+from typing import Dict
+
+from main.camera import LOGGER
+
+from main.camera.video_feed import VideoFeed, VideoFrame
+
+from main.threading.worker_thread import Worker
+from main.util.latest_queue import put_latest
+
+POLL_INTERVAL = 0.1
+
+class DropPolicy(Enum):
+    """
+    Enum for what a subscription does with a new frame when its queue is full.
+    """
+    DROP_OLDEST = 0
+    DROP_NEWEST = 1
+
+class Subscription:
+    """
+    A subscriber to the perception pipeline.
+
+    Frames are delivered to the callback on the subscription's own worker,
+    so a slow subscriber does not hold up the others.
+
+    Args:
+        name (str): Name of the subscription.
+        callback (function): Function called with each delivered `VideoFrame`.
+        max_rate (float, optional): Maximum frames per second to deliver, or None for no limit. Defaults to None.
+        drop_policy (DropPolicy, optional): What to do with a new frame when the queue is full. Defaults to DropPolicy.DROP_OLDEST.
+        queue_size (int, optional): Number of frames that can wait for delivery. Defaults to 1.
+    """
+
+    def __init__(self, name: str, callback, max_rate: float = None, drop_policy: DropPolicy = DropPolicy.DROP_OLDEST, queue_size: int = 1):
+        self.name = name
+        self.callback = callback
+        self.max_rate = max_rate
+        self.drop_policy = drop_policy
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.worker = None
+
+        self._lock = threading.Lock()
+        self._last_accepted = None
+        self._delivered = 0
+        self._dropped = 0
+        self._rate_limited = 0
+
+    def __str__(self):
+        return f"Subscription({self.name}, delivered={self.delivered}, dropped={self.dropped}, rate_limited={self.rate_limited})"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def start(self):
+        """
+        Starts delivering frames.
+        """
+        if self.worker is None or not self.worker.is_alive() or self.worker.is_stopped():
+            self.worker = SubscriptionWorker(self)
+            self.worker.start()
+
+    def stop(self):
+        """
+        Stops delivering frames.
+        """
+        if self.worker is not None:
+            self.worker.stop()
+
+    def offer(self, frame: VideoFrame):
+        """Queues a frame for delivery, subject to the rate limit and drop policy.
+
+        Args:
+            frame (VideoFrame): Frame to deliver.
+
+        Returns:
+            bool: True if the frame was queued, False if it was rate limited or dropped.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.max_rate and self._last_accepted is not None and now - self._last_accepted < 1 / self.max_rate:
+                self._rate_limited += 1
+                return False
+
+            if self.drop_policy == DropPolicy.DROP_NEWEST:
+                try:
+                    self.frames.put_nowait(frame)
+                except queue.Full:
+                    self._dropped += 1
+                    return False
+            else:
+                self._dropped += put_latest(self.frames, frame)
+
+            self._last_accepted = now
+            return True
+
+    def delivered_frame(self):
+        """
+        Records that a frame has been delivered to the callback.
+        """
+        with self._lock:
+            self._delivered += 1
+
+    @property
+    def delivered(self):
+        """
+        Get the number of frames delivered to the callback.
+        """
+        with self._lock:
+            return self._delivered
+
+    @property
+    def dropped(self):
+        """
+        Get the number of frames dropped because the queue was full.
+        """
+        with self._lock:
+            return self._dropped
+
+    @property
+    def rate_limited(self):
+        """
+        Get the number of frames skipped by the rate limit.
+        """
+        with self._lock:
+            return self._rate_limited
+
+class SubscriptionWorker(Worker):
+    """
+    Worker thread that delivers queued frames to a subscription's callback.
+    """
+
+    def __init__(self, subscription: Subscription):
+        super().__init__()
+        self.subscription = subscription
+
+    def work(self):
+        while not self.is_stopped():
+            try:
+                frame = self.subscription.frames.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            try:
+                self.subscription.callback(frame)
+            except Exception:
+                LOGGER.exception("Subscription %s failed to process frame %s", self.subscription.name, frame)
+                continue
+            self.subscription.delivered_frame()
+
+class PerceptionPipeline:
+    """
+    Owns capture from the video feed and publishes each new frame to every subscription.
+
+    Capture runs only while there is at least one subscription.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            self.video_feed = VideoFeed()
+            self.worker = None
+            self._lock = threading.Lock()
+            self._subscriptions: Dict[str, Subscription] = {}
+            self._initialized = True
+
+    def subscribe(self, name: str, callback, max_rate: float = None, drop_policy: DropPolicy = DropPolicy.DROP_OLDEST, queue_size: int = 1):
+        """Subscribes a callback to the frames captured by the pipeline.
+
+        Args:
+            name (str): Name of the subscription, must be unique.
+            callback (function): Function called with each delivered `VideoFrame`.
+            max_rate (float, optional): Maximum frames per second to deliver, or None for no limit. Defaults to None.
+            drop_policy (DropPolicy, optional): What to do with a new frame when the queue is full. Defaults to DropPolicy.DROP_OLDEST.
+            queue_size (int, optional): Number of frames that can wait for delivery. Defaults to 1.
+
+        Returns:
+            Subscription: The new subscription.
+        """
+        with self._lock:
+            if name in self._subscriptions:
+                raise ValueError(f"Subscription {name} already exists")
+            subscription = Subscription(name, callback, max_rate, drop_policy, queue_size)
+            subscription.start()
+            self._subscriptions[name] = subscription
+
+            self.video_feed.start_background_capture()
+            if self.worker is None or not self.worker.is_alive() or self.worker.is_stopped():
+                self.worker = PerceptionPipelineWorker(self)
+                self.worker.start()
+        LOGGER.debug("Subscribed %s to the perception pipeline", name)
+        return subscription
+
+    def unsubscribe(self, name: str):
+        """Removes a subscription, capture stops when there are no subscriptions left.
+
+        Args:
+            name (str): Name of the subscription.
+        """
+        with self._lock:
+            subscription = self._subscriptions.pop(name, None)
+            if subscription is None:
+                return
+            subscription.stop()
+            if not self._subscriptions and self.worker is not None:
+                self.worker.stop()
+                self.worker = None
+        LOGGER.debug("Unsubscribed %s from the perception pipeline: %s", name, subscription)
+
+    @property
+    def subscriptions(self):
+        """
+        Get the current subscriptions.
+        """
+        with self._lock:
+            return list(self._subscriptions.values())
+
+    def publish(self, frame: VideoFrame):
+        """Offers a frame to every subscription.
+
+        Args:
+            frame (VideoFrame): Frame to publish.
+        """
+        for subscription in self.subscriptions:
+            subscription.offer(frame)
+
+class PerceptionPipelineWorker(Worker):
+    """
+    Worker thread that waits for each new frame from the video feed and publishes it.
+    """
+
+    def __init__(self, pipeline: PerceptionPipeline):
+        super().__init__()
+        self.pipeline = pipeline
+
+    def work(self):
+        LOGGER.debug("Starting perception pipeline")
+        last_sequence = 0
+        while not self.is_stopped():
+            frame = self.pipeline.video_feed.wait_for_next(last_sequence, POLL_INTERVAL)
+            if frame is None or frame.stale:
+                continue
+            last_sequence = frame.sequence
+            self.pipeline.publish(frame)
+        LOGGER.debug("Stopped perception pipeline")
@@ -3,45 +3,161 @@ Video Feed Singleton class using OpenCV
 Author: Benjamin Dodd (1901386)
 """
 
+import time
 import threading
+from collections import deque
+
 import cv2 as cv
 
 from main.camera import LOGGER
+from main.camera.frame_source import FrameSource, DeviceFrameSource
+
+from main.threading.worker_thread import Worker
+from main.util.running_statistics import RunningStatistics
 
+CAMERA_INDEX = 0
 CAMERA_FPS = 15
 CAMERA_WIDTH = 480
 CAMERA_HEIGHT = 240
 
+RING_BUFFER_SIZE = 3
+FIRST_FRAME_TIMEOUT = 2
+IDLE_TIMEOUT = 10
+IDLE_POLL_INTERVAL = 0.5
+OPEN_RETRY_INTERVAL = 1
+
 class VideoFrame:
     """Video Frame class, holds an image from the video feed
 
+    Derived representations of the image (RGB, grayscale and downscaled) are
+    computed the first time they are requested and cached on the frame. The
+    cached arrays are read-only as they are shared by every consumer.
+
     Args:
         frame (cv.Mat): Frame from the video feed
+        sequence (int, optional): Sequence number of the frame in the video feed. Defaults to 0.
+        timestamp (float, optional): `time.monotonic()` at which the frame was captured. Defaults to now.
+        stale (bool, optional): Whether the frame is a repeat of an earlier capture. Defaults to False.
     """
-    def __init__(self, frame: cv.Mat):
+    def __init__(self, frame: cv.Mat, sequence: int = 0, timestamp: float = None, stale: bool = False):
         self.image = frame
+        self.sequence = sequence
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+        self.stale = stale
+        self._views = {}
+        self._views_lock = threading.RLock()
 
     def __str__(self):
-        return f"VideoFrame({self.image.shape})"
+        return f"VideoFrame({self.sequence}, {self.image.shape}{', stale' if self.stale else ''})"
 
     def __repr__(self):
         return self.__str__()
 
+    @property
+    def age(self):
+        """Returns the time since the frame was captured.
+
+        Returns:
+            float: Age of the frame in seconds.
+        """
+        return time.monotonic() - self.timestamp
+
+    def as_stale(self):
+        """Returns a copy of the frame marked as stale, sharing the same image and cached views.
+
+        Returns:
+            VideoFrame: Stale copy of the frame.
+        """
+        frame = VideoFrame(self.image, self.sequence, self.timestamp, stale=True)
+        frame._views = self._views
+        frame._views_lock = self._views_lock
+        return frame
+
+    def _view(self, name: str, create):
+        view = self._views.get(name)
+        if view is not None:
+            return view
+        with self._views_lock:
+            view = self._views.get(name)
+            if view is None:
+                view = create()
+                view.flags.writeable = False
+                self._views[name] = view
+            return view
+
+    @property
+    def rgb(self):
+        """
+        Get the RGB representation of the frame.
+        """
+        return self._view("rgb", lambda: cv.cvtColor(self.image, cv.COLOR_BGR2RGB))
+
+    @property
+    def gray(self):
+        """
+        Get the grayscale representation of the frame.
+        """
+        return self._view("gray", lambda: cv.cvtColor(self.image, cv.COLOR_BGR2GRAY))
+
+    @property
+    def half(self):
+        """
+        Get the frame downscaled to half resolution.
+        """
+        return self._view("half", lambda: cv.resize(self.image, (self.image.shape[1] // 2, self.image.shape[0] // 2), interpolation=cv.INTER_AREA))
+
+    @property
+    def quarter(self):
+        """
+        Get the frame downscaled to quarter resolution.
+        """
+        return self._view("quarter", lambda: cv.resize(self.half, (self.image.shape[1] // 4, self.image.shape[0] // 4), interpolation=cv.INTER_AREA))
+
+    @property
+    def cached_bytes(self):
+        """Returns the memory used by the cached views of the frame.
+
+        Returns:
+            int: Size of the cached views in bytes.
+        """
+        with self._views_lock:
+            return sum(view.nbytes for view in self._views.values())
+
+    def drop_cache(self):
+        """
+        Discards the cached views of the frame, they are computed again if requested.
+        """
+        with self._views_lock:
+            self._views.clear()
+
     def to_pillow(self):
         """Returns a RGB representation of the frame that can be used by PIL library
 
         Returns:
             cv.Mat: RGB representation of the frame
         """
-        return cv.cvtColor(self.image, cv.COLOR_BGR2RGB)
+        return self.rgb
 
 class VideoFeed:
     """
     Provides access to the video feed
+
+    By default `capture()` reads from the camera on the calling thread.
+    After `start_background_capture()` a worker reads continuously into a
+    small ring buffer and `capture()` returns the newest frame without
+    waiting on the camera.
+
+    Frames come from a `FrameSource`, the camera unless another source is
+    set with `set_source()`. The source is opened on the first capture. While capturing in the
+    background, it is released again once no frames have been requested
+    for `idle_timeout` seconds, and reopened by the next request. Idle release
+    is done by the background worker only, when capturing on the calling
+    thread the source stays open until `close()` is called.
     """
 
-    _feed = cv.VideoCapture(0)
+    _source: FrameSource = None
     _lock = threading.Lock()
+    _is_open = False
     _cache: VideoFrame = None
     _initialized = False
     _instance = None
@@ -57,18 +173,192 @@ class VideoFeed:
 
     def __init__(self):
         if not VideoFeed._initialized:
-            self._feed.set(cv.CAP_PROP_FPS, CAMERA_FPS)
-            self._feed.set(cv.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
-            self._feed.set(cv.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
-            if not self._feed.isOpened():
-                LOGGER.error("Failed to open video feed")
-                raise RuntimeError("Failed to open video feed")
+            self.idle_timeout = IDLE_TIMEOUT
+            self.open_latency = RunningStatistics("VideoFeed open")
+            self.close_latency = RunningStatistics("VideoFeed close")
+            self._sequence = 0
+            self._last_request = time.monotonic()
+            self._frames = deque(maxlen=RING_BUFFER_SIZE)
+            self._frames_condition = threading.Condition()
+            self._capture_worker = None
             VideoFeed._initialized = True
 
     def __del__(self):
-        self._feed.release()
+        self.close()
         VideoFeed._initialized = False
 
+    def set_source(self, source: FrameSource):
+        """Replaces the source of frames, releasing the current source.
+
+        Args:
+            source (FrameSource): The new source of frames.
+        """
+        self.close()
+        with self._lock:
+            self._source = source
+            self._is_open = False
+        LOGGER.debug("Video feed source set to %s", source)
+
+    def _open(self):
+        if self._source is None:
+            self._source = DeviceFrameSource(CAMERA_INDEX, CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_FPS)
+        if self._is_open and self._source.is_opened():
+            return True
+
+        start = time.perf_counter()
+        if not self._source.open():
+            self._source.release()
+            LOGGER.error("Failed to open video feed")
+            return False
+        self._is_open = True
+        self.open_latency.add(time.perf_counter() - start)
+        LOGGER.debug("Opened video feed in %.3f s", self.open_latency.last)
+        return True
+
+    def open(self):
+        """Opens the camera if it is not already open.
+
+        Returns:
+            bool: True if the camera is open, False if it could not be opened.
+        """
+        with self._lock:
+            return self._open()
+
+    def close(self):
+        """
+        Releases the camera, it is opened again by the next capture.
+        """
+        with self._lock:
+            if not self._is_open:
+                return
+            start = time.perf_counter()
+            self._source.release()
+            self._is_open = False
+            self.close_latency.add(time.perf_counter() - start)
+            LOGGER.debug("Released video feed in %.3f s", self.close_latency.last)
+
+    def is_open(self):
+        """Returns whether the camera is open.
+
+        Returns:
+            bool: True if the camera is open, False otherwise.
+        """
+        with self._lock:
+            return self._is_open and self._source.is_opened()
+
+    def _request(self):
+        with self._frames_condition:
+            self._last_request = time.monotonic()
+            self._frames_condition.notify_all()
+
+    def is_idle(self):
+        """Returns whether no frames have been requested for `idle_timeout` seconds.
+
+        Returns:
+            bool: True if the feed is idle, False otherwise.
+        """
+        with self._frames_condition:
+            return time.monotonic() - self._last_request > self.idle_timeout
+
+    def wait_while_idle(self, timeout: float):
+        """Waits until a frame is requested.
+
+        Args:
+            timeout (float): Maximum time to wait in seconds.
+
+        Returns:
+            bool: True if a frame has been requested, False if the timeout expired.
+        """
+        with self._frames_condition:
+            return self._frames_condition.wait_for(lambda: time.monotonic() - self._last_request <= self.idle_timeout, timeout)
+
+    def release_if_idle(self):
+        """Releases the camera and clears the ring buffer if the feed is idle, called by the background capture worker.
+
+        Returns:
+            bool: True if the feed is idle, False otherwise.
+        """
+        if not self.is_idle():
+            return False
+        if self.is_open():
+            LOGGER.debug("Video feed idle for %d s, releasing camera", self.idle_timeout)
+            self.close()
+            with self._frames_condition:
+                for frame in self._frames:
+                    frame.drop_cache()
+                self._frames.clear()
+        return True
+
+    def _read(self):
+        """Reads a frame from the camera, opening it first if necessary.
+
+        Returns:
+            VideoFrame: Frame from the camera, or None if the read failed.
+        """
+        with self._lock:
+            if not self._open():
+                return None
+            success, frame_capture = self._source.read()
+            if not success:
+                return None
+            self._sequence += 1
+            frame_capture = VideoFrame(frame_capture, self._sequence, time.monotonic())
+            if self._cache is not None and not self.is_capturing_in_background():
+                self._cache.drop_cache()
+            self._cache = frame_capture
+            return frame_capture
+
+    def start_background_capture(self):
+        """
+        Starts the worker that continuously reads frames into the ring buffer.
+        """
+        with self._frames_condition:
+            if self._capture_worker is None or not self._capture_worker.is_alive() or self._capture_worker.is_stopped():
+                self._capture_worker = VideoCaptureWorker(self)
+                self._capture_worker.start()
+
+    def stop_background_capture(self):
+        """
+        Stops the background capture worker, `capture()` reads from the camera directly afterwards.
+        """
+        with self._frames_condition:
+            if self._capture_worker is not None:
+                self._capture_worker.stop()
+                self._capture_worker = None
+            self._frames.clear()
+
+    def is_capturing_in_background(self):
+        """Returns whether the background capture worker is running.
+
+        Returns:
+            bool: True if frames are captured in the background, False otherwise.
+        """
+        with self._frames_condition:
+            return self._capture_worker is not None and not self._capture_worker.is_stopped()
+
+    def publish(self, frame: VideoFrame):
+        """Adds a frame to the ring buffer and wakes any waiting consumers.
+
+        Args:
+            frame (VideoFrame): Frame to add.
+        """
+        with self._frames_condition:
+            if len(self._frames) == self._frames.maxlen:
+                # The oldest frame ages out of the ring buffer
+                self._frames[0].drop_cache()
+            self._frames.append(frame)
+            self._frames_condition.notify_all()
+
+    @property
+    def cached_bytes(self):
+        """Returns the memory used by the cached views of the frames in the ring buffer.
+
+        Returns:
+            int: Size of the cached views in bytes.
+        """
+        with self._frames_condition:
+            return sum(frame.cached_bytes for frame in self._frames)
+
     def capture(self):
         """
         Captures a frame from the video feed
@@ -76,16 +366,61 @@ class VideoFeed:
         Returns:
             VideoFrame: Frame from the video feed
         """
-        with self._lock:
-            if self._feed.isOpened():
-                success, frame_capture = self._feed.read()
-                if success:
-                    frame_capture = VideoFrame(frame_capture)
-                    self._cache = frame_capture
-                    return frame_capture
-
-                # If we failed to capture a frame, return the last frame we captured
-                if self._cache:
-                    return self._cache
-
-                LOGGER.error("Failed to capture frame")
+        self._request()
+        if self.is_capturing_in_background():
+            with self._frames_condition:
+                if self._frames:
+                    return self._frames[-1]
+            # Only wait when nothing has been captured since the worker started
+            return self.wait_for_next(0, FIRST_FRAME_TIMEOUT)
+
+        frame_capture = self._read()
+        if frame_capture is not None:
+            return frame_capture
+
+        # If we failed to capture a frame, return the last frame we captured
+        if self._cache:
+            return self._cache.as_stale()
+
+        LOGGER.error("Failed to capture frame")
+
+    def wait_for_next(self, after_sequence: int, timeout: float = None):
+        """Waits for a frame newer than the given sequence number.
+
+        Requires the background capture worker to be running.
+
+        Args:
+            after_sequence (int): Sequence number of the last frame the consumer processed.
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to None, waiting indefinitely.
+
+        Returns:
+            VideoFrame: Newest frame in the ring buffer, or None if the timeout expired.
+        """
+        self._request()
+        with self._frames_condition:
+            if self._frames_condition.wait_for(lambda: self._frames and self._frames[-1].sequence > after_sequence, timeout):
+                return self._frames[-1]
+        return None
+
+class VideoCaptureWorker(Worker):
+    """
+    Worker thread that continuously reads frames from the camera into the ring buffer.
+    """
+
+    def __init__(self, video_feed: VideoFeed):
+        super().__init__()
+        self.video_feed = video_feed
+
+    def work(self):
+        LOGGER.debug("Starting background capture")
+        while not self.is_stopped():
+            if self.video_feed.release_if_idle():
+                self.video_feed.wait_while_idle(IDLE_POLL_INTERVAL)
+                continue
+            frame_capture = self.video_feed._read()
+            if frame_capture is None:
+                time.sleep(1 / CAMERA_FPS if self.video_feed.is_open() else OPEN_RETRY_INTERVAL)
+                continue
+            self.video_feed.publish(frame_capture)
+        self.video_feed.close()
+        LOGGER.debug("Stopped background capture")
@@ -0,0 +1,208 @@
+"""
+Precomputed animations, such as crossfades and blinks, for the circular displays.
+Author: Benjamin Dodd (1901386)
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+import cv2 as cv
+import numpy as np
+
+from main.display import LOGGER
+from main.display.asset_manager import AssetManager
+
+ANIMATION_FPS = 30
+CROSSFADE_FRAMES = 8
+# Fraction of the eye covered by the eyelids in each frame of a blink
+BLINK_CLOSURE = (0.3, 0.6, 0.9, 1.0, 0.7, 0.4, 0.0)
+ANIMATION_CACHE_SIZE = 8
+
+class Animation:
+    """
+    A sequence of frames computed ahead of time and played at a fixed rate.
+
+    The frames are read-only, and their RGB565 encoding for each display
+    geometry is computed once, so playing an animation only writes to the
+    bus. Frames that are already a whole frame late are skipped, the last
+    frame is always shown.
+    """
+
+    def __init__(self, name: str, frames: np.ndarray, fps: float = ANIMATION_FPS):
+        self.name = name
+        self.frames = frames
+        self.frames.flags.writeable = False
+        self.fps = fps
+        self._lock = threading.Lock()
+        self._encoded = {}
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __str__(self):
+        return f"Animation({self.name}, {len(self)} frames at {self.fps} fps)"
+
+    @property
+    def final(self) -> cv.Mat:
+        """
+        Get the last frame, the image left on the display once the animation has played.
+        """
+        return self.frames[-1]
+
+    @property
+    def duration(self) -> float:
+        """
+        Get the time taken to play the animation in seconds.
+        """
+        return len(self) / self.fps
+
+    def encoded(self, display) -> np.ndarray:
+        """Gets the frames encoded for a display, encoding them the first time.
+
+        Args:
+            display (Display): The display to encode for.
+
+        Returns:
+            np.ndarray: Read-only encoded frames of shape (count, height, width).
+        """
+        key = (display.diameter, display.rotation)
+        with self._lock:
+            encoded = self._encoded.get(key)
+            if encoded is None:
+                encoded = display.encode_frames(self.frames)
+                self._encoded[key] = encoded
+            return encoded
+
+    def play(self, show: Callable[[int], None]) -> int:
+        """Shows each frame at its scheduled time.
+
+        Args:
+            show (Callable[[int], None]): Called with the index of each frame to show, blocking until it is shown.
+
+        Returns:
+            int: Number of frames skipped because they were late.
+        """
+        interval = 1 / self.fps
+        start = time.monotonic()
+        skipped = 0
+        for index in range(len(self)):
+            due = start + index * interval
+            now = time.monotonic()
+            if now - due >= interval and index < len(self) - 1:
+                skipped += 1
+                continue
+            if due > now:
+                time.sleep(due - now)
+            show(index)
+        if skipped:
+            LOGGER.debug("%s skipped %d of %d frames", self.name, skipped, len(self))
+        return skipped
+
+def crossfade(start: cv.Mat, end: cv.Mat, frames: int = CROSSFADE_FRAMES, name: str = "crossfade") -> Animation:
+    """Creates an animation that fades from one image to another.
+
+    Args:
+        start (cv.Mat): The image to fade from.
+        end (cv.Mat): The image to fade to, the same size as `start`.
+        frames (int, optional): Number of frames. Defaults to CROSSFADE_FRAMES.
+        name (str, optional): Name of the animation. Defaults to "crossfade".
+
+    Returns:
+        Animation: The crossfade, ending on `end`.
+    """
+    sequence = np.empty((frames,) + end.shape, dtype=np.uint8)
+    for index in range(frames):
+        weight = (index + 1) / frames
+        cv.addWeighted(start, 1 - weight, end, weight, 0, dst=sequence[index])
+    return Animation(name, sequence)
+
+def blink(image: cv.Mat, closure: tuple = BLINK_CLOSURE, name: str = "blink") -> Animation:
+    """Creates an animation of eyelids closing over an image and opening again.
+
+    Args:
+        image (cv.Mat): The image of the open eye.
+        closure (tuple, optional): Fraction of the eye covered in each frame. Defaults to BLINK_CLOSURE.
+        name (str, optional): Name of the animation. Defaults to "blink".
+
+    Returns:
+        Animation: The blink, ending on `image`.
+    """
+    height = image.shape[0]
+    sequence = np.empty((len(closure),) + image.shape, dtype=np.uint8)
+    for index, fraction in enumerate(closure):
+        lid = int(round(fraction * height / 2))
+        sequence[index] = image
+        sequence[index, :lid] = 0
+        sequence[index, height - lid:] = 0
+    return Animation(name, sequence)
+
+class AnimationLibrary:
+    """
+    Least recently used cache of animations between the assets of the `AssetManager`.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+    _initialized = False
+
+    def __new__(cls, max_size: int = ANIMATION_CACHE_SIZE):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, max_size: int = ANIMATION_CACHE_SIZE):
+        if not self._initialized:
+            self.max_size = max_size
+            self.assets = AssetManager()
+            self._lock = threading.Lock()
+            self._animations = OrderedDict()
+            self._initialized = True
+
+    def __len__(self):
+        with self._lock:
+            return len(self._animations)
+
+    def crossfade(self, start: str, end: str, diameter: int) -> Animation:
+        """Gets the crossfade between two assets.
+
+        Args:
+            start (str): Name of the asset to fade from.
+            end (str): Name of the asset to fade to.
+            diameter (int): Width and height of the display.
+
+        Returns:
+            Animation: The crossfade.
+        """
+        return self._get(("crossfade", start, end, diameter),
+            lambda: crossfade(self.assets.get(start, diameter), self.assets.get(end, diameter), name=f"{start} to {end}"))
+
+    def blink(self, name: str, diameter: int) -> Animation:
+        """Gets a blink of an asset.
+
+        Args:
+            name (str): Name of the asset that blinks.
+            diameter (int): Width and height of the display.
+
+        Returns:
+            Animation: The blink.
+        """
+        return self._get(("blink", name, diameter), lambda: blink(self.assets.get(name, diameter), name=f"{name} blink"))
+
+    def _get(self, key: tuple, create: Callable[[], Animation]) -> Animation:
+        with self._lock:
+            animation = self._animations.get(key)
+            if animation is not None:
+                self._animations.move_to_end(key)
+                return animation
+
+        animation = create()
+        with self._lock:
+            animation = self._animations.setdefault(key, animation)
+            self._animations.move_to_end(key)
+            while len(self._animations) > self.max_size:
+                self._animations.popitem(last=False)
+        return animation
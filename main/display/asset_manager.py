@@ -0,0 +1,166 @@
+"""
+Static images for the circular displays, pre-resized and packed into one atlas per display size.
+Author: Benjamin Dodd (1901386)
+"""
+
+import json
+import os
+import threading
+from os import path
+from typing import List
+
+import cv2 as cv
+import numpy as np
+
+from main.display import LOGGER
+
+ASSET_PATH = "res"
+# res/ui holds the Qt resources of the emulator, not display images
+ASSET_DIRECTORIES = ("activity", "emotion")
+ATLAS_PATH = path.join("data", "assets")
+
+class AssetManager:
+    """
+    Loads the display images under `res/` once and resizes them to each display's size.
+
+    The images of each size are packed into one contiguous (count, diameter, diameter, 3)
+    array, the atlas. Assets are looked up by name, such as "emotion/happy", and are
+    returned as read-only views of the atlas. The same view object is returned for every
+    lookup, so displays can cache its encoding and suppress repeated pushes.
+
+    When memory mapped, each atlas is kept in a `.npy` file under `atlas_path`, by default
+    `data/assets`, and mapped read-only, the file is reused by later runs until an image
+    under `res/` changes.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+    _initialized = False
+
+    def __new__(cls, root: str = ASSET_PATH, memory_map: bool = False, atlas_path: str = ATLAS_PATH):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, root: str = ASSET_PATH, memory_map: bool = False, atlas_path: str = ATLAS_PATH):
+        if not self._initialized:
+            self.root = root
+            self.memory_map = memory_map
+            self.atlas_path = atlas_path
+            self._lock = threading.Lock()
+            self._files = self._find_files()
+            self._atlases = {}
+            self._views = {}
+            self._initialized = True
+
+    def __str__(self):
+        with self._lock:
+            sizes = sorted(self._atlases)
+        return f"AssetManager({len(self._files)} assets, sizes={sizes}, memory_map={self.memory_map})"
+
+    def _find_files(self):
+        files = {}
+        for directory in ASSET_DIRECTORIES:
+            directory_path = path.join(self.root, directory)
+            if not path.isdir(directory_path):
+                continue
+            for file_name in sorted(os.listdir(directory_path)):
+                name, extension = path.splitext(file_name)
+                if extension.lower() == ".png":
+                    files[f"{directory}/{name}"] = path.join(directory_path, file_name)
+        return files
+
+    @property
+    def names(self) -> List[str]:
+        """
+        Get the names of the available assets.
+        """
+        return list(self._files)
+
+    def load(self, diameter: int) -> np.ndarray:
+        """Loads the atlas for a display size if it has not been loaded yet.
+
+        Args:
+            diameter (int): Width and height of the display.
+
+        Returns:
+            np.ndarray: The read-only atlas of every asset at that size.
+        """
+        with self._lock:
+            atlas = self._atlases.get(diameter)
+            if atlas is None:
+                atlas = self._open_atlas(diameter) if self.memory_map else self._build_atlas(diameter)
+                atlas.flags.writeable = False
+                self._atlases[diameter] = atlas
+                self._views[diameter] = {name: atlas[index] for index, name in enumerate(self._files)}
+                LOGGER.debug("Loaded %d assets at %dx%d", len(self._files), diameter, diameter)
+            return atlas
+
+    def get(self, name: str, diameter: int) -> cv.Mat:
+        """Gets an asset resized to a display size.
+
+        Args:
+            name (str): Name of the asset, its directory and file name without extension, such as "emotion/happy".
+            diameter (int): Width and height of the display.
+
+        Raises:
+            KeyError: If there is no asset with the name.
+
+        Returns:
+            cv.Mat: Read-only BGR view of the asset in the atlas.
+        """
+        views = self._views.get(diameter)
+        if views is None:
+            self.load(diameter)
+            views = self._views[diameter]
+        return views[name]
+
+    def _build_atlas(self, diameter: int, out: np.ndarray = None):
+        atlas = out if out is not None else np.empty((len(self._files), diameter, diameter, 3), dtype=np.uint8)
+        for index, file_path in enumerate(self._files.values()):
+            image = cv.imread(file_path)
+            if image is None:
+                raise ValueError(f"Could not load asset {file_path}")
+            interpolation = cv.INTER_AREA if image.shape[0] > diameter else cv.INTER_LINEAR
+            cv.resize(image, (diameter, diameter), dst=atlas[index], interpolation=interpolation)
+        return atlas
+
+    def _open_atlas(self, diameter: int):
+        atlas_path = path.join(self.atlas_path, f"atlas_{diameter}.npy")
+        index_path = path.join(self.atlas_path, f"atlas_{diameter}.json")
+        newest_source = max((path.getmtime(file_path) for file_path in self._files.values()), default=0)
+
+        try:
+            with open(index_path, "r", encoding="utf-8") as index_file:
+                names = json.load(index_file)
+            if names == list(self._files) and path.getmtime(atlas_path) >= newest_source:
+                return np.load(atlas_path, mmap_mode="r")
+        except (OSError, ValueError):
+            pass
+
+        # Build into temporary files and only replace the old ones once complete, so a crash
+        # never leaves a truncated atlas beside an index that would have it reused
+        LOGGER.debug("Building asset atlas %s", atlas_path)
+        os.makedirs(self.atlas_path, exist_ok=True)
+        temporary_atlas_path = path.join(self.atlas_path, f"atlas_{diameter}.tmp.npy")
+        temporary_index_path = path.join(self.atlas_path, f"atlas_{diameter}.tmp.json")
+        try:
+            atlas = np.lib.format.open_memmap(temporary_atlas_path, mode="w+", dtype=np.uint8,
+                shape=(len(self._files), diameter, diameter, 3))
+            try:
+                self._build_atlas(diameter, atlas)
+                atlas.flush()
+            finally:
+                del atlas
+            with open(temporary_index_path, "w", encoding="utf-8") as index_file:
+                json.dump(list(self._files), index_file)
+        except BaseException:
+            for temporary_path in (temporary_atlas_path, temporary_index_path):
+                if path.exists(temporary_path):
+                    os.remove(temporary_path)
+            raise
+        os.replace(temporary_atlas_path, atlas_path)
+        os.replace(temporary_index_path, index_path)
+        return np.load(atlas_path, mmap_mode="r")
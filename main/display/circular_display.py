@@ -3,13 +3,21 @@ Circular Displays Driver
 Author: Benjamin Dodd (1901386)
 """
 
+import time
+import zlib
 import threading
+from collections import OrderedDict
 
-from PIL import Image
 import cv2 as cv
 import numpy as np
 
 from main.display import LOGGER
+from main.display.render_cache import RenderCache
+from main.display.dirty_rectangles import find_dirty_rectangles, area
+from main.display.rgb565 import RGB565, RGB565Encoder
+from main.display.spi_bus import SPIBus
+from main.display.frame_limiter import FrameRateLimiter
+from main.display.compositor import Compositor
 
 try:
     import ST7789
@@ -18,11 +26,50 @@ except ImportError:
 
 from main.threading.worker_manager import WorkerManager
 from main.threading.worker_thread import Worker
+from main.util.running_statistics import RunningStatistics
+
+POLL_INTERVAL = 0.1
+SPI_CHUNK_SIZE = 4096
+# Above this fraction of the panel, a full frame write is cheaper than several windowed writes
+PARTIAL_UPDATE_MAX_AREA = 0.6
+# Number of encoded read-only images, such as icons and cached renders, kept per display
+ENCODED_CACHE_SIZE = 64
+
+def fingerprint(image: cv.Mat):
+    """Returns a cheap fingerprint of the contents of an image.
+
+    Args:
+        image (cv.Mat): The image to fingerprint.
+
+    Returns:
+        tuple: The shape of the image and a CRC32 checksum of its pixels.
+    """
+    return image.shape, zlib.crc32(np.ascontiguousarray(image))
 
 class Display(object):
     """
     Circular Display Driver
 
+    Each display owns one long-lived refresh worker. Setting `image` only
+    replaces the pending image, images set while the worker is busy are
+    coalesced so the most recent image is always the one pushed. Images
+    identical to the most recently set image are suppressed before they
+    reach the panel. Only the rectangles that changed since the last push
+    are written to the panel, using the controller's windowed writes.
+
+    Images are encoded to the panel's RGB565 wire format once, into
+    preallocated buffers, and compared in that format. Read-only images are
+    static, so their encodings are cached and reused.
+
+    Writes hold the `SPIBus` of the display's port, so displays sharing a
+    port never write at the same time.
+
+    Video frames are limited to `frame_limiter.max_fps`, unlimited by
+    default. With pacing on, pushes are held to the limiter's cadence.
+
+    Images built from layers, such as text over the camera feed, are combined
+    by the display's `compositor`.
+
     Portions of this code were produced based on a forums post by user 'MeckerZiege' on the Pimonori forums:
     MeckerZiege, “Pimoroni Forums,” March 2021. [Online]. Available: https://forums.pimoroni.com/t/two-1-3-spi-colour-lcd-240x240-on-one-pi/16737/7. [Accessed 12 February 2023].
     """
@@ -51,9 +98,31 @@ class Display(object):
         )
 
         self.worker = None
+        self.bus = SPIBus(self.port)
+        self.frame_limiter = FrameRateLimiter()
+        self.compositor = Compositor(self.diameter)
+        self.render_cache = RenderCache()
+        self.partial_updates = True
+
+        self._push_lock = threading.Lock()
+        self._encoder = RGB565Encoder()
+        self._encoded_buffers = []
+        self._encoded_cache = OrderedDict()
+        self._panel_frame = None
 
         self._lock = threading.Lock()
+        self._image_condition = threading.Condition(self._lock)
         self._image = None
+        self._image_timestamp = None
+        self._image_fingerprint = None
+        self._image_pending = False
+        self._frame_sequence = None
+        self._claims = 0
+        self._pushed = 0
+        self._coalesced = 0
+        self._suppressed = 0
+        self.latency = RunningStatistics(f"{self.__class__.__name__} capture to display")
+        self.push_time = RunningStatistics(f"{self.__class__.__name__} SPI push")
         self.clear()
 
     @property
@@ -73,13 +142,310 @@ class Display(object):
         Args:
             image (Image): The image to be displayed on the display.
         """
+        self._set_image(image, None)
+
+    def _set_image(self, image: cv.Mat, timestamp: float):
         with self._lock:
+            # Read-only images such as cached renders cannot have changed since they were set
+            if image is self._image and image is not None and not image.flags.writeable:
+                self._suppressed += 1
+                return
+
+        image_fingerprint = fingerprint(image) if image is not None else None
+        with self._image_condition:
+            if image_fingerprint is not None and image_fingerprint == self._image_fingerprint:
+                self._suppressed += 1
+                return
+            self._image_fingerprint = image_fingerprint
+            if self._image_pending:
+                self._coalesced += 1
+            self._image = image
+            self._image_timestamp = timestamp
+            self._image_pending = True
+            self._image_condition.notify()
+
+            if self.worker is None or not self.worker.is_alive() or self.worker.is_stopped():
+                self.worker = DisplayWorker(self)
+                self.worker.start()
+
+    def wait_for_image(self, timeout: float):
+        """Waits for an image that has not been pushed yet and marks it as taken.
+
+        Args:
+            timeout (float): Maximum time to wait in seconds.
+
+        Returns:
+            tuple: The image, the capture timestamp of the frame it came from, None if the image did not come
+            from a video frame, and the number of claims so far, to pass to `push`. None if the timeout expired.
+        """
+        with self._image_condition:
+            if not self._image_condition.wait_for(lambda: self._image_pending, timeout):
+                return None
+            # Images set while waiting for the next paced slot replace the pending image
+            delay = self.frame_limiter.delay()
+            while delay > 0:
+                self._image_condition.wait(delay)
+                delay = self.frame_limiter.delay()
+            if not self._image_pending:
+                return None
+            self._image_pending = False
+            return self._image, self._image_timestamp, self._claims
+
+    def claim(self, image: cv.Mat):
+        """Records an image that is being pushed by another worker, such as a `DisplayPair`.
+
+        Any image still pending is discarded, and an image the worker has already taken is dropped
+        when it reaches `push`, so neither can overwrite the claimed image.
+
+        Args:
+            image (cv.Mat): The image being pushed.
+        """
+        with self._image_condition:
+            if self._image_pending:
+                self._coalesced += 1
             self._image = image
-            if self.worker is not None:
-                if self.worker.is_running():
+            self._image_timestamp = None
+            self._image_fingerprint = None
+            self._image_pending = False
+            self._claims += 1
+
+    def push(self, image: cv.Mat, timestamp: float = None, encoded: bool = False, claims: int = None):
+        """Sends an image to the panel.
+
+        Args:
+            image (cv.Mat): The image to send.
+            timestamp (float, optional): Capture timestamp of the frame the image came from. Defaults to None.
+            encoded (bool, optional): Whether the image is already encoded for the panel by `encode_frames`. Defaults to False.
+            claims (int, optional): The number of claims from `wait_for_image`, the image is dropped if the display
+            has been claimed since. Defaults to None, always sending the image.
+        """
+        start = time.perf_counter()
+        with self._push_lock:
+            with self._lock:
+                if claims is not None and claims != self._claims:
+                    self._coalesced += 1
                     return
-            self.worker = DisplayWorker(self)
-            self.worker.start()
+            panel_frame, rectangles = self.prepare_encoded(image) if encoded else self.prepare(image)
+            with self.bus.transfer():
+                for _ in self.transfers(panel_frame, rectangles):
+                    pass
+            self.commit(panel_frame)
+        self.record_push(start, timestamp)
+
+    def prepare(self, image: cv.Mat):
+        """Encodes an image and finds the rectangles of the panel that need to be written.
+
+        Must be called with `push_lock` held, and followed by writing `transfers` to the panel.
+
+        Args:
+            image (cv.Mat): The image to send.
+
+        Returns:
+            tuple: The encoded image as laid out on the panel, and the inclusive (x0, y0, x1, y1) rectangles to write.
+        """
+        return self.prepare_encoded(self._encode(image))
+
+    def prepare_encoded(self, panel_frame: np.ndarray):
+        """Finds the rectangles of the panel that need to be written for an encoded image.
+
+        Must be called with `push_lock` held, and followed by writing `transfers` to the panel.
+
+        Args:
+            panel_frame (np.ndarray): The image encoded for the panel.
+
+        Returns:
+            tuple: The encoded image, and the inclusive (x0, y0, x1, y1) rectangles to write.
+        """
+        rectangles = None
+        if self.partial_updates and self._panel_frame is not None and self._panel_frame.shape == panel_frame.shape:
+            rectangles = find_dirty_rectangles(self._panel_frame, panel_frame)
+            if area(rectangles) > PARTIAL_UPDATE_MAX_AREA * panel_frame.shape[0] * panel_frame.shape[1]:
+                rectangles = None
+
+        if rectangles is None:
+            rectangles = [(0, 0, panel_frame.shape[1] - 1, panel_frame.shape[0] - 1)]
+        return panel_frame, rectangles
+
+    def encode_frames(self, frames: np.ndarray) -> np.ndarray:
+        """Encodes a sequence of images for the panel ahead of time.
+
+        Args:
+            frames (np.ndarray): Images of shape (count, height, width, 3).
+
+        Returns:
+            np.ndarray: Read-only encoded images of shape (count, height, width) as laid out on the panel.
+        """
+        encoder = RGB565Encoder()
+        encoded = np.empty((len(frames), self.diameter, self.diameter), dtype=RGB565)
+        for index, frame in enumerate(frames):
+            if frame.shape[:2] != (self.diameter, self.diameter):
+                frame = cv.resize(frame, (self.diameter, self.diameter))
+            encoder.encode(np.rot90(frame, self.rotation // 90), encoded[index])
+        encoded.flags.writeable = False
+        return encoded
+
+    def play(self, animation) -> int:
+        """Plays an animation, blocking until it has finished.
+
+        Args:
+            animation (Animation): The animation to play.
+
+        Returns:
+            int: Number of frames skipped because the display fell behind.
+        """
+        encoded = animation.encoded(self)
+        self.claim(animation.final)
+        return animation.play(lambda index: self.push(encoded[index], encoded=True))
+
+    def transfers(self, panel_frame: np.ndarray, rectangles: list):
+        """Writes rectangles of an encoded image to the panel, one SPI write at a time.
+
+        The bus must be held while the generator is consumed. Once it is exhausted,
+        `panel_frame` must be stored with `commit`.
+
+        Args:
+            panel_frame (np.ndarray): The encoded image from `prepare`.
+            rectangles (list): The rectangles from `prepare`.
+
+        Yields:
+            int: Number of pixel bytes written by each SPI write.
+        """
+        for x0, y0, x1, y1 in rectangles:
+            pixelbytes = panel_frame[y0:y1 + 1, x0:x1 + 1].tobytes()
+            self.st7798.set_window(x0, y0, x1, y1)
+            yield 0
+            for i in range(0, len(pixelbytes), SPI_CHUNK_SIZE):
+                chunk = pixelbytes[i:i + SPI_CHUNK_SIZE]
+                self.st7798.data(chunk)
+                yield len(chunk)
+
+    def commit(self, panel_frame: np.ndarray):
+        """Records an encoded image as the contents of the panel once it has been written.
+
+        Must be called with `push_lock` held.
+
+        Args:
+            panel_frame (np.ndarray): The encoded image from `prepare`.
+        """
+        self._panel_frame = panel_frame
+
+    @property
+    def push_lock(self):
+        """
+        Get the lock held while an image is prepared and written to the panel.
+        """
+        return self._push_lock
+
+    def record_push(self, start: float, timestamp: float = None):
+        """Records the statistics of an image sent to the panel.
+
+        Args:
+            start (float): `time.perf_counter()` when the push started.
+            timestamp (float, optional): Capture timestamp of the frame the image came from. Defaults to None.
+        """
+        self.push_time.add(time.perf_counter() - start)
+        if timestamp is not None:
+            self.latency.add(time.monotonic() - timestamp)
+        self.frame_limiter.record()
+        with self._lock:
+            self._pushed += 1
+
+    def _encode(self, image: cv.Mat) -> np.ndarray:
+        """Resizes, rotates and encodes an image to the panel's RGB565 wire format.
+
+        Must be called with the push lock held.
+
+        Args:
+            image (cv.Mat): The image to encode.
+
+        Returns:
+            np.ndarray: The encoded image, as it is laid out on the panel.
+        """
+        static = not image.flags.writeable
+        if static:
+            cached = self._encoded_cache.get(id(image))
+            # The cache holds a reference to the image, so its id cannot have been reused
+            if cached is not None and cached[0] is image:
+                self._encoded_cache.move_to_end(id(image))
+                return cached[1]
+
+        frame = image
+        if frame.shape[:2] != (self.diameter, self.diameter):
+            frame = cv.resize(frame, (self.diameter, self.diameter))
+        panel_frame = np.rot90(frame, self.rotation // 90)
+
+        if static:
+            encoded = self._encoder.encode(panel_frame)
+            encoded.flags.writeable = False
+            self._encoded_cache[id(image)] = (image, encoded)
+            if len(self._encoded_cache) > ENCODED_CACHE_SIZE:
+                self._encoded_cache.popitem(last=False)
+            return encoded
+
+        # Double buffered, the buffer holding what is on the panel is kept for comparison
+        if not self._encoded_buffers:
+            self._encoded_buffers = [np.empty(panel_frame.shape[:2], dtype=RGB565) for _ in range(2)]
+        buffer = self._encoded_buffers[0] if self._encoded_buffers[0] is not self._panel_frame else self._encoded_buffers[1]
+        return self._encoder.encode(panel_frame, buffer)
+
+    @property
+    def pushed(self):
+        """
+        Get the number of images sent to the panel.
+        """
+        with self._lock:
+            return self._pushed
+
+    @property
+    def suppressed(self):
+        """
+        Get the number of images that were not sent to the panel because they were identical to the previous image.
+        """
+        with self._lock:
+            return self._suppressed
+
+    @property
+    def coalesced(self):
+        """
+        Get the number of images that were replaced by a newer image before being sent to the panel.
+        """
+        with self._lock:
+            return self._coalesced
+
+    def show_frame(self, frame, layer: str = None):
+        """Displays a video frame, skipping stale frames, frames that have already been shown and
+        frames that arrive faster than the frame rate limit.
+
+        The time from capture to the frame reaching the display is recorded in `latency`.
+
+        Args:
+            frame (VideoFrame): The frame to display.
+            layer (str, optional): Compositor layer to show the frame in, with the other layers over it. Defaults to
+            showing the frame on its own.
+
+        Returns:
+            bool: True if the frame was displayed, False if it was skipped.
+        """
+        with self._lock:
+            if frame.stale or (frame.sequence and frame.sequence == self._frame_sequence):
+                return False
+            self._frame_sequence = frame.sequence
+        if not self.frame_limiter.admit():
+            return False
+        if layer is None:
+            self._set_image(frame.image, frame.timestamp)
+        else:
+            self.compositor.set_layer(layer, frame.image)
+            self.compose(frame.timestamp)
+        return True
+
+    def compose(self, timestamp: float = None):
+        """Displays the composite of the compositor's layers.
+
+        Args:
+            timestamp (float, optional): Capture timestamp of the frame in the layers. Defaults to None.
+        """
+        self._set_image(self.compositor.compose(), timestamp)
 
     def display_number(self, number: int, colour: tuple = (255, 255, 255)):
         """Displays a number on the display.
@@ -87,13 +453,7 @@ class Display(object):
         Args:
             number (int): The number to display.
         """
-        text = str(number)
-        text_size = cv.getTextSize(text, cv.FONT_HERSHEY_SIMPLEX, 3, 3)
-        text_x = (self.diameter - text_size[0][0]) // 2
-        text_y = (self.diameter + text_size[0][1]) // 2
-        blank = Image.new("RGB", (self.diameter, self.diameter), (0, 0, 0))
-        blank = cv.cvtColor(np.asarray(blank), cv.COLOR_RGB2BGR)
-        self.image = cv.putText(blank, text, (text_x, text_y), cv.FONT_HERSHEY_SIMPLEX, 3, colour, 3, cv.LINE_AA)
+        self.image = self.render_cache.render(str(number), colour, self.diameter, cv.FONT_HERSHEY_SIMPLEX, 3, 3)
 
     def display_text(self, text: str, colour: tuple = (255, 255, 255)):
         """Displays text on the display.
@@ -101,38 +461,31 @@ class Display(object):
         Args:
             text (str): The text to display.
         """
-        text_size = cv.getTextSize(text, cv.FONT_HERSHEY_SIMPLEX, 2, 2)
-        text_x = (self.diameter - text_size[0][0]) // 2
-        text_y = (self.diameter + text_size[0][1]) // 2
-        blank = Image.new("RGB", (self.diameter, self.diameter), (0, 0, 0))
-        blank = cv.cvtColor(np.asarray(blank), cv.COLOR_RGB2BGR)
-        self.image = cv.putText(blank, text, (text_x, text_y), cv.FONT_HERSHEY_SIMPLEX, 2, colour, 2, cv.LINE_AA)
+        self.image = self.render_cache.render(text, colour, self.diameter, cv.FONT_HERSHEY_SIMPLEX, 2, 2)
 
     def clear(self):
         """
         Clears the display
         """
-        blank = Image.new("RGB", (self.diameter, self.diameter), (0, 0, 0))
-        blank = cv.cvtColor(np.asarray(blank), cv.COLOR_RGB2BGR)
-        self.image = blank
+        self.image = self.render_cache.render("", (0, 0, 0), self.diameter)
 
 class DisplayWorker(Worker):
+    """
+    Long-lived worker thread that pushes the most recent image to the display.
+    """
 
     def __init__(self, display: Display):
         super().__init__()
-        self.running = True
         self.display = display
 
-    def is_running(self):
-        """
-        Returns whether the worker is running or not.
-        """
-        return self.running
-
     def work(self):
-        if self.display.image is not None:
-                self.display.st7798.display(cv.resize(self.display.image, (self.display.diameter, self.display.diameter)))
-        self.running = False
+        while not self.is_stopped():
+            pending = self.display.wait_for_image(POLL_INTERVAL)
+            if pending is None:
+                continue
+            image, timestamp, claims = pending
+            if image is not None:
+                self.display.push(image, timestamp, claims=claims)
 
 class LeftDisplay(Display):
     """
@@ -0,0 +1,122 @@
+"""
+Layer compositor for the circular displays.
+Author: Benjamin Dodd (1901386)
+"""
+
+import threading
+
+import cv2 as cv
+import numpy as np
+
+# Layers from bottom to top
+LAYERS = ("background", "icon", "overlay")
+
+class Compositor:
+    """
+    Combines the background, icon and overlay layers of a display into one image.
+
+    The background is opaque. Icons and overlays are masked, by default their
+    black pixels are transparent, which suits the text from the render cache.
+
+    The composite of each layer with the layers below it is kept, so only the
+    layers that changed, and the layers above them, are blended again. A new
+    overlay on an unchanged background costs one blend.
+    """
+
+    def __init__(self, diameter: int):
+        self.diameter = diameter
+        self._lock = threading.Lock()
+        self._layers = [None] * len(LAYERS)
+        self._blended = [None] * len(LAYERS)
+        self._dirty = 0
+        self._blends = 0
+        self._black = np.zeros((diameter, diameter, 3), dtype=np.uint8)
+        self._black.flags.writeable = False
+
+    def set_layer(self, layer: str, image: cv.Mat, mask: np.ndarray = None):
+        """Sets the image of a layer.
+
+        Args:
+            layer (str): The layer to set, one of `LAYERS`.
+            image (cv.Mat): BGR image for the layer, resized to the display if needed. None clears the layer.
+            mask (np.ndarray, optional): Boolean mask of the opaque pixels of an icon or overlay. Defaults to the non-black pixels.
+
+        Raises:
+            ValueError: If the layer does not exist.
+        """
+        if layer not in LAYERS:
+            raise ValueError(f"Unknown layer {layer}")
+        index = LAYERS.index(layer)
+        with self._lock:
+            current = self._layers[index]
+            # Read-only images, such as cached renders and assets, cannot have changed
+            if current is not None and current[0] is image and mask is None and not image.flags.writeable:
+                return
+            if image is None and current is None:
+                return
+
+        entry = None
+        if image is not None:
+            source = image
+            if image.shape[:2] != (self.diameter, self.diameter):
+                image = cv.resize(image, (self.diameter, self.diameter))
+            if index > 0:
+                if mask is None:
+                    mask = image.any(axis=2)
+                elif mask.shape != image.shape[:2]:
+                    mask = cv.resize(mask.astype(np.uint8), (self.diameter, self.diameter), interpolation=cv.INTER_NEAREST) > 0
+            entry = (source, image, mask)
+
+        with self._lock:
+            self._layers[index] = entry
+            self._dirty = min(self._dirty, index) if self._dirty is not None else index
+
+    def clear_layer(self, layer: str):
+        """Removes the image of a layer.
+
+        Args:
+            layer (str): The layer to clear, one of `LAYERS`.
+        """
+        self.set_layer(layer, None)
+
+    def clear(self):
+        """
+        Removes the images of every layer.
+        """
+        with self._lock:
+            self._layers = [None] * len(LAYERS)
+            self._dirty = 0
+
+    def compose(self) -> cv.Mat:
+        """Blends the layers that changed since the last composite.
+
+        Returns:
+            cv.Mat: The composite image, the same object as the last composite if no layer changed.
+        """
+        with self._lock:
+            if self._dirty is None:
+                return self._blended[-1]
+
+            below = self._blended[self._dirty - 1] if self._dirty > 0 else self._black
+            for index in range(self._dirty, len(LAYERS)):
+                entry = self._layers[index]
+                if entry is None:
+                    blended = below
+                elif index == 0:
+                    blended = entry[1]
+                else:
+                    blended = below.copy()
+                    np.copyto(blended, entry[1], where=entry[2][..., None])
+                    self._blends += 1
+                self._blended[index] = blended
+                below = blended
+            self._dirty = None
+            return self._blended[-1]
+
+    @property
+    def blends(self):
+        """
+        Get the number of layers blended since the compositor was created.
+        """
+        with self._lock:
+            return self._blends
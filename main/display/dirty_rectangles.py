@@ -0,0 +1,59 @@
+"""
+Finds the rectangles that changed between two frames, so only those are sent to the panel.
+Author: Benjamin Dodd (1901386)
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+MAX_RECTANGLES = 4
+MERGE_GAP = 8
+
+def find_dirty_rectangles(previous: np.ndarray, current: np.ndarray, max_rectangles: int = MAX_RECTANGLES, merge_gap: int = MERGE_GAP) -> List[Tuple[int, int, int, int]]:
+    """Finds the bounding rectangles of the pixels that differ between two frames of the same shape.
+
+    Changed rows are grouped into horizontal bands, bands separated by no more
+    than `merge_gap` unchanged rows are merged, and each band is narrowed to
+    its changed columns. If there would be more than `max_rectangles`
+    rectangles, a single rectangle bounding every change is returned instead.
+
+    Args:
+        previous (np.ndarray): The frame on the panel.
+        current (np.ndarray): The new frame.
+        max_rectangles (int, optional): Maximum number of rectangles. Defaults to MAX_RECTANGLES.
+        merge_gap (int, optional): Largest run of unchanged rows inside one rectangle. Defaults to MERGE_GAP.
+
+    Returns:
+        List[Tuple[int, int, int, int]]: Inclusive (x0, y0, x1, y1) rectangles, empty if the frames are identical.
+    """
+    changed = previous != current
+    if changed.ndim == 3:
+        changed = changed.any(axis=2)
+
+    rows = np.flatnonzero(changed.any(axis=1))
+    if rows.size == 0:
+        return []
+
+    band_starts = np.flatnonzero(np.diff(rows) > merge_gap + 1) + 1
+    bands = np.split(rows, band_starts)
+    if len(bands) > max_rectangles:
+        bands = [rows]
+
+    rectangles = []
+    for band in bands:
+        y0, y1 = int(band[0]), int(band[-1])
+        columns = np.flatnonzero(changed[y0:y1 + 1].any(axis=0))
+        rectangles.append((int(columns[0]), y0, int(columns[-1]), y1))
+    return rectangles
+
+def area(rectangles: List[Tuple[int, int, int, int]]) -> int:
+    """Returns the number of pixels covered by a list of non-overlapping rectangles.
+
+    Args:
+        rectangles (List[Tuple[int, int, int, int]]): Inclusive (x0, y0, x1, y1) rectangles.
+
+    Returns:
+        int: Number of pixels.
+    """
+    return sum((x1 - x0 + 1) * (y1 - y0 + 1) for x0, y0, x1, y1 in rectangles)
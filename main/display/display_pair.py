@@ -0,0 +1,201 @@
+"""
+Paired frame submission for the left and right circular displays.
+Author: Benjamin Dodd (1901386)
+"""
+
+import time
+import threading
+
+import cv2 as cv
+
+from main.display import LOGGER
+from main.display.circular_display import Display, POLL_INTERVAL
+from main.threading.worker_thread import Worker
+from main.util.running_statistics import RunningStatistics
+
+class DisplayPair:
+    """
+    Shows a pair of images, one per eye, so both eyes change together.
+
+    Submitting a pair only replaces the pending pair, pairs submitted while
+    the worker is busy are coalesced. The worker encodes both images before
+    taking the bus, then holds the bus once and interleaves the SPI writes
+    of the two panels, so neither eye finishes a frame far ahead of the
+    other. Both displays are claimed when a pair is submitted, so an older
+    image their own workers are about to push is dropped rather than
+    overwriting the pair. Likewise, playing an animation drops a pair the
+    worker has already taken, so it cannot be drawn over the animation.
+
+    The time from submission until each eye's frame is fully written is
+    recorded in `left_latency` and `right_latency`, and the time between
+    the two eyes finishing in `skew`.
+    """
+
+    def __init__(self, left: Display, right: Display):
+        if left.bus is not right.bus:
+            raise ValueError("Paired displays must share an SPI bus")
+        self.left = left
+        self.right = right
+        self.bus = left.bus
+        self.worker = None
+
+        self._lock = threading.Lock()
+        self._pair_condition = threading.Condition(self._lock)
+        self._pair = None
+        self._pair_pending = False
+        self._submitted = 0.0
+        self._timestamp = None
+        self._generation = 0
+        self._pushed = 0
+        self._coalesced = 0
+        self.left_latency = RunningStatistics(f"{left.__class__.__name__} paired latency")
+        self.right_latency = RunningStatistics(f"{right.__class__.__name__} paired latency")
+        self.skew = RunningStatistics("Paired display skew")
+
+    def submit(self, left_image: cv.Mat, right_image: cv.Mat, timestamp: float = None):
+        """Submits a pair of images to be shown together.
+
+        Args:
+            left_image (cv.Mat): Image for the left display.
+            right_image (cv.Mat): Image for the right display.
+            timestamp (float, optional): Capture timestamp of the frame the images came from. Defaults to None.
+        """
+        self.left.claim(left_image)
+        self.right.claim(right_image)
+        with self._pair_condition:
+            if self._pair_pending:
+                self._coalesced += 1
+            self._pair = (left_image, right_image)
+            self._submitted = time.monotonic()
+            self._timestamp = timestamp
+            self._pair_pending = True
+            self._pair_condition.notify()
+
+            if self.worker is None or not self.worker.is_alive() or self.worker.is_stopped():
+                self.worker = DisplayPairWorker(self)
+                self.worker.start()
+
+    def wait_for_pair(self, timeout: float):
+        """Waits for a pair that has not been pushed yet and marks it as taken.
+
+        Args:
+            timeout (float): Maximum time to wait in seconds.
+
+        Returns:
+            tuple: The left image, right image, submission time, capture timestamp and the generation to pass to
+            `push`. None if the timeout expired.
+        """
+        with self._pair_condition:
+            if not self._pair_condition.wait_for(lambda: self._pair_pending, timeout):
+                return None
+            self._pair_pending = False
+            return self._pair[0], self._pair[1], self._submitted, self._timestamp, self._generation
+
+    def push(self, left_image: cv.Mat, right_image: cv.Mat, submitted: float = None, timestamp: float = None,
+             encoded: bool = False, generation: int = None):
+        """Sends a pair of images to the panels under one hold of the bus.
+
+        Args:
+            left_image (cv.Mat): Image for the left display.
+            right_image (cv.Mat): Image for the right display.
+            submitted (float, optional): `time.monotonic()` when the pair was submitted. Defaults to now.
+            timestamp (float, optional): Capture timestamp of the frame the images came from. Defaults to None.
+            encoded (bool, optional): Whether the images are already encoded by `Display.encode_frames`. Defaults to False.
+            generation (int, optional): The generation from `wait_for_pair`, the pair is dropped if an animation has
+            started playing since. Defaults to None, always sending the pair.
+        """
+        submitted = submitted if submitted is not None else time.monotonic()
+        start = time.perf_counter()
+        with self.left.push_lock, self.right.push_lock:
+            with self._lock:
+                if generation is not None and generation != self._generation:
+                    self._coalesced += 1
+                    return
+            if encoded:
+                left_frame, left_rectangles = self.left.prepare_encoded(left_image)
+                right_frame, right_rectangles = self.right.prepare_encoded(right_image)
+            else:
+                left_frame, left_rectangles = self.left.prepare(left_image)
+                right_frame, right_rectangles = self.right.prepare(right_image)
+            finished = {}
+            with self.bus.transfer():
+                writes = {
+                    self.left: self.left.transfers(left_frame, left_rectangles),
+                    self.right: self.right.transfers(right_frame, right_rectangles)
+                }
+                while writes:
+                    for display, transfers in list(writes.items()):
+                        if next(transfers, None) is None:
+                            del writes[display]
+                            finished[display] = time.monotonic()
+            self.left.commit(left_frame)
+            self.right.commit(right_frame)
+
+        self.left.record_push(start, timestamp)
+        self.right.record_push(start, timestamp)
+        self.left_latency.add(finished[self.left] - submitted)
+        self.right_latency.add(finished[self.right] - submitted)
+        self.skew.add(abs(finished[self.left] - finished[self.right]))
+        with self._lock:
+            self._pushed += 1
+
+    def play(self, left_animation, right_animation) -> int:
+        """Plays an animation on each display, blocking until they have finished.
+
+        Both animations must have the same number of frames, and are played at the rate of the left animation.
+
+        Args:
+            left_animation (Animation): The animation for the left display.
+            right_animation (Animation): The animation for the right display.
+
+        Returns:
+            int: Number of frames skipped because the displays fell behind.
+        """
+        if len(left_animation) != len(right_animation):
+            raise ValueError("Paired animations must have the same number of frames")
+        left_frames = left_animation.encoded(self.left)
+        right_frames = right_animation.encoded(self.right)
+        # Discard any pending pair, and any the worker has already taken, so neither can replace the end of the animation
+        with self._pair_condition:
+            if self._pair_pending:
+                self._coalesced += 1
+            self._pair_pending = False
+            self._generation += 1
+        self.left.claim(left_animation.final)
+        self.right.claim(right_animation.final)
+        return left_animation.play(lambda index: self.push(left_frames[index], right_frames[index], encoded=True))
+
+    @property
+    def pushed(self):
+        """
+        Get the number of pairs sent to the panels.
+        """
+        with self._lock:
+            return self._pushed
+
+    @property
+    def coalesced(self):
+        """
+        Get the number of pairs that were replaced by a newer pair before being sent to the panels.
+        """
+        with self._lock:
+            return self._coalesced
+
+class DisplayPairWorker(Worker):
+    """
+    Long-lived worker thread that pushes the most recent pair of images to the displays.
+    """
+
+    def __init__(self, pair: DisplayPair):
+        super().__init__()
+        self.pair = pair
+
+    def work(self):
+        LOGGER.debug("Display pair worker started")
+        while not self.is_stopped():
+            pending = self.pair.wait_for_pair(POLL_INTERVAL)
+            if pending is None:
+                continue
+            left_image, right_image, submitted, timestamp, generation = pending
+            if left_image is not None and right_image is not None:
+                self.pair.push(left_image, right_image, submitted, timestamp, generation=generation)
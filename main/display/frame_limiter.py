@@ -0,0 +1,158 @@
+"""
+Frame rate limiting and pacing for the circular displays.
+Author: Benjamin Dodd (1901386)
+"""
+
+import math
+import time
+import threading
+
+from main.util.running_statistics import RunningStatistics
+
+class FrameRateLimiter:
+    """
+    Limits how often frames are pushed to a display.
+
+    Without pacing, frames arriving faster than `max_fps` are dropped when
+    they are submitted. Admission follows a grid of slots one frame interval
+    apart, so a source that is not a multiple of the limit still achieves
+    close to `max_fps` on average.
+
+    With pacing, every frame is admitted and the most recent one is held
+    until the next slot, so pushes land on a steady cadence.
+
+    The interval between pushes is recorded in `intervals`, and its
+    difference from the target interval in `jitter`.
+    """
+
+    def __init__(self, max_fps: float = None, pacing: bool = False):
+        self._lock = threading.Lock()
+        self._max_fps = None
+        self._interval = 0.0
+        self.pacing = pacing
+        self._next_slot = None
+        self._last_push = None
+        self._admitted = 0
+        self._dropped = 0
+        self.intervals = RunningStatistics("Push interval")
+        self.jitter = RunningStatistics("Push jitter")
+        self.max_fps = max_fps
+
+    def __str__(self):
+        fps = self.fps
+        return (f"FrameRateLimiter(max_fps={self.max_fps}, pacing={self.pacing}, "
+            f"fps={fps if fps is None else round(fps, 1)}, admitted={self.admitted}, dropped={self.dropped})")
+
+    @property
+    def max_fps(self):
+        """
+        Get the maximum number of frames per second, None if unlimited.
+        """
+        with self._lock:
+            return self._max_fps
+
+    @max_fps.setter
+    def max_fps(self, max_fps: float):
+        """Sets the maximum number of frames per second.
+
+        Args:
+            max_fps (float): Maximum frames per second, None for unlimited.
+        """
+        if max_fps is not None and max_fps <= 0:
+            raise ValueError("max_fps must be positive")
+        with self._lock:
+            self._max_fps = max_fps
+            self._interval = 1 / max_fps if max_fps else 0.0
+            self._next_slot = None
+
+    def admit(self, now: float = None) -> bool:
+        """Decides whether a submitted frame should be kept.
+
+        Args:
+            now (float, optional): `time.monotonic()` of the submission. Defaults to now.
+
+        Returns:
+            bool: True if the frame should be pushed, False if it should be dropped.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._interval and not self.pacing:
+                if self._next_slot is not None and now < self._next_slot:
+                    self._dropped += 1
+                    return False
+                self._next_slot = self._following_slot(now)
+            self._admitted += 1
+            return True
+
+    def delay(self, now: float = None) -> float:
+        """Gets how long a paced frame should be held before it is pushed.
+
+        Args:
+            now (float, optional): `time.monotonic()`. Defaults to now.
+
+        Returns:
+            float: Seconds until the next slot, 0 if the frame can be pushed now or pacing is off.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if not self.pacing or not self._interval or self._next_slot is None:
+                return 0.0
+            return max(0.0, self._next_slot - now)
+
+    def record(self, now: float = None):
+        """Records that a frame was pushed.
+
+        Args:
+            now (float, optional): `time.monotonic()` of the push. Defaults to now.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._last_push is not None:
+                interval = now - self._last_push
+                self.intervals.add(interval)
+                if self._interval:
+                    self.jitter.add(abs(interval - self._interval))
+            self._last_push = now
+            if self.pacing and self._interval:
+                self._next_slot = self._following_slot(now)
+
+    def _following_slot(self, now: float):
+        # Stay on the grid of slots, skipping any slots that have already passed
+        if self._next_slot is None or now - self._next_slot >= self._interval:
+            return now + self._interval
+        return self._next_slot + self._interval * max(1, math.ceil((now - self._next_slot) / self._interval))
+
+    @property
+    def fps(self):
+        """
+        Get the achieved frames per second, or None if fewer than two frames have been pushed.
+        """
+        mean = self.intervals.mean
+        return 1 / mean if mean else None
+
+    @property
+    def admitted(self):
+        """
+        Get the number of frames admitted.
+        """
+        with self._lock:
+            return self._admitted
+
+    @property
+    def dropped(self):
+        """
+        Get the number of frames dropped because they arrived too soon.
+        """
+        with self._lock:
+            return self._dropped
+
+    def reset_statistics(self):
+        """
+        Resets the counters and timing statistics.
+        """
+        with self._lock:
+            self._admitted = 0
+            self._dropped = 0
+            self._last_push = None
+        self.intervals.reset()
+        self.jitter.reset()
@@ -0,0 +1,133 @@
+"""
+Least recently used cache of rendered text for the circular displays.
+Author: Benjamin Dodd (1901386)
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Iterable
+
+import cv2 as cv
+import numpy as np
+
+from main.display import LOGGER
+
+RENDER_CACHE_SIZE = 256
+
+# Numbers shown by the activities, including the zero padded hours and minutes of the clock
+NUMBER_TEXTS = [str(number) for number in range(100)] + [f"{number:02d}" for number in range(10)]
+
+class RenderCache:
+    """
+    Least recently used cache of text rendered onto a blank display sized image.
+
+    Rendered images are read-only so the same buffer can be pushed to the
+    displays any number of times.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+    _initialized = False
+
+    def __new__(cls, max_size: int = RENDER_CACHE_SIZE):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, max_size: int = RENDER_CACHE_SIZE):
+        if not self._initialized:
+            self.max_size = max_size
+            self._lock = threading.Lock()
+            self._renders = OrderedDict()
+            self._hits = 0
+            self._misses = 0
+            self._initialized = True
+
+    def __len__(self):
+        with self._lock:
+            return len(self._renders)
+
+    def __str__(self):
+        return f"RenderCache({len(self)}/{self.max_size}, hits={self.hits}, misses={self.misses})"
+
+    def render(self, text: str, colour: tuple, diameter: int, font: int = cv.FONT_HERSHEY_SIMPLEX, scale: float = 3, thickness: int = 3):
+        """Gets the text rendered in the centre of a black display sized image.
+
+        Args:
+            text (str): The text to render.
+            colour (tuple): BGR colour of the text.
+            diameter (int): Width and height of the image.
+            font (int, optional): OpenCV font. Defaults to cv.FONT_HERSHEY_SIMPLEX.
+            scale (float, optional): Font scale. Defaults to 3.
+            thickness (int, optional): Line thickness. Defaults to 3.
+
+        Returns:
+            cv.Mat: Read-only BGR image of the rendered text.
+        """
+        key = (text, tuple(colour), font, scale, thickness, diameter)
+        with self._lock:
+            image = self._renders.get(key)
+            if image is not None:
+                self._renders.move_to_end(key)
+                self._hits += 1
+                return image
+            self._misses += 1
+
+        image = np.zeros((diameter, diameter, 3), dtype=np.uint8)
+        if text:
+            text_size = cv.getTextSize(text, font, scale, thickness)
+            text_x = (diameter - text_size[0][0]) // 2
+            text_y = (diameter + text_size[0][1]) // 2
+            cv.putText(image, text, (text_x, text_y), font, scale, tuple(colour), thickness, cv.LINE_AA)
+        image.flags.writeable = False
+
+        with self._lock:
+            image = self._renders.setdefault(key, image)
+            self._renders.move_to_end(key)
+            while len(self._renders) > self.max_size:
+                self._renders.popitem(last=False)
+        return image
+
+    def prewarm(self, texts: Iterable[str], colour: tuple, diameter: int, font: int = cv.FONT_HERSHEY_SIMPLEX, scale: float = 3, thickness: int = 3):
+        """Renders text ahead of time so the first display of each text is a cache hit.
+
+        Args:
+            texts (Iterable[str]): The texts to render.
+            colour (tuple): BGR colour of the text.
+            diameter (int): Width and height of the image.
+            font (int, optional): OpenCV font. Defaults to cv.FONT_HERSHEY_SIMPLEX.
+            scale (float, optional): Font scale. Defaults to 3.
+            thickness (int, optional): Line thickness. Defaults to 3.
+        """
+        count = 0
+        for text in texts:
+            self.render(text, colour, diameter, font, scale, thickness)
+            count += 1
+        LOGGER.debug("Pre-rendered %d texts", count)
+
+    def clear(self):
+        """
+        Discards every cached render and resets the statistics.
+        """
+        with self._lock:
+            self._renders.clear()
+            self._hits = 0
+            self._misses = 0
+
+    @property
+    def hits(self):
+        """
+        Get the number of renders served from the cache.
+        """
+        with self._lock:
+            return self._hits
+
+    @property
+    def misses(self):
+        """
+        Get the number of renders that were not in the cache.
+        """
+        with self._lock:
+            return self._misses
@@ -0,0 +1,69 @@
+"""
+Vectorised conversion of 8-bit, 3 channel images to the RGB565 wire format of the ST7789.
+Author: Benjamin Dodd (1901386)
+"""
+
+import numpy as np
+
+# Big-endian 16-bit pixels, the byte order the ST7789 expects
+RGB565 = np.dtype(">u2")
+
+class RGB565Encoder:
+    """
+    Encodes 8-bit, 3 channel images to RGB565 using preallocated scratch buffers.
+
+    The first channel is packed into the top five bits, the same as the
+    Pimoroni ST7789 driver's `image_to_data`, so encoded images look the
+    same as images converted by the driver.
+
+    Not thread-safe, each thread should use its own encoder.
+    """
+
+    def __init__(self):
+        self._shape = None
+        self._high = None
+        self._low = None
+
+    def _scratch(self, shape):
+        if self._shape != shape:
+            self._shape = shape
+            self._high = np.empty(shape, dtype=np.uint16)
+            self._low = np.empty(shape, dtype=np.uint16)
+        return self._high, self._low
+
+    def encode(self, image: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """Encodes an image to RGB565.
+
+        Args:
+            image (np.ndarray): Image of shape (height, width, 3) and type uint8.
+            out (np.ndarray, optional): Array of shape (height, width) and type RGB565 to write to. Defaults to a new array.
+
+        Returns:
+            np.ndarray: The encoded image, `out` if it was given.
+        """
+        shape = image.shape[:2]
+        if out is None:
+            out = np.empty(shape, dtype=RGB565)
+        high, low = self._scratch(shape)
+
+        np.bitwise_and(image[..., 0], 0xF8, out=high)
+        np.left_shift(high, 8, out=high)
+        np.bitwise_and(image[..., 1], 0xFC, out=low)
+        np.left_shift(low, 3, out=low)
+        np.bitwise_or(high, low, out=high)
+        np.right_shift(image[..., 2], 3, out=low)
+        np.bitwise_or(high, low, out=high)
+
+        out[...] = high
+        return out
+
+def encode_rgb565(image: np.ndarray) -> np.ndarray:
+    """Encodes an image to a new RGB565 array.
+
+    Args:
+        image (np.ndarray): Image of shape (height, width, 3) and type uint8.
+
+    Returns:
+        np.ndarray: The encoded image of shape (height, width) and type RGB565.
+    """
+    return RGB565Encoder().encode(image)
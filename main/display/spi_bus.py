@@ -0,0 +1,99 @@
+"""
+Arbiter for an SPI port shared by several displays.
+Author: Benjamin Dodd (1901386)
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+
+from main.util.running_statistics import RunningStatistics
+
+class SPIBus:
+    """
+    Serialises the transfers of every display on one SPI port.
+
+    Both circular displays share port 0 and the DC pin, with separate chip
+    selects, so only one of them may be written to at a time. Transfers hold
+    the bus for their duration, holds are reentrant so a paired transfer can
+    hold the bus across the writes of both displays.
+
+    There is one instance per port.
+    """
+
+    _instances = {}
+    _instance_lock = threading.Lock()
+    _initialized = False
+
+    def __new__(cls, port: int):
+        with cls._instance_lock:
+            if port not in cls._instances:
+                cls._instances[port] = super().__new__(cls)
+            return cls._instances[port]
+
+    def __init__(self, port: int):
+        if not self._initialized:
+            self.port = port
+            self._bus_lock = threading.RLock()
+            self._depth = 0
+            self._lock = threading.Lock()
+            self._since = time.monotonic()
+            self._busy_time = 0.0
+            self._transfers = 0
+            self.wait_time = RunningStatistics(f"SPI{port} wait")
+            self.hold_time = RunningStatistics(f"SPI{port} hold")
+            self._initialized = True
+
+    def __str__(self):
+        return f"SPIBus(port={self.port}, transfers={self.transfers}, utilisation={self.utilisation:.1%})"
+
+    @contextmanager
+    def transfer(self):
+        """
+        Holds the bus for the duration of the block, waiting for other transfers to finish.
+        """
+        requested = time.perf_counter()
+        with self._bus_lock:
+            self._depth += 1
+            outermost = self._depth == 1
+            start = time.perf_counter()
+            if outermost:
+                self.wait_time.add(start - requested)
+            try:
+                yield self
+            finally:
+                self._depth -= 1
+                if outermost:
+                    held = time.perf_counter() - start
+                    self.hold_time.add(held)
+                    with self._lock:
+                        self._busy_time += held
+                        self._transfers += 1
+
+    @property
+    def transfers(self):
+        """
+        Get the number of times the bus was held since the statistics were reset.
+        """
+        with self._lock:
+            return self._transfers
+
+    @property
+    def utilisation(self):
+        """
+        Get the fraction of time the bus was held since the statistics were reset.
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self._since
+            return self._busy_time / elapsed if elapsed > 0 else 0.0
+
+    def reset_statistics(self):
+        """
+        Resets the utilisation and timing statistics.
+        """
+        with self._lock:
+            self._since = time.monotonic()
+            self._busy_time = 0.0
+            self._transfers = 0
+        self.wait_time.reset()
+        self.hold_time.reset()
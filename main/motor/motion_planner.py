@@ -0,0 +1,67 @@
+"""
+Trapezoidal motion profiles for stepper motor moves.
+Author: Benjamin Dodd (1901386)
+"""
+
+import numpy as np
+
+class MotionPlanner:
+    """
+    Plans the delay before each phase of a move, so the motor accelerates
+    from a start rate it can always reach without stalling, cruises, and
+    decelerates back to the start rate at the end of the move.
+
+    Rates are in phases per second and the acceleration in phases per second
+    squared. Moves too short to reach the cruise rate accelerate for half the
+    move and decelerate for the other half. With no acceleration every phase
+    takes the cruise interval.
+    """
+
+    def __init__(self, start_interval: float, cruise_interval: float = None, acceleration: float = None):
+        """Create a new motion planner.
+
+        Args:
+            start_interval (float): Time of the first and last phase of a move in seconds.
+            cruise_interval (float, optional): Time of each phase at cruise speed in seconds. Defaults to start_interval.
+            acceleration (float, optional): Acceleration in phases per second squared. Defaults to none, a constant speed.
+        """
+        cruise_interval = cruise_interval if cruise_interval is not None else start_interval
+        if start_interval <= 0 or cruise_interval <= 0:
+            raise ValueError("Phase intervals must be positive")
+        if acceleration is not None and acceleration <= 0:
+            raise ValueError("Acceleration must be positive")
+        self.start_interval = max(start_interval, cruise_interval)
+        self.cruise_interval = cruise_interval
+        self.acceleration = acceleration
+
+    def __repr__(self):
+        return f"MotionPlanner({self.start_interval}, {self.cruise_interval}, {self.acceleration})"
+
+    def plan(self, phases: int) -> np.ndarray:
+        """Plans the delays of a move.
+
+        Args:
+            phases (int): Number of phases in the move.
+
+        Returns:
+            np.ndarray: The time to hold each phase for in seconds.
+        """
+        if self.acceleration is None or self.start_interval == self.cruise_interval:
+            return np.full(phases, self.cruise_interval)
+
+        index = np.arange(phases)
+        # Distance from the nearest end of the move, the rate reachable there is sqrt(v0^2 + 2as)
+        distance = np.minimum(index, phases - 1 - index)
+        rates = np.sqrt((1 / self.start_interval) ** 2 + 2 * self.acceleration * distance)
+        return 1 / np.minimum(rates, 1 / self.cruise_interval)
+
+    def duration(self, phases: int) -> float:
+        """Gets the time a move takes.
+
+        Args:
+            phases (int): Number of phases in the move.
+
+        Returns:
+            float: Duration of the move in seconds.
+        """
+        return float(self.plan(phases).sum())
@@ -0,0 +1,92 @@
+"""
+Deadline based timing for stepper motor steps.
+Author: Benjamin Dodd (1901386)
+"""
+
+import time
+from typing import Callable
+
+from main.util.running_statistics import RunningStatistics
+
+# Sleeping overshoots by up to around a millisecond, so the end of each wait is spent busy waiting
+SPIN_TIME = 0.0005
+
+def sleep_until(deadline: float, spin_time: float = SPIN_TIME):
+    """Waits until a `time.perf_counter()` deadline.
+
+    Sleeps until shortly before the deadline, then busy waits for the rest.
+
+    Args:
+        deadline (float): `time.perf_counter()` to wait until.
+        spin_time (float, optional): Time before the deadline to busy wait for. Defaults to SPIN_TIME.
+    """
+    remaining = deadline - time.perf_counter()
+    if remaining > spin_time:
+        time.sleep(remaining - spin_time)
+    while time.perf_counter() < deadline:
+        pass
+
+class StepTimer:
+    """
+    Schedules steps against absolute deadlines, so overshoot on one step
+    does not delay every step after it.
+
+    Each deadline is the previous deadline plus the interval of the step,
+    not the time the previous wait ended. If the steps fall more than one
+    interval behind, for example while the thread was not scheduled, the
+    schedule restarts from the current time instead of rushing to catch up.
+
+    The measured interval between steps is recorded in `intervals`, and its
+    difference from the requested interval in `jitter`.
+    """
+
+    def __init__(self, name: str = "Stepper motor", clock: Callable[[], float] = time.perf_counter,
+            wait_until: Callable[[float], None] = sleep_until):
+        """Create a new step timer.
+
+        Args:
+            name (str, optional): Name used in the statistics. Defaults to "Stepper motor".
+            clock (Callable[[], float], optional): Returns the current time in seconds. Defaults to time.perf_counter.
+            wait_until (Callable[[float], None], optional): Waits until a time of `clock`. Defaults to sleep_until.
+        """
+        self.clock = clock
+        self.wait_until = wait_until
+        self.intervals = RunningStatistics(f"{name} step interval")
+        self.jitter = RunningStatistics(f"{name} step jitter")
+        self._deadline = None
+        self._last_step = None
+
+    def start(self):
+        """
+        Starts a new schedule from the current time.
+        """
+        self._deadline = self.clock()
+        self._last_step = None
+
+    def wait(self, interval: float):
+        """Waits until the deadline of the next step.
+
+        Args:
+            interval (float): Time between the previous step and the next step in seconds.
+        """
+        if self._deadline is None:
+            self.start()
+        self._deadline += interval
+        now = self.clock()
+        if now - self._deadline > interval:
+            self._deadline = now
+        self.wait_until(self._deadline)
+
+        step = self.clock()
+        if self._last_step is not None:
+            measured = step - self._last_step
+            self.intervals.add(measured)
+            self.jitter.add(abs(measured - interval))
+        self._last_step = step
+
+    def reset_statistics(self):
+        """
+        Discards the measured intervals.
+        """
+        self.intervals.reset()
+        self.jitter.reset()
@@ -8,6 +8,7 @@ Author: Benjamin Dodd (1901386)
 """
 
 import time
+import threading
 from enum import Enum
 
 from main.motor import LOGGER
@@ -17,11 +18,15 @@ try:
 except ImportError:
     from main.util.mock_gpio import MockGPIO as GPIO
 
-from main.util.storable_type import StorableType
+from main.util.storable_type import StorableCounter
+from main.motor.step_timing import StepTimer
+from main.motor.motion_planner import MotionPlanner
 from main.threading.worker_manager import WorkerManager
 from main.threading.worker_thread import Worker
 
+# Coil states of in1 to in4 for each phase of a step
 CLOCKWISE = [[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]
+ANTICLOCKWISE = CLOCKWISE[::-1]
 
 class StepperMotorDirection(Enum):
     """Enum for the direction of a stepper motor."""
@@ -33,19 +38,49 @@ class StepperMotor:
     Driver class for stepper motors.
     """
 
-    def __init__(self, in1: int = 17, in2: int = 27, in3: int = 22, in4: int = 23, speed: float = 0.0005):
-        """Create a new instance of the StepperMotor class."""
+    def __init__(self, in1: int = 17, in2: int = 27, in3: int = 22, in4: int = 23, speed: float = 0.0005,
+            cruise_speed: float = None, acceleration: float = None):
+        """Create a new instance of the StepperMotor class.
+
+        Moves start and end at `speed`. With an `acceleration`, in phases per second squared, moves
+        accelerate to `cruise_speed` and decelerate again before they end.
+
+        Raises:
+            ValueError: If `cruise_speed` is given without an `acceleration`, as every phase would be held for the
+            cruise speed and the motor would start faster than it can without stalling.
+        """
+        if cruise_speed is not None and acceleration is None:
+            raise ValueError("A cruise speed needs an acceleration to ramp up to it")
         self.in1 = in1
         self.in2 = in2
         self.in3 = in3
         self.in4 = in4
         self.speed = speed if speed >= 0.0005 else 0.0005
-        self.steps = StorableType("stepper_motor_steps", 0)
+        self.steps = StorableCounter("stepper_motor_steps", 0)
+        self.step_timer = StepTimer()
+        self.planner = MotionPlanner(self.phase_interval, 4 * cruise_speed if cruise_speed else None, acceleration)
+        # Held while stepping, so a new move waits for the stopped move to finish its step
+        self.step_lock = threading.Lock()
 
         self.worker = None
         self.setup()
         self.rotate_to(0)
 
+    @property
+    def pins(self):
+        """
+        Get the pins of the four coils, in1 to in4.
+        """
+        return (self.in1, self.in2, self.in3, self.in4)
+
+    @property
+    def phase_interval(self):
+        """
+        Get the time each phase is held for at the start and end of a move, the time the four coil writes of a phase
+        used to sleep for.
+        """
+        return 4 * self.speed
+
     def setup(self):
         """
         Set up the GPIO pins for the stepper motor.
@@ -114,38 +149,40 @@ class StepperMotorWorker(Worker):
         self.motor = motor
         self.direction = direction
         self.steps = steps
+        self.delays = motor.planner.plan(steps * len(CLOCKWISE)).tolist()
 
     def clockwise(self):
         """
         Step the stepper motor clockwise.
         """
-        for _ in range(self.steps):
-            for step in CLOCKWISE:
-                GPIO.output(self.motor.in1, step[0])
-                time.sleep(self.motor.speed)
-                GPIO.output(self.motor.in2, step[1])
-                time.sleep(self.motor.speed)
-                GPIO.output(self.motor.in3, step[2])
-                time.sleep(self.motor.speed)
-                GPIO.output(self.motor.in4, step[3])
-                time.sleep(self.motor.speed)
-            self.motor.steps.value += 1
+        self.step(CLOCKWISE, self.motor.steps.increment)
 
     def anticlockwise(self):
         """
         Step the stepper motor anticlockwise.
         """
-        for _ in range(self.steps):
-            for step in CLOCKWISE[::-1]:
-                GPIO.output(self.motor.in4, step[0])
-                time.sleep(self.motor.speed)
-                GPIO.output(self.motor.in3, step[1])
-                time.sleep(self.motor.speed)
-                GPIO.output(self.motor.in2, step[2])
-                time.sleep(self.motor.speed)
-                GPIO.output(self.motor.in1, step[3])
-                time.sleep(self.motor.speed)
-            self.motor.steps.value -= 1
+        self.step(ANTICLOCKWISE, self.motor.steps.decrement)
+
+    def step(self, phases: list, count):
+        """Steps the stepper motor, writing the four coils of each phase together at its deadline
+        and holding each phase for its planned delay.
+
+        Args:
+            phases (list): Coil states of in1 to in4 for each phase of a step.
+            count (Callable[[], int]): Updates the step count after each step.
+        """
+        pins = self.motor.pins
+        delays = iter(self.delays)
+        timer = self.motor.step_timer
+        with self.motor.step_lock:
+            timer.start()
+            for _ in range(self.steps):
+                if self.is_stopped():
+                    break
+                for phase in phases:
+                    GPIO.output(pins, phase)
+                    timer.wait(next(delays))
+                count()
 
     def work(self):
         """
@@ -154,10 +191,14 @@ class StepperMotorWorker(Worker):
         if self.running:
             return
         self.running = True
-        if self.direction == StepperMotorDirection.TURN_CLOCKWISE:
-            self.clockwise()
-        elif self.direction == StepperMotorDirection.TURN_ANTICLOCKWISE:
-            self.anticlockwise()
+        try:
+            if self.direction == StepperMotorDirection.TURN_CLOCKWISE:
+                self.clockwise()
+            elif self.direction == StepperMotorDirection.TURN_ANTICLOCKWISE:
+                self.anticlockwise()
+        finally:
+            # Save the position reached once the move ends
+            self.motor.steps.flush()
         self.running = False
 
 
@@ -4,50 +4,74 @@ Author: Benjamin Dodd (1901386)
 """
 
 import sys
-from os import path
-import cv2 as cv
 
 from main import LOGGER, IS_RASPBERRY_PI, ARGS
 
-from main.button.button import Button
-from main.motor.stepper_motor import StepperMotor
-from main.display.circular_display import LeftDisplay, RightDisplay
-from main.camera.video_feed import VideoFeed
-from main.camera.gesture_detection import GestureDetection
-from main.camera.emotion_detection import EmotionDetection
-
-from main.activities.clock import ClockActivity
-from main.activities.emotion_reaction import EmotionReactionActivity
-from main.activities.number_guessing import NumberGuessingActivity
-from main.activities.activity_selector import ActivitySelector
+from main.util.startup_timer import StartupTimer
+
+STARTUP_TIMER = StartupTimer()
+
+with STARTUP_TIMER.measure("import main.button"):
+    from main.button.button import Button
+with STARTUP_TIMER.measure("import main.motor"):
+    from main.motor.stepper_motor import StepperMotor
+with STARTUP_TIMER.measure("import main.display"):
+    from main.display.circular_display import LeftDisplay, RightDisplay
+    from main.display.asset_manager import AssetManager
+    from main.display.render_cache import RenderCache, NUMBER_TEXTS
+with STARTUP_TIMER.measure("import main.camera"):
+    from main.camera.video_feed import VideoFeed
+    from main.camera.gesture_detection import GestureDetection
+    from main.camera.emotion_detection import EmotionDetection
+    from main.camera.perception_pipeline import PerceptionPipeline
+
+with STARTUP_TIMER.measure("import main.activities"):
+    from main.activities.clock import ClockActivity
+    from main.activities.emotion_reaction import EmotionReactionActivity
+    from main.activities.number_guessing import NumberGuessingActivity
+    from main.activities.activity_selector import ActivitySelector
 
 from main.threading.worker_manager import WorkerManager
 from main.threading.worker_thread import Worker
-
-ACTIVITY_IMAGE_PATH = path.join("res", "activity")
+from main.util.variable_store import VariableStore
+from main.util.variable_storage import JournalStorage
 
 WORKER_MANAGER = WorkerManager()
 
 Worker.set_manager(WORKER_MANAGER)
 
+# Stepper motor steps are saved in the background instead of on every step, to a journal that survives power cuts
+VARIABLE_STORE = VariableStore(JournalStorage())
+VARIABLE_STORE.enable_write_behind()
+
 BUTTON = Button("main", 13)
-STEPPER_MOTOR = StepperMotor()
+# Head turns ramp up to twice the start speed
+STEPPER_MOTOR = StepperMotor(cruise_speed=0.00025, acceleration=4000)
 
 LEFT_DISPLAY = LeftDisplay()
 RIGHT_DISPLAY = RightDisplay()
 
+ASSET_MANAGER = AssetManager(memory_map=IS_RASPBERRY_PI)
+with STARTUP_TIMER.measure("load assets"):
+    ASSET_MANAGER.load(LEFT_DISPLAY.diameter)
+
+RENDER_CACHE = RenderCache()
+with STARTUP_TIMER.measure("pre-render numbers"):
+    RENDER_CACHE.prewarm(NUMBER_TEXTS, (255, 255, 255), LEFT_DISPLAY.diameter)
+
 VIDEO_FEED = VideoFeed()
+PERCEPTION_PIPELINE = PerceptionPipeline()
 GESTURE_DETECTION = GestureDetection()
 EMOTION_DETECTION = EmotionDetection()
 
-CLOCK_ACTIVITY_IMAGE = cv.imread(path.join(ACTIVITY_IMAGE_PATH, "clock.png"))
+CLOCK_ACTIVITY_IMAGE = ASSET_MANAGER.get("activity/clock", RIGHT_DISPLAY.diameter)
 CLOCK_ACTIVITY = ClockActivity(LEFT_DISPLAY, RIGHT_DISPLAY, BUTTON)
 CLOCK_ACTIVITY.image = CLOCK_ACTIVITY_IMAGE
-EMOTION_REACTION_ACTIVITY_IMAGE = cv.imread(path.join(ACTIVITY_IMAGE_PATH, "emotion_reaction.png"))
-EMOTION_REACTION_ACTIVITY = EmotionReactionActivity(LEFT_DISPLAY, RIGHT_DISPLAY, EMOTION_DETECTION, VIDEO_FEED, STEPPER_MOTOR)
+EMOTION_REACTION_ACTIVITY_IMAGE = ASSET_MANAGER.get("activity/emotion_reaction", RIGHT_DISPLAY.diameter)
+EMOTION_REACTION_ACTIVITY = EmotionReactionActivity(LEFT_DISPLAY, RIGHT_DISPLAY, EMOTION_DETECTION, PERCEPTION_PIPELINE, STEPPER_MOTOR)
 EMOTION_REACTION_ACTIVITY.image = EMOTION_REACTION_ACTIVITY_IMAGE
-NUMBER_GUESSING_ACTIVITY_IMAGE = cv.imread(path.join(ACTIVITY_IMAGE_PATH, "number_guessing.png"))
-NUMBER_GUESSING_ACTIVITY = NumberGuessingActivity(LEFT_DISPLAY, RIGHT_DISPLAY, VIDEO_FEED, GESTURE_DETECTION)
+NUMBER_GUESSING_ACTIVITY_IMAGE = ASSET_MANAGER.get("activity/number_guessing", RIGHT_DISPLAY.diameter)
+NUMBER_GUESSING_ACTIVITY = NumberGuessingActivity(LEFT_DISPLAY, RIGHT_DISPLAY, PERCEPTION_PIPELINE, GESTURE_DETECTION)
 NUMBER_GUESSING_ACTIVITY.image = NUMBER_GUESSING_ACTIVITY_IMAGE
 
 ACTIVITIES = [CLOCK_ACTIVITY, EMOTION_REACTION_ACTIVITY, NUMBER_GUESSING_ACTIVITY]
@@ -58,9 +82,15 @@ def raspberry_pi_main():
     Main function to run the application
     """
     LOGGER.info("Starting application on Raspberry Pi")
+    STARTUP_TIMER.report()
     ACTIVITY_SELECTOR.start()
     LOGGER.info("Application started on Raspberry Pi")
     ACTIVITY_SELECTOR.join()
+    STARTUP_TIMER.report()
+    LOGGER.info("%s", RENDER_CACHE)
+    LOGGER.info("%s", ASSET_MANAGER)
+    LOGGER.info("%s", LEFT_DISPLAY.bus)
+    LOGGER.info("%s", RIGHT_DISPLAY.frame_limiter)
     WORKER_MANAGER.stop_all_workers()
     LOGGER.info("Application stopped on Raspberry Pi")
 
@@ -0,0 +1,28 @@
+"""
+Helper for bounded queues that keep the most recent items.
+Author: Benjamin Dodd (1901386)
+"""
+
+import queue
+
+def put_latest(items: queue.Queue, item) -> int:
+    """Puts an item on a bounded queue, discarding the oldest items to make room for it.
+
+    Args:
+        items (queue.Queue): The queue to put the item on.
+        item: The item to put.
+
+    Returns:
+        int: Number of items discarded.
+    """
+    dropped = 0
+    while True:
+        try:
+            items.put_nowait(item)
+            return dropped
+        except queue.Full:
+            try:
+                items.get_nowait()
+                dropped += 1
+            except queue.Empty:
+                pass
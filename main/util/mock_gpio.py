@@ -3,6 +3,7 @@ Mock GPIO class for testing purposes on Windows
 Author: Benjamin Dodd (1901386)
 """
 
+import time
 from random import choice
 
 from main.util import LOGGER
@@ -21,6 +22,9 @@ class MockGPIO:
     PUD_UP = "PUD_UP"
     PUD_DOWN = "PUD_DOWN"
 
+    # (time.perf_counter(), pin, value) of every output while recording, None when not recording
+    recording = None
+
     @classmethod
     def setwarnings(cls, enabled: bool):
         """Enable or disable GPIO warnings.
@@ -51,16 +55,41 @@ class MockGPIO:
         LOGGER.debug("MockGPIO.setup(%s, %s, %s, %s)", pin, mode, initial, pull_up_down)
 
     @classmethod
-    def output(cls, pin: int, value: str):
-        """Set the state of a GPIO pin.
+    def output(cls, pin, value):
+        """Set the state of one or more GPIO pins.
 
         Args:
-            pin (int): The pin number.
-            value (str): The state to set the pin to. Must be either MockGPIO.LOW or MockGPIO.HIGH.
+            pin (int | list): The pin number, or a list or tuple of pin numbers.
+            value (str | list): The state to set the pin to, either MockGPIO.LOW or MockGPIO.HIGH, or a list or tuple
+            with a state for each pin.
         """
-        pass
+        recording = cls.recording
+        if recording is not None:
+            now = time.perf_counter()
+            if isinstance(pin, (list, tuple)):
+                values = value if isinstance(value, (list, tuple)) else [value] * len(pin)
+                recording.extend((now, channel, state) for channel, state in zip(pin, values))
+            else:
+                recording.append((now, pin, value))
         # LOGGER.debug("MockGPIO.output(%s, %s)", pin, value)
 
+    @classmethod
+    def start_recording(cls):
+        """
+        Start recording the time, pin and value of every output.
+        """
+        cls.recording = []
+
+    @classmethod
+    def stop_recording(cls) -> list:
+        """Stop recording outputs.
+
+        Returns:
+            list: The (time.perf_counter(), pin, value) of each output since recording started.
+        """
+        recording, cls.recording = cls.recording, None
+        return recording or []
+
     @classmethod
     def input(cls, pin: int) -> str:
         """Read the state of a GPIO pin.
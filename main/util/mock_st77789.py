@@ -2,9 +2,15 @@
 Mock ST7789 class for testing purposes on Windows
 Author: Benjamin Dodd (1901386)
 """
+import numpy as np
+
 class ST7789(object):
+    """
+    Mock of the Pimoroni ST7789 driver that records the data sent to the panel instead of sending it.
+    """
 
-    def __init__(self, height, rotation, port, cs, dc, backlight, spi_speed_hz, offset_left, offset_top):
+    def __init__(self, height, rotation, port, cs, dc, backlight, spi_speed_hz, offset_left, offset_top, width=240):
+        self.width = width
         self.height = height
         self.rotation = rotation
         self.port = port
@@ -15,8 +21,52 @@ class ST7789(object):
         self.offset_left = offset_left
         self.offset_top = offset_top
 
+        self.bytes_transferred = 0
+        self.windows_written = 0
+        self.window = None
+
+    def reset_statistics(self):
+        """
+        Resets the recorded transfer statistics.
+        """
+        self.bytes_transferred = 0
+        self.windows_written = 0
+
+    def set_window(self, x0=0, y0=0, x1=None, y1=None):
+        """
+        Set the pixel address window for the next data write.
+        """
+        if x1 is None:
+            x1 = self.width - 1
+        if y1 is None:
+            y1 = self.height - 1
+        self.window = (x0, y0, x1, y1)
+        self.windows_written += 1
+
+    def data(self, data):
+        """
+        Write data to the panel.
+        """
+        self.bytes_transferred += len(data)
+
+    def image_to_data(self, image, rotation=0):
+        """
+        Convert an RGB image to the RGB565 bytes sent to the panel.
+        """
+        if not isinstance(image, np.ndarray):
+            image = np.array(image.convert('RGB'))
+        pb = np.rot90(image, rotation // 90).astype('uint16')
+        red = (pb[..., [0]] & 0xf8) << 8
+        green = (pb[..., [1]] & 0xfc) << 3
+        blue = (pb[..., [2]] & 0xf8) >> 3
+        result = red | green | blue
+        return result.byteswap().tobytes()
+
     def display(self, image):
         """
         Display an image on the ST7789.
         """
-        return
+        self.set_window()
+        pixelbytes = self.image_to_data(image, self.rotation)
+        for i in range(0, len(pixelbytes), 4096):
+            self.data(pixelbytes[i:i + 4096])
@@ -0,0 +1,102 @@
+"""
+Thread-safe running statistics for latency and timing measurements.
+Author: Benjamin Dodd (1901386)
+"""
+
+import math
+from threading import Lock
+
+class RunningStatistics:
+    """
+    Keeps the count, mean, standard deviation, minimum and maximum of a series
+    of samples without storing the samples themselves.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Discards all samples.
+        """
+        with self._lock:
+            self._count = 0
+            self._mean = 0.0
+            self._squared_distance = 0.0
+            self._minimum = None
+            self._maximum = None
+            self._last = None
+
+    def add(self, value: float):
+        """Adds a sample.
+
+        Args:
+            value (float): Sample to add.
+        """
+        with self._lock:
+            self._count += 1
+            delta = value - self._mean
+            self._mean += delta / self._count
+            self._squared_distance += delta * (value - self._mean)
+            self._minimum = value if self._minimum is None else min(self._minimum, value)
+            self._maximum = value if self._maximum is None else max(self._maximum, value)
+            self._last = value
+
+    @property
+    def count(self):
+        """
+        Get the number of samples.
+        """
+        with self._lock:
+            return self._count
+
+    @property
+    def mean(self):
+        """
+        Get the mean of the samples, or None if there are no samples.
+        """
+        with self._lock:
+            return self._mean if self._count > 0 else None
+
+    @property
+    def standard_deviation(self):
+        """
+        Get the population standard deviation of the samples, or None if there are no samples.
+        """
+        with self._lock:
+            return math.sqrt(self._squared_distance / self._count) if self._count > 0 else None
+
+    @property
+    def minimum(self):
+        """
+        Get the smallest sample, or None if there are no samples.
+        """
+        with self._lock:
+            return self._minimum
+
+    @property
+    def maximum(self):
+        """
+        Get the largest sample, or None if there are no samples.
+        """
+        with self._lock:
+            return self._maximum
+
+    @property
+    def last(self):
+        """
+        Get the most recent sample, or None if there are no samples.
+        """
+        with self._lock:
+            return self._last
+
+    def __str__(self):
+        if self.count == 0:
+            return f"{self.name}: no samples"
+        return (f"{self.name}: {self.count} samples, mean {self.mean * 1000:.2f} ms, "
+            f"std {self.standard_deviation * 1000:.2f} ms, min {self.minimum * 1000:.2f} ms, max {self.maximum * 1000:.2f} ms")
+
+    def __repr__(self):
+        return f"RunningStatistics({self.name}, {self.count})"
@@ -0,0 +1,73 @@
+"""
+Records how long imports and model loads take during startup.
+Author: Benjamin Dodd (1901386)
+"""
+
+import time
+from contextlib import contextmanager
+from threading import Lock
+
+from main.util import LOGGER
+
+class StartupTimer:
+    """
+    Records how long imports and model loads take during startup.
+    """
+
+    _instance = None
+    _instance_lock = Lock()
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            self._lock = Lock()
+            self._timings = []
+            self._initialized = True
+
+    @contextmanager
+    def measure(self, name: str):
+        """Measures how long the body of the `with` statement takes.
+
+        Args:
+            name (str): Name of the import or model load being measured.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        """Records a measurement.
+
+        Args:
+            name (str): Name of the import or model load.
+            seconds (float): Time taken in seconds.
+        """
+        with self._lock:
+            self._timings.append((name, seconds))
+        LOGGER.debug("%s took %.3f s", name, seconds)
+
+    @property
+    def timings(self):
+        """
+        Get the recorded measurements as (name, seconds) tuples.
+        """
+        with self._lock:
+            return list(self._timings)
+
+    def report(self):
+        """
+        Logs every recorded measurement, slowest first.
+        """
+        timings = sorted(self.timings, key=lambda timing: timing[1], reverse=True)
+        LOGGER.info("Startup time report (%.3f s total)", sum(seconds for _, seconds in timings))
+        for name, seconds in timings:
+            LOGGER.info("  %-50s %8.3f s", name, seconds)
@@ -3,6 +3,7 @@ Class for a variable that is stored to disk.
 Author: Benjamin Dodd (1901386)
 """
 
+from atexit import register
 from threading import Lock
 
 from main.util.variable_store import VariableStore
@@ -85,4 +86,97 @@ class StorableType(object):
         return self.value | other
 
     def __xor__(self, other):
-        return self.value ^ other
\ No newline at end of file
+        return self.value ^ other
+
+class StorableCounter(StorableType):
+    """
+    A stored integer for hot counters, such as the position of the stepper motor.
+
+    Reads return the current value without locking, as an int is replaced
+    rather than modified. Increments and decrements are atomic, and the value
+    is only written to the store every `persist_every` changes and when
+    `flush` is called, including when the interpreter exits. The number of
+    changes that had to wait for another thread is counted in `contended`.
+    """
+
+    def __init__(self, name: str, default_value: int = 0, persist_every: int = 64):
+        super().__init__(name, default_value)
+        self.persist_every = persist_every
+        self._unsaved = 0
+        self._contended = 0
+        register(self.flush)
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._acquire()
+        try:
+            self._value = value
+            self._changed()
+        finally:
+            self._lock.release()
+
+    def increment(self, amount: int = 1) -> int:
+        """Adds to the counter.
+
+        Args:
+            amount (int, optional): Amount to add. Defaults to 1.
+
+        Returns:
+            int: The new value.
+        """
+        self._acquire()
+        try:
+            self._value += amount
+            self._changed()
+            return self._value
+        finally:
+            self._lock.release()
+
+    def decrement(self, amount: int = 1) -> int:
+        """Subtracts from the counter.
+
+        Args:
+            amount (int, optional): Amount to subtract. Defaults to 1.
+
+        Returns:
+            int: The new value.
+        """
+        return self.increment(-amount)
+
+    def flush(self):
+        """Writes the value to the store if it has changed since it was last written.
+
+        Returns:
+            bool: True if the value was written, False if it had not changed.
+        """
+        with self._lock:
+            if not self._unsaved:
+                return False
+            self._unsaved = 0
+            self.store[self._name] = self._value
+            return True
+
+    @property
+    def contended(self):
+        """
+        Get the number of changes that had to wait for another thread.
+        """
+        return self._contended
+
+    def _acquire(self):
+        if not self._lock.acquire(blocking=False):
+            self._lock.acquire()
+            self._contended += 1
+
+    def _changed(self):
+        self._unsaved += 1
+        if self._unsaved >= self.persist_every:
+            self._unsaved = 0
+            self.store[self._name] = self._value
+
+    def __repr__(self):
+        return f"StorableCounter({self._name}, {self._value})"
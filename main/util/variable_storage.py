@@ -0,0 +1,184 @@
+"""
+Storage engines that save the contents of the variable store to disk.
+Author: Benjamin Dodd (1901386)
+"""
+
+import json
+import os
+from os import path, makedirs
+
+from main.util import LOGGER
+
+SNAPSHOT_PATH = path.join("data", "variable_store.json")
+JOURNAL_PATH = path.join("data", "variable_store.journal")
+# Number of journal entries after which the journal is compacted into the snapshot
+COMPACT_THRESHOLD = 1000
+
+# Marks a key that has been deleted in the changes passed to `StorageEngine.write`
+DELETED = object()
+
+class StorageEngine:
+    """
+    Base class for the ways the variable store can be saved to disk.
+
+    The base engine saves nothing, so a store using it only lives in memory.
+    """
+
+    def load(self) -> dict:
+        """Reads the saved variables.
+
+        Returns:
+            dict: The saved variables, empty if nothing has been saved.
+        """
+        return {}
+
+    def write(self, data: dict, changes: dict):
+        """Saves changes to the variables.
+
+        Args:
+            data (dict): Every variable, after the changes.
+            changes (dict): The new value of each changed variable, `DELETED` for deleted variables.
+        """
+        return
+
+    def close(self):
+        """
+        Releases any open files.
+        """
+        return
+
+def _make_directory(file_path: str):
+    directory = path.dirname(file_path)
+    if directory and not path.exists(directory):
+        makedirs(directory)
+
+class JSONStorage(StorageEngine):
+    """
+    Saves the variables as one JSON document, rewritten on every write.
+    """
+
+    def __init__(self, file_path: str = SNAPSHOT_PATH):
+        self.file_path = file_path
+
+    def load(self) -> dict:
+        if path.exists(self.file_path):
+            with open(self.file_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        LOGGER.warning("%s not found, creating new file.", path.basename(self.file_path))
+        _make_directory(self.file_path)
+        self.write({}, {})
+        return {}
+
+    def write(self, data: dict, changes: dict):
+        with open(self.file_path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+
+class JournalStorage(StorageEngine):
+    """
+    Saves the variables as a snapshot and an append-only journal of the changes since the snapshot.
+
+    Each write appends one JSON line per changed variable, so its cost does not
+    depend on the number of variables. When the journal grows past
+    `compact_threshold` entries, the variables are written to a temporary file
+    that atomically replaces the snapshot, then the journal is emptied. A
+    journal that survived a compaction only repeats values already in the
+    snapshot, so replaying it is harmless.
+
+    Loading reads the snapshot and replays the journal. A final line cut short
+    by a power cut is discarded and trimmed from the journal.
+    """
+
+    def __init__(self, snapshot_path: str = SNAPSHOT_PATH, journal_path: str = JOURNAL_PATH,
+            compact_threshold: int = COMPACT_THRESHOLD, sync: bool = True):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.compact_threshold = compact_threshold
+        self.sync = sync
+        self._journal = None
+        self._entries = 0
+
+    def load(self) -> dict:
+        data = {}
+        if path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        else:
+            _make_directory(self.snapshot_path)
+            self._write_snapshot(data)
+
+        self._entries = 0
+        if path.exists(self.journal_path):
+            valid_length = 0
+            with open(self.journal_path, "rb") as file:
+                for line in file:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("incomplete entry")
+                        entry = json.loads(line)
+                    except ValueError:
+                        LOGGER.warning("Discarding incomplete entry at the end of %s", self.journal_path)
+                        break
+                    if "deleted" in entry:
+                        data.pop(entry["key"], None)
+                    else:
+                        data[entry["key"]] = entry["value"]
+                    valid_length += len(line)
+                    self._entries += 1
+            if valid_length != path.getsize(self.journal_path):
+                os.truncate(self.journal_path, valid_length)
+        return data
+
+    def write(self, data: dict, changes: dict):
+        if not changes:
+            return
+        if self._journal is None:
+            _make_directory(self.journal_path)
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+        lines = []
+        for key, value in changes.items():
+            entry = {"key": key, "deleted": True} if value is DELETED else {"key": key, "value": value}
+            lines.append(json.dumps(entry) + "\n")
+        self._journal.write("".join(lines))
+        self._journal.flush()
+        if self.sync:
+            os.fsync(self._journal.fileno())
+        self._entries += len(lines)
+
+        if self._entries >= self.compact_threshold:
+            self.compact(data)
+
+    def compact(self, data: dict):
+        """Replaces the snapshot with the current variables and empties the journal.
+
+        Args:
+            data (dict): Every variable.
+        """
+        self._write_snapshot(data)
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.journal_path, "w", encoding="utf-8")
+        if self.sync:
+            os.fsync(self._journal.fileno())
+        self._entries = 0
+
+    def _write_snapshot(self, data: dict):
+        temporary_path = self.snapshot_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+            file.flush()
+            if self.sync:
+                os.fsync(file.fileno())
+        os.replace(temporary_path, self.snapshot_path)
+
+    @property
+    def entries(self):
+        """
+        Get the number of entries in the journal.
+        """
+        return self._entries
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
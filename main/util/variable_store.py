@@ -3,42 +3,54 @@ Class for accessing persistent variable data from disk, and writing new variable
 Author: Benjamin Dodd (1910386)
 """
 
-import json
-from os import path, makedirs
-from threading import Lock
+from atexit import register
+from threading import Event, Lock
 
 from main.util import LOGGER
+from main.util.variable_storage import StorageEngine, JSONStorage, DELETED, SNAPSHOT_PATH
+from main.threading.worker_thread import Worker
 
-STORE_PATH = path.join("data", "variable_store.json")
+STORE_PATH = SNAPSHOT_PATH
+FLUSH_INTERVAL = 1.0
 
 class VariableStore:
+    """
+    Persistent key value store, saved to `data/variable_store.json`.
+
+    How the store is saved is decided by its storage engine, given when the
+    store is first created. The default `JSONStorage` rewrites the whole file,
+    `JournalStorage` appends each change to a journal.
+
+    By default every change is saved before returning. In
+    write-behind mode changes are only made in memory and the changed keys
+    are marked dirty, a background flusher writes them at a fixed interval.
+    The flusher writes any remaining changes when it is stopped, and the
+    store is flushed when the interpreter exits.
+    """
 
     _instance = None
     _instance_lock = Lock()
     _initialized = False
 
-    def __new__(cls):
+    def __new__(cls, engine: StorageEngine = None):
         if cls._instance is None:
             with cls._instance_lock:
                 if cls._instance is None:
                     cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self):
+    def __init__(self, engine: StorageEngine = None):
         if not self._initialized:
             self.__lock = Lock()
-            self.__data = {}
-
-            if path.exists(STORE_PATH):
-                with open(STORE_PATH, "r", encoding="utf-8") as file:
-                    self.__data = json.load(file)
-            else:
-                LOGGER.warning("variable_store.json not found, creating new file.")
-                if not path.exists(path.dirname(STORE_PATH)):
-                    makedirs(path.dirname(STORE_PATH))
-                with open(STORE_PATH, "w", encoding='utf-8') as file:
-                    json.dump(self.__data, file)
+            self.__file_lock = Lock()
+            self.__engine = engine if engine is not None else JSONStorage()
+            self.__data = self.__engine.load()
+            self.__dirty = set()
+            self.__flusher = None
+            self.__exit_registered = False
             self._initialized = True
+        elif engine is not None and engine is not self.__engine:
+            LOGGER.warning("Variable store already created, ignoring storage engine %s", engine.__class__.__name__)
 
     def __getitem__(self, key):
         with self.__lock:
@@ -47,9 +59,10 @@ class VariableStore:
     def __setitem__(self, key, value):
         with self.__lock:
             self.__data[key] = value
-
-            with open(STORE_PATH, "w", encoding="utf-8") as file:
-                json.dump(self.__data, file)
+            self.__dirty.add(key)
+            if self.write_behind:
+                return
+        self.flush()
 
     def __contains__(self, key):
         with self.__lock:
@@ -58,9 +71,10 @@ class VariableStore:
     def __delitem__(self, key):
         with self.__lock:
             del self.__data[key]
-
-            with open(STORE_PATH, "w", encoding="utf-8") as file:
-                json.dump(self.__data, file)
+            self.__dirty.add(key)
+            if self.write_behind:
+                return
+        self.flush()
 
     def __iter__(self):
         with self.__lock:
@@ -69,3 +83,111 @@ class VariableStore:
     def __len__(self):
         with self.__lock:
             return len(self.__data)
+
+    @property
+    def write_behind(self):
+        """
+        Get whether changes are written to disk in the background.
+        """
+        flusher = self.__flusher
+        return flusher is not None and not flusher.is_stopped()
+
+    @property
+    def dirty(self):
+        """
+        Get the number of keys changed since the store was last written to disk.
+        """
+        with self.__lock:
+            return len(self.__dirty)
+
+    def enable_write_behind(self, interval: float = FLUSH_INTERVAL):
+        """Keeps changes in memory and writes them to disk in the background.
+
+        Args:
+            interval (float, optional): Seconds between writes. Defaults to FLUSH_INTERVAL.
+        """
+        with self.__lock:
+            if self.__flusher is not None and not self.__flusher.is_stopped():
+                self.__flusher.interval = interval
+                return
+            if not self.__exit_registered:
+                register(self.flush)
+                self.__exit_registered = True
+            self.__flusher = VariableStoreFlusher(self, interval)
+            self.__flusher.start()
+        LOGGER.debug("Variable store write-behind enabled, flushing every %.2f s", interval)
+
+    def disable_write_behind(self):
+        """
+        Writes any pending changes and returns to writing every change to disk immediately.
+        """
+        with self.__lock:
+            flusher = self.__flusher
+            self.__flusher = None
+        if flusher is not None:
+            flusher.stop()
+        self.flush()
+
+    def flush(self):
+        """Writes the store to disk if any key has changed since it was last written.
+
+        If the storage engine fails, the changed keys stay dirty so the next flush writes them again.
+
+        Returns:
+            bool: True if the store was written, False if there were no changes.
+        """
+        with self.__file_lock:
+            with self.__lock:
+                if not self.__dirty:
+                    return False
+                changes = {key: self.__data.get(key, DELETED) for key in self.__dirty}
+                data = dict(self.__data)
+                self.__dirty.clear()
+
+            try:
+                self.__engine.write(data, changes)
+            except Exception:
+                with self.__lock:
+                    self.__dirty.update(changes)
+                raise
+            return True
+
+    @property
+    def engine(self):
+        """
+        Get the storage engine that saves the store.
+        """
+        return self.__engine
+
+class VariableStoreFlusher(Worker):
+    """
+    Worker thread that writes the changes to a variable store at a fixed interval.
+
+    The thread is a daemon so it never holds up shutdown, stopping it writes
+    any remaining changes before `stop()` returns. A failed write is logged
+    rather than raised, and the changes stay dirty.
+    """
+
+    def __init__(self, store: VariableStore, interval: float):
+        super().__init__()
+        self.daemon = True
+        self.store = store
+        self.interval = interval
+        self._wake = Event()
+
+    def stop(self):
+        super().stop()
+        self._wake.set()
+        try:
+            self.store.flush()
+        except Exception:
+            # Stopping must not fail, or the workers stopped after this one would be left running
+            LOGGER.exception("Failed to write the variable store while stopping")
+
+    def work(self):
+        while not self.is_stopped():
+            self._wake.wait(self.interval)
+            try:
+                self.store.flush()
+            except Exception:
+                LOGGER.exception("Failed to write the variable store, retrying in %.2f s", self.interval)
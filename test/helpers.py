@@ -0,0 +1,72 @@
+"""
+Helpers shared by the tests.
+Author: Benjamin Dodd (1901386)
+"""
+
+import tempfile
+import time
+import unittest
+from os import path
+
+from main.util.variable_storage import JSONStorage
+from main.util.variable_store import VariableStore
+
+def wait_until(condition, timeout: float = 2.0) -> bool:
+    """Polls a condition until it holds.
+
+    Args:
+        condition (Callable[[], bool]): The condition to wait for.
+        timeout (float, optional): Maximum time to wait in seconds. Defaults to 2.0.
+
+    Returns:
+        bool: True if the condition held, False if the timeout expired.
+    """
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+def replace_singleton(test: unittest.TestCase, cls, *args, **kwargs):
+    """Creates a separate instance of a singleton class for a test, the shared instance is restored when the test ends.
+
+    Args:
+        test (unittest.TestCase): The test using the instance.
+        cls (type): The singleton class, with an `_instance` class attribute.
+        *args: Arguments of the new instance.
+        **kwargs: Keyword arguments of the new instance.
+
+    Returns:
+        object: The new instance.
+    """
+    test.addCleanup(setattr, cls, "_instance", cls._instance)
+    cls._instance = None
+    return cls(*args, **kwargs)
+
+def temporary_directory(test: unittest.TestCase) -> str:
+    """Creates a temporary directory that is deleted when the test ends.
+
+    Args:
+        test (unittest.TestCase): The test using the directory.
+
+    Returns:
+        str: Path of the directory.
+    """
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    return directory.name
+
+def temporary_store(test: unittest.TestCase, engine=None):
+    """Replaces the variable store for a test, so it does not change the variables saved under `data/`.
+
+    Args:
+        test (unittest.TestCase): The test using the store.
+        engine (StorageEngine, optional): Storage engine of the store. Defaults to a JSON file in a temporary directory.
+
+    Returns:
+        VariableStore: The new store.
+    """
+    if engine is None:
+        engine = JSONStorage(path.join(temporary_directory(test), "variable_store.json"))
+    return replace_singleton(test, VariableStore, engine)
@@ -0,0 +1,45 @@
+import time
+import unittest
+
+import numpy as np
+
+from main.display.animation import Animation, blink, crossfade
+
+class TestAnimation(unittest.TestCase):
+
+    def setUp(self):
+        self.start = np.zeros((8, 8, 3), dtype=np.uint8)
+        self.end = np.full((8, 8, 3), 200, dtype=np.uint8)
+
+    def test_crossfade(self):
+        animation = crossfade(self.start, self.end, frames=4)
+        self.assertEqual(len(animation), 4)
+        self.assertFalse(animation.frames.flags.writeable)
+        self.assertEqual([int(frame[0, 0, 0]) for frame in animation.frames], [50, 100, 150, 200])
+        self.assertTrue(np.array_equal(animation.final, self.end))
+
+    def test_blink(self):
+        animation = blink(self.end, closure=(0.5, 1.0, 0.0))
+        self.assertFalse(animation.frames[0, :2].any())
+        self.assertTrue((animation.frames[0, 2:6] == 200).all())
+        self.assertFalse(animation.frames[1].any())
+        self.assertTrue(np.array_equal(animation.final, self.end))
+
+    def test_play(self):
+        animation = Animation("test", np.zeros((5, 2, 2, 3), dtype=np.uint8), fps=100)
+        shown = []
+        self.assertEqual(animation.play(shown.append), 0)
+        self.assertEqual(shown, [0, 1, 2, 3, 4])
+
+    def test_play_skips_late_frames(self):
+        animation = Animation("test", np.zeros((5, 2, 2, 3), dtype=np.uint8), fps=100)
+        shown = []
+
+        def show(index):
+            shown.append(index)
+            time.sleep(0.025)
+
+        skipped = animation.play(show)
+        self.assertGreater(skipped, 0)
+        self.assertEqual(len(shown) + skipped, 5)
+        self.assertEqual(shown[-1], 4)
@@ -0,0 +1,61 @@
+import os
+import unittest
+from os import path
+
+import cv2 as cv
+import numpy as np
+
+from main.display.asset_manager import AssetManager
+from test.helpers import replace_singleton, temporary_directory
+
+class TestAssetManager(unittest.TestCase):
+
+    def setUp(self):
+        self.assets = AssetManager()
+
+    def test_names(self):
+        self.assertIn("emotion/happy", self.assets.names)
+        self.assertIn("activity/clock", self.assets.names)
+        self.assertFalse([name for name in self.assets.names if name.startswith("ui/")])
+
+    def test_get(self):
+        happy = self.assets.get("emotion/happy", 64)
+        self.assertIs(happy, self.assets.get("emotion/happy", 64))
+        self.assertEqual(happy.shape, (64, 64, 3))
+        self.assertFalse(happy.flags.writeable)
+        expected = cv.resize(cv.imread("res/emotion/happy.png"), (64, 64), interpolation=cv.INTER_AREA)
+        self.assertTrue(np.array_equal(happy, expected))
+        with self.assertRaises(KeyError):
+            self.assets.get("emotion/bored", 64)
+
+    def test_memory_map(self):
+        # Map atlases from a directory of our own, with a manager of our own
+        directory = temporary_directory(self)
+        assets = replace_singleton(self, AssetManager, memory_map=True, atlas_path=directory)
+        atlas = assets.load(48)
+        self.assertIsInstance(atlas, np.memmap)
+        self.assertEqual(atlas.shape, (len(assets.names), 48, 48, 3))
+        self.assertTrue(path.exists(path.join(directory, "atlas_48.npy")))
+        expected = cv.resize(cv.imread("res/activity/clock.png"), (48, 48), interpolation=cv.INTER_AREA)
+        self.assertTrue(np.array_equal(assets.get("activity/clock", 48), expected))
+        del atlas, assets
+
+    def test_interrupted_rebuild(self):
+        directory = temporary_directory(self)
+        atlas_path = path.join(directory, "atlas_48.npy")
+        replace_singleton(self, AssetManager, memory_map=True, atlas_path=directory).load(48)
+        with open(atlas_path, "rb") as atlas_file:
+            built = atlas_file.read()
+        # Age the atlas so it is rebuilt, and fail the rebuild part way through
+        os.utime(atlas_path, (0, 0))
+        assets = replace_singleton(self, AssetManager, memory_map=True, atlas_path=directory)
+        def fail(diameter, out):
+            out[0] = 0
+            raise ValueError("Could not load asset")
+        assets._build_atlas = fail
+        with self.assertRaises(ValueError):
+            assets.load(48)
+        # The previous atlas and its index are left as they were, without any partial files
+        with open(atlas_path, "rb") as atlas_file:
+            self.assertEqual(atlas_file.read(), built)
+        self.assertEqual(sorted(os.listdir(directory)), ["atlas_48.json", "atlas_48.npy"])
@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from main.display.compositor import Compositor
+
+class TestCompositor(unittest.TestCase):
+
+    def setUp(self):
+        self.compositor = Compositor(8)
+        self.background = np.full((8, 8, 3), 50, dtype=np.uint8)
+        self.overlay = np.zeros((8, 8, 3), dtype=np.uint8)
+        self.overlay[2:4, 2:4] = 255
+        self.overlay.flags.writeable = False
+
+    def test_empty(self):
+        self.assertFalse(self.compositor.compose().any())
+
+    def test_overlay(self):
+        self.compositor.set_layer("background", self.background)
+        self.compositor.set_layer("overlay", self.overlay)
+        composite = self.compositor.compose()
+        self.assertTrue((composite[2:4, 2:4] == 255).all())
+        self.assertTrue((composite[5:, 5:] == 50).all())
+        self.assertEqual(self.compositor.blends, 1)
+        self.assertIs(self.compositor.compose(), composite)
+        # An unchanged read-only layer is not blended again
+        self.compositor.set_layer("overlay", self.overlay)
+        self.assertIs(self.compositor.compose(), composite)
+
+    def test_only_dirty_layers(self):
+        icon = np.zeros((8, 8, 3), dtype=np.uint8)
+        icon[0:2, 0:2] = 100
+        icon.flags.writeable = False
+        self.compositor.set_layer("background", self.background)
+        self.compositor.set_layer("icon", icon)
+        self.compositor.set_layer("overlay", self.overlay)
+        self.compositor.compose()
+        self.assertEqual(self.compositor.blends, 2)
+        moved = np.zeros((8, 8, 3), dtype=np.uint8)
+        moved[6:, 6:] = 200
+        self.compositor.set_layer("overlay", moved)
+        composite = self.compositor.compose()
+        self.assertEqual(self.compositor.blends, 3)
+        # The icon was kept in the pre-blended layer
+        self.assertTrue((composite[0:2, 0:2] == 100).all())
+        self.assertTrue((composite[6:, 6:] == 200).all())
+        self.assertTrue((composite[2:4, 2:4] == 50).all())
+
+    def test_resize(self):
+        self.compositor.set_layer("background", np.full((4, 16, 3), 80, dtype=np.uint8))
+        composite = self.compositor.compose()
+        self.assertEqual(composite.shape, (8, 8, 3))
+        self.assertTrue((composite == 80).all())
+
+    def test_unknown_layer(self):
+        with self.assertRaises(ValueError):
+            self.compositor.set_layer("text", self.overlay)
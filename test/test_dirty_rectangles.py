@@ -0,0 +1,45 @@
+import unittest
+
+import numpy as np
+
+from main.display.dirty_rectangles import find_dirty_rectangles, area
+
+class TestDirtyRectangles(unittest.TestCase):
+
+    def test_identical(self):
+        frame = np.zeros((32, 32, 3), dtype=np.uint8)
+        self.assertEqual(find_dirty_rectangles(frame, frame.copy()), [])
+
+    def test_single_change(self):
+        previous = np.zeros((32, 32, 3), dtype=np.uint8)
+        current = previous.copy()
+        current[4:8, 10:12] = 255
+        self.assertEqual(find_dirty_rectangles(previous, current), [(10, 4, 11, 7)])
+        self.assertEqual(area([(10, 4, 11, 7)]), 8)
+
+    def test_separate_bands(self):
+        previous = np.zeros((64, 64, 3), dtype=np.uint8)
+        current = previous.copy()
+        current[2:4, 2:4] = 255
+        current[40:42, 50:60] = 255
+        self.assertEqual(find_dirty_rectangles(previous, current, merge_gap=8), [(2, 2, 3, 3), (50, 40, 59, 41)])
+        # Bands closer than the merge gap become one rectangle
+        self.assertEqual(find_dirty_rectangles(previous, current, merge_gap=40), [(2, 2, 59, 41)])
+
+    def test_max_rectangles(self):
+        previous = np.zeros((64, 64), dtype=np.uint16)
+        current = previous.copy()
+        for row in range(0, 60, 12):
+            current[row, row] = 1
+        self.assertEqual(find_dirty_rectangles(previous, current, max_rectangles=2), [(0, 0, 48, 48)])
+
+    def test_reconstruction(self):
+        generator = np.random.default_rng(0)
+        previous = generator.integers(0, 255, (48, 48, 3), dtype=np.uint8)
+        current = previous.copy()
+        current[5:9, 30:40] = 0
+        current[30:33, 1:4] = 0
+        panel = previous.copy()
+        for x0, y0, x1, y1 in find_dirty_rectangles(previous, current):
+            panel[y0:y1 + 1, x0:x1 + 1] = current[y0:y1 + 1, x0:x1 + 1]
+        self.assertTrue(np.array_equal(panel, current))
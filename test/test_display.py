@@ -0,0 +1,98 @@
+import time
+import unittest
+
+import numpy as np
+
+from main.display.circular_display import Display, PARTIAL_UPDATE_MAX_AREA
+from main.display.rgb565 import encode_rgb565
+from main.threading.worker_manager import WorkerManager
+from main.threading.worker_thread import Worker
+from test.helpers import wait_until
+
+class TestDisplay(unittest.TestCase):
+
+    def setUp(self):
+        Worker.set_manager(WorkerManager())
+        self.display = Display(diameter=64, rotation=90, port=8, cs_pin=0, dc_pin=9, backlight=18)
+        # The display is cleared when it is created
+        self.assertTrue(wait_until(lambda: self.display.pushed == 1))
+        self.panel = self.display.st7798
+        self.panel.reset_statistics()
+
+    def tearDown(self):
+        self.display.worker.stop()
+        self.display.worker.join()
+
+    def frame(self, value: int) -> np.ndarray:
+        return np.full((64, 64, 3), value, dtype=np.uint8)
+
+    def assertOnPanel(self, image: np.ndarray):
+        self.assertTrue(np.array_equal(self.display._panel_frame, encode_rgb565(np.rot90(image, 1))))
+
+    def test_coalescing(self):
+        frames = [self.frame(value) for value in range(10, 20)]
+        # Hold the worker up while the frames arrive
+        with self.display.push_lock:
+            for frame in frames:
+                self.display.image = frame
+        self.assertTrue(wait_until(lambda: self.display.pushed + self.display.coalesced == 1 + len(frames)))
+        self.assertGreaterEqual(self.display.coalesced, len(frames) - 2)
+        self.assertLessEqual(self.display.pushed, 3)
+        # The most recent frame is the one left on the panel
+        self.assertIs(self.display.image, frames[-1])
+        self.assertOnPanel(frames[-1])
+
+    def test_suppressed(self):
+        self.display.image = self.frame(10)
+        self.assertTrue(wait_until(lambda: self.display.pushed == 2))
+        # A different array with the same pixels is not pushed again
+        self.display.image = self.frame(10)
+        self.assertEqual(self.display.suppressed, 1)
+        static = self.frame(20)
+        static.flags.writeable = False
+        self.display.image = static
+        self.display.image = static
+        self.assertEqual(self.display.suppressed, 2)
+        self.assertTrue(wait_until(lambda: self.display.pushed == 3))
+        time.sleep(0.05)
+        self.assertEqual(self.display.pushed, 3)
+        self.assertOnPanel(static)
+
+    def test_partial_update(self):
+        first = self.frame(0)
+        self.display.push(first)
+        self.assertEqual(self.panel.window, (0, 0, 63, 63))
+        self.panel.reset_statistics()
+
+        # Only the window around a small change is written
+        second = first.copy()
+        second[10:20, 30:50] = 255
+        self.display.push(second)
+        self.assertEqual(self.panel.windows_written, 1)
+        x0, y0, x1, y1 = self.panel.window
+        self.assertEqual((x1 - x0 + 1) * (y1 - y0 + 1), 10 * 20)
+        self.assertEqual(self.panel.bytes_transferred, 10 * 20 * 2)
+        self.assertOnPanel(second)
+
+    def test_full_frame_fallback(self):
+        first = self.frame(0)
+        self.display.push(first)
+        self.panel.reset_statistics()
+
+        # A change over more than PARTIAL_UPDATE_MAX_AREA of the panel is sent as one full frame
+        second = first.copy()
+        rows = int(np.ceil(64 * PARTIAL_UPDATE_MAX_AREA)) + 1
+        second[:rows] = 255
+        self.display.push(second)
+        self.assertEqual(self.panel.windows_written, 1)
+        self.assertEqual(self.panel.window, (0, 0, 63, 63))
+        self.assertEqual(self.panel.bytes_transferred, 64 * 64 * 2)
+
+        # Unless partial updates are off, every push is a full frame
+        self.display.partial_updates = False
+        self.panel.reset_statistics()
+        third = second.copy()
+        third[0, 0] = 0
+        self.display.push(third)
+        self.assertEqual(self.panel.bytes_transferred, 64 * 64 * 2)
+        self.assertOnPanel(third)
@@ -0,0 +1,96 @@
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from main.display.animation import Animation
+from main.display.circular_display import Display
+from main.display.display_pair import DisplayPair
+from main.display.rgb565 import encode_rgb565
+from main.threading.worker_manager import WorkerManager
+from main.threading.worker_thread import Worker
+from test.helpers import wait_until
+
+class TestDisplayPair(unittest.TestCase):
+
+    def setUp(self):
+        Worker.set_manager(WorkerManager())
+        self.left = Display(diameter=64, rotation=90, port=9, cs_pin=1, dc_pin=9, backlight=19)
+        self.right = Display(diameter=64, rotation=90, port=9, cs_pin=0, dc_pin=9, backlight=18)
+        self.assertTrue(wait_until(lambda: self.left.pushed == 1 and self.right.pushed == 1))
+        self.pair = DisplayPair(self.left, self.right)
+
+    def tearDown(self):
+        for worker in (self.left.worker, self.right.worker, self.pair.worker):
+            if worker is not None:
+                worker.stop()
+                worker.join()
+
+    def frame(self, value: int) -> np.ndarray:
+        return np.full((64, 64, 3), value, dtype=np.uint8)
+
+    def assertOnPanel(self, display: Display, image: np.ndarray):
+        self.assertTrue(np.array_equal(display._panel_frame, encode_rgb565(np.rot90(image, 1))))
+
+    def test_separate_buses(self):
+        other = Display(diameter=64, rotation=90, port=10, cs_pin=0, dc_pin=9, backlight=18)
+        try:
+            with self.assertRaises(ValueError):
+                DisplayPair(self.left, other)
+        finally:
+            other.worker.stop()
+            other.worker.join()
+
+    def test_one_bus_hold(self):
+        transfers = self.pair.bus.transfers
+        image = self.frame(100)
+        self.pair.push(image, image)
+        self.assertEqual(self.pair.bus.transfers, transfers + 1)
+        self.assertOnPanel(self.left, image)
+        self.assertOnPanel(self.right, image)
+        self.assertEqual(self.left.st7798.window, (0, 0, 63, 63))
+        self.assertEqual(self.right.st7798.window, (0, 0, 63, 63))
+        self.assertEqual(self.pair.pushed, 1)
+        self.assertEqual(self.pair.skew.count, 1)
+
+    def test_submit(self):
+        image = self.frame(100)
+        self.pair.submit(image, image)
+        self.assertTrue(wait_until(lambda: self.pair.pushed == 1))
+        self.assertOnPanel(self.left, image)
+        self.assertOnPanel(self.right, image)
+        self.assertIs(self.left.image, image)
+        self.assertIs(self.right.image, image)
+
+    def test_in_flight_image_dropped(self):
+        older = self.frame(50)
+        newer = self.frame(100)
+        with self.left.push_lock:
+            self.left.image = older
+            # Let the left display's worker take the older image and wait to push it
+            self.assertTrue(wait_until(lambda: not self.left._image_pending))
+            self.pair.submit(newer, newer)
+        self.assertTrue(wait_until(lambda: self.pair.pushed == 1 and self.left.coalesced == 1))
+        time.sleep(0.05)
+        # The older image never overwrites the pair, whichever worker took the bus first
+        self.assertEqual(self.left.pushed, 2)
+        self.assertOnPanel(self.left, newer)
+        self.assertOnPanel(self.right, newer)
+
+    def test_taken_pair_dropped_by_play(self):
+        animation = Animation("test", np.stack([self.frame(value) for value in (10, 20, 30)]), fps=100)
+        with self.left.push_lock, self.right.push_lock:
+            self.pair.submit(self.frame(50), self.frame(50))
+            # Let the pair's worker take the pair and wait to push it, then start the animation behind it
+            self.assertTrue(wait_until(lambda: not self.pair._pair_pending))
+            player = threading.Thread(target=self.pair.play, args=(animation, animation))
+            player.start()
+            self.assertTrue(wait_until(lambda: self.pair._generation == 1))
+        player.join()
+        self.assertTrue(wait_until(lambda: self.pair.coalesced == 1))
+        time.sleep(0.05)
+        # The taken pair never overwrites the end of the animation
+        self.assertEqual(self.pair.pushed, 3)
+        self.assertOnPanel(self.left, animation.final)
+        self.assertOnPanel(self.right, animation.final)
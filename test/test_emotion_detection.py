@@ -0,0 +1,92 @@
+import sys
+import threading
+import unittest
+
+import numpy as np
+
+from main.camera.emotion_detection import EmotionDetection
+from main.camera.video_feed import VideoFrame
+from main.threading.worker_manager import WorkerManager
+from main.threading.worker_thread import Worker
+from test.helpers import replace_singleton, wait_until
+
+class StubDetector:
+    """
+    Stands in for the FER detector, finding one face in every frame once `release` is set.
+    """
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.release.set()
+        self.analysing = threading.Event()
+        self.images = []
+
+    def find_faces(self, image, bgr=True):
+        self.images.append(image)
+        self.analysing.set()
+        self.release.wait(2)
+        return [(1, 2, 3, 4)]
+
+    def detect_emotions(self, image, face_rectangles=None):
+        return [{"box": face_rectangles[0], "emotions": {"happy": 0.9, "sad": 0.1}}]
+
+class TestEmotionDetection(unittest.TestCase):
+
+    def setUp(self):
+        Worker.set_manager(WorkerManager())
+        # A detection of our own with a stub model, both restored once the test ends
+        self.detector = StubDetector()
+        EmotionDetection._detector = self.detector
+        self.detection = replace_singleton(self, EmotionDetection)
+        self.image = np.zeros((32, 64, 3), dtype=np.uint8)
+
+    def tearDown(self):
+        self.detector.release.set()
+        workers = self.detection.workers
+        self.detection.stop_workers()
+        for worker in workers:
+            worker.join()
+        EmotionDetection._detector = None
+
+    def test_lazy_loading(self):
+        # Importing the module does not load TensorFlow or the model
+        self.assertNotIn("fer", sys.modules)
+        self.assertIs(EmotionDetection.get_detector(), self.detector)
+
+    def test_counters(self):
+        self.detector.release.clear()
+        frames = [VideoFrame(self.image, sequence) for sequence in range(1, 5)]
+        self.assertTrue(self.detection.submit(frames[0]))
+        # The worker is busy with the first frame while the rest arrive
+        self.assertTrue(self.detector.analysing.wait(2))
+        for frame in frames[1:]:
+            self.assertTrue(self.detection.submit(frame))
+        self.assertFalse(self.detection.submit(frames[3].as_stale()))
+        self.assertFalse(self.detection.submit(frames[2]))
+        self.detector.release.set()
+
+        self.assertTrue(wait_until(lambda: self.detection.frames_processed == 3))
+        self.assertEqual(self.detection.frames_accepted, 4)
+        self.assertEqual(self.detection.frames_dropped, 1)
+        self.assertEqual(self.detection.frames_skipped, 2)
+        self.assertEqual(self.detection.frames_processed + self.detection.frames_dropped, self.detection.frames_accepted)
+        self.assertEqual(len(self.detection.workers), 1)
+
+    def test_single_pass(self):
+        frame = VideoFrame(self.image, 1)
+        faces = EmotionDetection.analyse(frame)
+        # Faces are found in the cached grayscale view and classified without searching again
+        self.assertIs(self.detector.images[0], frame.gray)
+        self.assertEqual(faces[0]["box"], (1, 2, 3, 4))
+        self.detection.update(faces)
+        self.assertEqual(self.detection.current_emotion, "happy")
+        self.assertEqual(self.detection.face_position, (1, 2, 3, 4))
+        self.assertEqual(self.detection.faces, faces)
+
+    def test_no_faces(self):
+        self.detector.find_faces = lambda image, bgr=True: []
+        self.detector.detect_emotions = None
+        self.assertEqual(EmotionDetection.analyse(VideoFrame(self.image, 1)), [])
+        self.detection.update([])
+        self.assertIsNone(self.detection.current_emotion)
+        self.assertIsNone(self.detection.face_position)
@@ -0,0 +1,37 @@
+import unittest
+
+from main.display.frame_limiter import FrameRateLimiter
+
+class TestFrameRateLimiter(unittest.TestCase):
+
+    def test_unlimited(self):
+        limiter = FrameRateLimiter()
+        self.assertTrue(all(limiter.admit(i * 0.001) for i in range(100)))
+        self.assertEqual(limiter.dropped, 0)
+
+    def test_drops_excess_frames(self):
+        limiter = FrameRateLimiter(10)
+        # A 15 fps source for 3 seconds, limited to close to 10 fps
+        admitted = [t for t in (i / 15 for i in range(45)) if limiter.admit(t)]
+        self.assertEqual(limiter.admitted + limiter.dropped, 45)
+        self.assertAlmostEqual(len(admitted) / 3, 10, delta=1)
+        # Never more than one frame per slot
+        self.assertEqual(len({int(t * 10 + 1e-9) for t in admitted}), len(admitted))
+
+    def test_pacing(self):
+        limiter = FrameRateLimiter(20, pacing=True)
+        self.assertTrue(all(limiter.admit(i * 0.01) for i in range(10)))
+        self.assertEqual(limiter.delay(0.0), 0)
+        limiter.record(0.0)
+        self.assertAlmostEqual(limiter.delay(0.02), 0.03)
+        limiter.record(0.05)
+        limiter.record(0.1)
+        self.assertAlmostEqual(limiter.fps, 20)
+        self.assertAlmostEqual(limiter.jitter.maximum, 0)
+        # A late push stays on the grid of slots
+        limiter.record(0.17)
+        self.assertAlmostEqual(limiter.delay(0.17), 0.03)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            FrameRateLimiter(0)
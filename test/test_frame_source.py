@@ -0,0 +1,69 @@
+import time
+import tempfile
+import unittest
+from os import path
+
+import cv2 as cv
+import numpy as np
+
+from main.camera.frame_source import ImageDirectoryFrameSource, SyntheticFrameSource
+
+class TestFrameSource(unittest.TestCase):
+
+    def test_synthetic(self):
+        source = SyntheticFrameSource(width=64, height=32, realtime=False, count=3)
+        self.assertTrue(source.open())
+        frames = []
+        success, frame = source.read()
+        while success:
+            frames.append(frame)
+            success, frame = source.read()
+        self.assertEqual(len(frames), 3)
+        self.assertEqual(frames[0].shape, (32, 64, 3))
+        self.assertFalse(np.array_equal(frames[0], frames[1]))
+
+        # Reopening replays the same frames
+        source.open()
+        _, frame = source.read()
+        self.assertTrue(np.array_equal(frame, frames[0]))
+
+    def test_image_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for index in range(3):
+                cv.imwrite(path.join(directory, f"{index}.png"), np.full((8, 8, 3), index, dtype=np.uint8))
+
+            source = ImageDirectoryFrameSource(directory, realtime=False)
+            self.assertTrue(source.open())
+            self.assertEqual(len(source), 3)
+            for index in range(3):
+                success, frame = source.read()
+                self.assertTrue(success)
+                self.assertEqual(frame[0, 0, 0], index)
+            success, _ = source.read()
+            self.assertFalse(success)
+
+            source = ImageDirectoryFrameSource(directory, realtime=False, loop=True)
+            source.open()
+            for _ in range(4):
+                success, frame = source.read()
+            self.assertTrue(success)
+            self.assertEqual(frame[0, 0, 0], 0)
+
+    def test_missing_directory(self):
+        source = ImageDirectoryFrameSource(path.join("missing", "directory"), realtime=False)
+        self.assertFalse(source.open())
+
+    def test_realtime_pacing(self):
+        source = SyntheticFrameSource(width=16, height=16, fps=50, realtime=True, count=6)
+        source.open()
+        start = time.monotonic()
+        for _ in range(6):
+            source.read()
+        self.assertGreaterEqual(time.monotonic() - start, 5 / 50 * 0.9)
+
+        source = SyntheticFrameSource(width=16, height=16, fps=1, realtime=False, count=6)
+        source.open()
+        start = time.monotonic()
+        for _ in range(6):
+            source.read()
+        self.assertLess(time.monotonic() - start, 1)
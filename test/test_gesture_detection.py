@@ -0,0 +1,105 @@
+import sys
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from main.camera.gesture_detection import GestureDetection, GestureEngine, count_fingers, FINGERS
+from main.camera.video_feed import VideoFrame
+from main.threading.worker_manager import WorkerManager
+from main.threading.worker_thread import Worker
+from test.helpers import replace_singleton, wait_until
+
+def hand(raised: int):
+    """Creates the landmarks of a hand with the first `raised` fingers raised."""
+    landmark = [SimpleNamespace(y=0.5) for _ in range(21)]
+    for tip, dip in FINGERS[:raised]:
+        landmark[tip] = SimpleNamespace(y=0.2)
+        landmark[dip] = SimpleNamespace(y=0.4)
+    return SimpleNamespace(landmark=landmark)
+
+class StubHands:
+    """
+    Stands in for a MediaPipe Hands session, seeing as many raised fingers as the red channel of the image.
+    """
+
+    def __init__(self, solution, **kwargs):
+        self.solution = solution
+        self.options = kwargs
+        self.closed = False
+        solution.sessions.append(self)
+
+    def process(self, image):
+        self.solution.release.wait(2)
+        self.solution.processed.append(int(image[0, 0, 0]))
+        return SimpleNamespace(multi_hand_landmarks=[hand(int(image[0, 0, 0]))])
+
+    def close(self):
+        self.closed = True
+
+class StubHandsSolution:
+
+    def __init__(self):
+        self.sessions = []
+        self.processed = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def Hands(self, **kwargs):
+        return StubHands(self, **kwargs)
+
+class TestGestureDetection(unittest.TestCase):
+
+    def setUp(self):
+        Worker.set_manager(WorkerManager())
+        # A detection of our own with a stub MediaPipe, both restored once the test ends
+        self.solution = StubHandsSolution()
+        GestureEngine._hands_solution = self.solution
+        self.detection = replace_singleton(self, GestureDetection)
+
+    def tearDown(self):
+        self.solution.release.set()
+        if self.detection.worker is not None:
+            self.detection.worker.stop()
+            self.detection.worker.join()
+        GestureEngine._hands_solution = None
+
+    def frame(self, fingers: int, sequence: int) -> VideoFrame:
+        # The frame is BGR, the stub reads the finger count from the red channel of the RGB view
+        return VideoFrame(np.full((8, 8, 3), (0, 0, fingers), dtype=np.uint8), sequence)
+
+    def test_lazy_loading(self):
+        # Importing the module does not import MediaPipe
+        self.assertNotIn("mediapipe", sys.modules)
+        self.assertIs(GestureEngine.load_hands_solution(), self.solution)
+
+    def test_count_fingers(self):
+        self.assertEqual(count_fingers(SimpleNamespace(multi_hand_landmarks=None)), 0)
+        self.assertEqual(count_fingers(SimpleNamespace(multi_hand_landmarks=[hand(2), hand(4)])), 6)
+
+    def test_long_lived_session(self):
+        for sequence in range(1, 4):
+            self.assertTrue(self.detection.submit(self.frame(sequence, sequence)))
+            self.assertTrue(wait_until(lambda: self.detection.finger_count == sequence))
+        # One tracking session is used for every frame, and closed when the worker stops
+        self.assertEqual(len(self.solution.sessions), 1)
+        self.assertFalse(self.solution.sessions[0].options["static_image_mode"])
+        self.detection.worker.stop()
+        self.detection.worker.join()
+        self.assertTrue(self.solution.sessions[0].closed)
+
+    def test_skips_while_busy(self):
+        self.solution.release.clear()
+        self.assertTrue(self.detection.submit(self.frame(1, 1)))
+        self.assertTrue(wait_until(self.detection.frames.empty))
+        # Frames that arrive while a detection is running replace each other, only the newest is analysed
+        for sequence in range(2, 5):
+            self.assertTrue(self.detection.submit(self.frame(sequence, sequence)))
+        self.assertFalse(self.detection.submit(self.frame(4, 4)))
+        self.assertFalse(self.detection.submit(self.frame(4, 5).as_stale()))
+        self.solution.release.set()
+        self.assertTrue(wait_until(lambda: self.detection.finger_count == 4))
+        time.sleep(0.05)
+        self.assertEqual(self.solution.processed, [1, 4])
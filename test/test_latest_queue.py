@@ -0,0 +1,19 @@
+import queue
+import unittest
+
+from main.util.latest_queue import put_latest
+
+class TestLatestQueue(unittest.TestCase):
+
+    def test_put_latest(self):
+        latest = queue.Queue(maxsize=2)
+        self.assertEqual(put_latest(latest, 1), 0)
+        self.assertEqual(put_latest(latest, 2), 0)
+        self.assertEqual(put_latest(latest, 3), 1)
+        self.assertEqual([latest.get_nowait(), latest.get_nowait()], [2, 3])
+
+    def test_unbounded(self):
+        items = queue.Queue()
+        for item in range(5):
+            self.assertEqual(put_latest(items, item), 0)
+        self.assertEqual(items.qsize(), 5)
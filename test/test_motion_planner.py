@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+
+from main.motor.motion_planner import MotionPlanner
+from main.motor.stepper_motor import StepperMotor, CLOCKWISE
+from main.threading.worker_manager import WorkerManager
+from main.threading.worker_thread import Worker
+from main.util.mock_gpio import MockGPIO
+from test.helpers import temporary_store
+
+class TestMotionPlanner(unittest.TestCase):
+
+    def setUp(self):
+        Worker.set_manager(WorkerManager())
+        # Count the motor's steps in a separate store, so the real position is left alone
+        temporary_store(self)
+
+    def test_constant(self):
+        delays = MotionPlanner(0.002).plan(10)
+        self.assertTrue(np.array_equal(delays, np.full(10, 0.002)))
+
+    def test_trapezoid(self):
+        planner = MotionPlanner(0.002, 0.001, 4000)
+        delays = planner.plan(256)
+        self.assertAlmostEqual(delays[0], 0.002)
+        self.assertAlmostEqual(delays[-1], 0.002)
+        self.assertTrue(np.allclose(delays, delays[::-1]))
+        self.assertTrue((np.diff(delays[:128]) <= 0).all())
+        self.assertAlmostEqual(delays[128], 0.001)
+        self.assertLess(planner.duration(256), 256 * 0.002)
+
+    def test_triangle(self):
+        delays = MotionPlanner(0.002, 0.0001, 1000).plan(20)
+        # Too short to reach cruise speed, fastest in the middle of the move
+        self.assertGreater(delays.min(), 0.0001)
+        self.assertEqual(int(np.argmin(delays)), 9)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            MotionPlanner(0.002, 0.001, 0)
+
+    def test_recorded_timings(self):
+        motor = StepperMotor(speed=0.0005, cruise_speed=0.00025, acceleration=20000)
+        motor.worker.join()
+        MockGPIO.start_recording()
+        motor.step_clockwise(16)
+        motor.worker.join()
+        recording = MockGPIO.stop_recording()
+
+        # The four coils are written together for each phase, in step order
+        self.assertEqual(len(recording), 64 * 4)
+        for index in range(64):
+            phase = recording[index * 4:index * 4 + 4]
+            self.assertEqual([pin for _, pin, _ in phase], list(motor.pins))
+            self.assertEqual([value for _, _, value in phase], CLOCKWISE[index % 4])
+            self.assertEqual(len({time for time, _, _ in phase}), 1)
+        self.assertEqual(motor.steps.value, 16)
+
+        # The planned move ramps up to cruise speed and back down
+        planned = motor.planner.plan(64)
+        self.assertAlmostEqual(planned[0], motor.phase_interval)
+        self.assertAlmostEqual(planned.min(), 0.001)
+        self.assertTrue((np.diff(planned[:32]) <= 0).all())
+        self.assertTrue((np.diff(planned[32:]) >= 0).all())
+
+        # Loosely, the recorded move takes as long as planned, deadlines are never early and a late
+        # phase is made up by the next, but a stall on a loaded machine can still push the move back
+        writes = [time for time, pin, _ in recording if pin == motor.in1]
+        self.assertGreaterEqual(writes[-1] - writes[0], planned[:-1].sum() - 0.002)
+        self.assertLess(writes[-1] - writes[0], planned[:-1].sum() + 0.05)
+
+    def test_cruise_speed_needs_acceleration(self):
+        with self.assertRaises(ValueError):
+            StepperMotor(speed=0.0005, cruise_speed=0.00025)
@@ -0,0 +1,123 @@
+import time
+import unittest
+
+import numpy as np
+
+from main.camera import LOGGER
+from main.camera.frame_source import SyntheticFrameSource
+from main.camera.perception_pipeline import PerceptionPipeline, Subscription, DropPolicy
+from main.camera.video_feed import VideoFrame
+from main.threading.worker_manager import WorkerManager
+from main.threading.worker_thread import Worker
+from test.helpers import wait_until
+
+def frames(count: int):
+    image = np.zeros((8, 8, 3), dtype=np.uint8)
+    return [VideoFrame(image, sequence) for sequence in range(1, count + 1)]
+
+class TestSubscription(unittest.TestCase):
+
+    def setUp(self):
+        Worker.set_manager(WorkerManager())
+
+    def queued(self, subscription: Subscription):
+        sequences = []
+        while not subscription.frames.empty():
+            sequences.append(subscription.frames.get_nowait().sequence)
+        return sequences
+
+    def test_max_rate(self):
+        subscription = Subscription("rate", lambda frame: None, max_rate=10, queue_size=10)
+        for frame in frames(5):
+            subscription.offer(frame)
+        self.assertEqual(subscription.rate_limited, 4)
+        time.sleep(0.11)
+        self.assertTrue(subscription.offer(frames(1)[0]))
+        self.assertEqual(self.queued(subscription), [1, 1])
+
+    def test_drop_oldest(self):
+        subscription = Subscription("oldest", lambda frame: None, queue_size=2)
+        for frame in frames(5):
+            self.assertTrue(subscription.offer(frame))
+        self.assertEqual(subscription.dropped, 3)
+        self.assertEqual(self.queued(subscription), [4, 5])
+
+    def test_drop_newest(self):
+        subscription = Subscription("newest", lambda frame: None, drop_policy=DropPolicy.DROP_NEWEST, queue_size=2)
+        offered = [subscription.offer(frame) for frame in frames(5)]
+        self.assertEqual(offered, [True, True, False, False, False])
+        self.assertEqual(subscription.dropped, 3)
+        self.assertEqual(self.queued(subscription), [1, 2])
+
+    def test_callback_exception(self):
+        received = []
+
+        def callback(frame):
+            if frame.sequence == 1:
+                raise ValueError("bad frame")
+            received.append(frame.sequence)
+
+        subscription = Subscription("failing", callback)
+        subscription.start()
+        try:
+            with self.assertLogs(LOGGER, "ERROR"):
+                subscription.offer(frames(1)[0])
+                self.assertTrue(wait_until(subscription.frames.empty))
+                # The worker survives the failure and delivers the next frame
+                subscription.offer(frames(2)[1])
+                self.assertTrue(wait_until(lambda: received == [2]))
+            self.assertTrue(subscription.worker.is_alive())
+            self.assertEqual(subscription.delivered, 1)
+        finally:
+            subscription.stop()
+            subscription.worker.join()
+
+class TestPerceptionPipeline(unittest.TestCase):
+
+    def setUp(self):
+        Worker.set_manager(WorkerManager())
+        self.pipeline = PerceptionPipeline()
+        self.pipeline.video_feed.set_source(SyntheticFrameSource(width=64, height=32, fps=100))
+
+    def tearDown(self):
+        for subscription in self.pipeline.subscriptions:
+            self.pipeline.unsubscribe(subscription.name)
+        worker = self.pipeline.video_feed._capture_worker
+        self.pipeline.video_feed.stop_background_capture()
+        if worker is not None:
+            worker.join()
+        self.pipeline.video_feed.set_source(None)
+
+    def test_fan_out(self):
+        first = []
+        second = []
+        self.pipeline.subscribe("first", first.append)
+        self.pipeline.subscribe("second", second.append)
+
+        def shared():
+            sequences = {frame.sequence for frame in list(second)}
+            return [frame for frame in list(first) if frame.sequence in sequences]
+
+        self.assertTrue(wait_until(shared))
+        self.assertEqual(len(self.pipeline.subscriptions), 2)
+        # Each frame is captured once, both subscribers receive the same object
+        frame = shared()[0]
+        self.assertIs(frame, next(other for other in second if other.sequence == frame.sequence))
+
+    def test_duplicate_name(self):
+        self.pipeline.subscribe("duplicate", lambda frame: None)
+        with self.assertRaises(ValueError):
+            self.pipeline.subscribe("duplicate", lambda frame: None)
+
+    def test_unsubscribe(self):
+        subscription = self.pipeline.subscribe("only", lambda frame: None)
+        worker = self.pipeline.worker
+        self.assertTrue(wait_until(lambda: subscription.delivered > 0))
+        self.pipeline.unsubscribe("only")
+        # The last subscription leaving stops the pipeline and the subscription's worker
+        self.assertIsNone(self.pipeline.worker)
+        worker.join(timeout=1)
+        subscription.worker.join(timeout=1)
+        self.assertFalse(worker.is_alive())
+        self.assertFalse(subscription.worker.is_alive())
+        self.assertEqual(self.pipeline.subscriptions, [])
@@ -0,0 +1,45 @@
+import unittest
+
+from main.display.render_cache import RenderCache
+
+class TestRenderCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = RenderCache()
+        self.cache.clear()
+
+    def test_hit(self):
+        first = self.cache.render("1", (255, 255, 255), 32, scale=1, thickness=1)
+        second = self.cache.render("1", (255, 255, 255), 32, scale=1, thickness=1)
+        self.assertIs(first, second)
+        self.assertEqual(first.shape, (32, 32, 3))
+        self.assertFalse(first.flags.writeable)
+        self.assertTrue(first.any())
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_key(self):
+        white = self.cache.render("1", (255, 255, 255), 32, scale=1, thickness=1)
+        red = self.cache.render("1", (0, 0, 255), 32, scale=1, thickness=1)
+        self.assertIsNot(white, red)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_eviction(self):
+        max_size = self.cache.max_size
+        self.cache.max_size = 2
+        try:
+            first = self.cache.render("1", (255, 255, 255), 32, scale=1, thickness=1)
+            self.cache.render("2", (255, 255, 255), 32, scale=1, thickness=1)
+            self.cache.render("1", (255, 255, 255), 32, scale=1, thickness=1)
+            self.cache.render("3", (255, 255, 255), 32, scale=1, thickness=1)
+            self.assertEqual(len(self.cache), 2)
+            # "2" was least recently used, so "1" is still cached
+            self.assertIs(self.cache.render("1", (255, 255, 255), 32, scale=1, thickness=1), first)
+        finally:
+            self.cache.max_size = max_size
+
+    def test_prewarm(self):
+        self.cache.prewarm([str(number) for number in range(10)], (255, 255, 255), 32, scale=1, thickness=1)
+        self.assertEqual(self.cache.misses, 10)
+        self.cache.render("5", (255, 255, 255), 32, scale=1, thickness=1)
+        self.assertEqual(self.cache.hits, 1)
@@ -0,0 +1,30 @@
+import unittest
+
+import numpy as np
+
+from main.display.rgb565 import RGB565, RGB565Encoder, encode_rgb565
+from main.util.mock_st77789 import ST7789
+
+class TestRGB565(unittest.TestCase):
+
+    def test_matches_driver(self):
+        image = np.random.default_rng(0).integers(0, 256, (24, 32, 3), dtype=np.uint8)
+        driver = ST7789(240, 0, 0, 0, 9, 18, 1, 0, 0)
+        self.assertEqual(encode_rgb565(image).tobytes(), driver.image_to_data(image, 0))
+
+    def test_values(self):
+        image = np.array([[[255, 0, 0], [0, 255, 0], [0, 0, 255], [255, 255, 255]]], dtype=np.uint8)
+        encoded = encode_rgb565(image)
+        self.assertEqual(encoded.dtype, RGB565)
+        self.assertEqual(encoded.tolist(), [[0xF800, 0x07E0, 0x001F, 0xFFFF]])
+        self.assertEqual(encoded.tobytes()[:2], b"\xf8\x00")
+
+    def test_preallocated(self):
+        encoder = RGB565Encoder()
+        out = np.empty((4, 4), dtype=RGB565)
+        first = np.full((4, 4, 3), 255, dtype=np.uint8)
+        self.assertIs(encoder.encode(first, out), out)
+        self.assertTrue((out == 0xFFFF).all())
+        # Non-contiguous views, such as rotated frames, are encoded correctly
+        second = np.rot90(np.arange(48, dtype=np.uint8).reshape(4, 4, 3))
+        self.assertTrue(np.array_equal(encoder.encode(second, out), encode_rgb565(np.ascontiguousarray(second))))
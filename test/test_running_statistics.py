@@ -0,0 +1,43 @@
+import threading
+import unittest
+
+from main.util.running_statistics import RunningStatistics
+
+class TestRunningStatistics(unittest.TestCase):
+
+    def test_empty(self):
+        statistics = RunningStatistics("test")
+        self.assertEqual(statistics.count, 0)
+        self.assertIsNone(statistics.mean)
+        self.assertIsNone(statistics.standard_deviation)
+        self.assertIsNone(statistics.minimum)
+        self.assertIsNone(statistics.maximum)
+
+    def test_values(self):
+        statistics = RunningStatistics("test")
+        for value in [2, 4, 4, 4, 5, 5, 7, 9]:
+            statistics.add(value)
+        self.assertEqual(statistics.count, 8)
+        self.assertAlmostEqual(statistics.mean, 5)
+        self.assertAlmostEqual(statistics.standard_deviation, 2)
+        self.assertEqual(statistics.minimum, 2)
+        self.assertEqual(statistics.maximum, 9)
+        self.assertEqual(statistics.last, 9)
+        statistics.reset()
+        self.assertEqual(statistics.count, 0)
+
+    def test_threading(self):
+        statistics = RunningStatistics("test")
+
+        def add_values():
+            for _ in range(1000):
+                statistics.add(1)
+
+        threads = [threading.Thread(target=add_values) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(statistics.count, 10000)
+        self.assertAlmostEqual(statistics.mean, 1)
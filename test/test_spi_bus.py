@@ -0,0 +1,44 @@
+import threading
+import time
+import unittest
+
+from main.display.spi_bus import SPIBus
+
+class TestSPIBus(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = SPIBus(7)
+        self.bus.reset_statistics()
+
+    def test_instance_per_port(self):
+        self.assertIs(self.bus, SPIBus(7))
+        self.assertIsNot(self.bus, SPIBus(8))
+
+    def test_serialised(self):
+        active = []
+        overlapped = []
+
+        def transfer():
+            for _ in range(20):
+                with self.bus.transfer():
+                    active.append(1)
+                    if len(active) > 1:
+                        overlapped.append(1)
+                    time.sleep(0.0005)
+                    active.pop()
+
+        threads = [threading.Thread(target=transfer) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertFalse(overlapped)
+        self.assertEqual(self.bus.transfers, 60)
+        self.assertGreater(self.bus.utilisation, 0)
+
+    def test_reentrant(self):
+        with self.bus.transfer():
+            with self.bus.transfer():
+                pass
+        self.assertEqual(self.bus.transfers, 1)
+        self.assertEqual(self.bus.hold_time.count, 1)
@@ -0,0 +1,75 @@
+import time
+import unittest
+
+from main.motor.step_timing import StepTimer, sleep_until
+
+class FakeClock:
+    """
+    A clock that only moves when waited on, overshooting every deadline by a fixed amount.
+    """
+
+    def __init__(self, overshoot: float = 0.0):
+        self.now = 0.0
+        self.overshoot = overshoot
+
+    def __call__(self):
+        return self.now
+
+    def wait_until(self, deadline: float):
+        self.now = max(self.now, deadline) + self.overshoot
+
+class TestStepTiming(unittest.TestCase):
+
+    def test_sleep_until(self):
+        deadline = time.perf_counter() + 0.005
+        sleep_until(deadline)
+        self.assertGreaterEqual(time.perf_counter(), deadline)
+        # Only loosely bounded, the thread may not be scheduled for a while on a loaded machine
+        self.assertLess(time.perf_counter() - deadline, 0.5)
+
+    def test_real_clock(self):
+        timer = StepTimer("test")
+        start = time.perf_counter()
+        timer.start()
+        for _ in range(50):
+            timer.wait(0.002)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.1)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(timer.intervals.count, 49)
+
+    def test_deadlines(self):
+        clock = FakeClock(overshoot=0.0005)
+        timer = StepTimer("test", clock, clock.wait_until)
+        timer.start()
+        for _ in range(50):
+            timer.wait(0.002)
+        # Deadlines are absolute, so the overshoot does not accumulate
+        self.assertAlmostEqual(clock.now, 0.1005)
+        self.assertEqual(timer.intervals.count, 49)
+        self.assertAlmostEqual(timer.intervals.mean, 0.002)
+        self.assertAlmostEqual(timer.jitter.mean, 0.0)
+
+    def test_restarts_when_behind(self):
+        clock = FakeClock()
+        timer = StepTimer("test", clock, clock.wait_until)
+        timer.start()
+        timer.wait(0.002)
+        clock.now += 0.02
+        timer.wait(0.002)
+        # The missed deadlines are not rushed through, the schedule restarts from now
+        self.assertAlmostEqual(clock.now, 0.022)
+        timer.wait(0.002)
+        self.assertAlmostEqual(clock.now, 0.024)
+        self.assertAlmostEqual(timer.intervals.last, 0.002)
+
+    def test_catches_up_when_slightly_behind(self):
+        clock = FakeClock()
+        timer = StepTimer("test", clock, clock.wait_until)
+        timer.start()
+        timer.wait(0.002)
+        clock.now += 0.003
+        timer.wait(0.002)
+        self.assertAlmostEqual(clock.now, 0.005)
+        # Less than one interval behind, so the next deadline is kept
+        timer.wait(0.002)
+        self.assertAlmostEqual(clock.now, 0.006)
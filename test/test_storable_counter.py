@@ -0,0 +1,51 @@
+import threading
+import unittest
+
+from main.util.storable_type import StorableCounter
+from test.helpers import temporary_store
+
+class TestStorableCounter(unittest.TestCase):
+
+    def setUp(self):
+        # Count in a store of our own
+        self.store = temporary_store(self)
+        self.counter = StorableCounter("test_counter", 0, persist_every=10)
+
+    def tearDown(self):
+        # Write any remaining count now, so the exit flush has nothing left to write
+        self.counter.flush()
+
+    def test_counting(self):
+        self.assertEqual(self.counter.increment(), 1)
+        self.assertEqual(self.counter.increment(5), 6)
+        self.assertEqual(self.counter.decrement(2), 4)
+        self.assertEqual(self.counter, 4)
+        self.assertEqual(self.counter + 1, 5)
+
+    def test_batched_persistence(self):
+        for _ in range(9):
+            self.counter.increment()
+        self.assertEqual(self.store["test_counter"], 0)
+        self.counter.increment()
+        self.assertEqual(self.store["test_counter"], 10)
+        self.counter.increment()
+        self.assertTrue(self.counter.flush())
+        self.assertFalse(self.counter.flush())
+        self.assertEqual(self.store["test_counter"], 11)
+        self.assertEqual(StorableCounter("test_counter", 0).value, 11)
+
+    def test_concurrent_increments(self):
+        def count():
+            for _ in range(2000):
+                self.counter.increment()
+                self.counter.decrement()
+                self.counter.increment()
+
+        threads = [threading.Thread(target=count) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.counter.value, 8000)
+        self.counter.flush()
+        self.assertEqual(self.store["test_counter"], 8000)
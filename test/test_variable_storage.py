@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from os import path
+
+from main.util.variable_storage import DELETED, JSONStorage, JournalStorage, StorageEngine
+
+class TestVariableStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.snapshot_path = path.join(self.directory.name, "store.json")
+        self.journal_path = path.join(self.directory.name, "store.journal")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def journal(self, **kwargs):
+        return JournalStorage(self.snapshot_path, self.journal_path, sync=False, **kwargs)
+
+    def test_base_engine(self):
+        engine = StorageEngine()
+        engine.write({"key": 1}, {"key": 1})
+        self.assertEqual(engine.load(), {})
+        engine.close()
+
+    def test_json(self):
+        storage = JSONStorage(self.snapshot_path)
+        self.assertEqual(storage.load(), {})
+        storage.write({"a": 1}, {"a": 1})
+        self.assertEqual(JSONStorage(self.snapshot_path).load(), {"a": 1})
+
+    def test_journal_replay(self):
+        storage = self.journal()
+        self.assertEqual(storage.load(), {})
+        storage.write({"a": 1, "b": 2}, {"a": 1, "b": 2})
+        storage.write({"a": 3}, {"a": 3, "b": DELETED})
+        storage.close()
+        recovered = self.journal()
+        self.assertEqual(recovered.load(), {"a": 3})
+        self.assertEqual(recovered.entries, 4)
+
+    def test_truncated_entry(self):
+        storage = self.journal()
+        storage.load()
+        storage.write({"a": 1}, {"a": 1})
+        storage.close()
+        with open(self.journal_path, "a", encoding="utf-8") as file:
+            file.write('{"key": "a", "val')
+        recovered = self.journal()
+        self.assertEqual(recovered.load(), {"a": 1})
+        # The partial entry is trimmed so later entries are not appended to it
+        recovered.write({"a": 2}, {"a": 2})
+        recovered.close()
+        self.assertEqual(self.journal().load(), {"a": 2})
+
+    def test_compaction(self):
+        storage = self.journal(compact_threshold=10)
+        storage.load()
+        data = {}
+        for value in range(25):
+            data["a"] = value
+            storage.write(dict(data), {"a": value})
+        self.assertEqual(storage.entries, 5)
+        storage.close()
+        self.assertFalse(path.exists(self.snapshot_path + ".tmp"))
+        self.assertEqual(JSONStorage(self.snapshot_path).load(), {"a": 19})
+        self.assertEqual(self.journal().load(), {"a": 24})
+        self.assertLess(os.path.getsize(self.journal_path), 200)
@@ -0,0 +1,95 @@
+import json
+import time
+import unittest
+from os import path
+
+from main.threading.worker_manager import WorkerManager
+from main.threading.worker_thread import Worker
+from main.util import LOGGER
+from main.util.variable_storage import JSONStorage, StorageEngine
+from main.util.variable_store import VariableStoreFlusher
+from test.helpers import temporary_directory, temporary_store
+
+class FailingStorage(StorageEngine):
+
+    def __init__(self):
+        self.failing = True
+        self.writes = []
+
+    def write(self, data: dict, changes: dict):
+        if self.failing:
+            raise OSError("disk full")
+        self.writes.append(changes)
+
+class TestVariableStore(unittest.TestCase):
+
+    def setUp(self):
+        Worker.set_manager(WorkerManager())
+        self.store_path = path.join(temporary_directory(self), "variable_store.json")
+        self.store = temporary_store(self, JSONStorage(self.store_path))
+
+    def tearDown(self):
+        self.store.disable_write_behind()
+
+    def stored(self):
+        with open(self.store_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def test_write_through(self):
+        self.store["write_through"] = 1
+        self.assertEqual(self.stored()["write_through"], 1)
+        self.assertEqual(self.store.dirty, 0)
+
+    def test_write_behind(self):
+        self.store["write_behind"] = 0
+        self.store.enable_write_behind(interval=60)
+        self.assertTrue(self.store.write_behind)
+        for value in range(1, 101):
+            self.store["write_behind"] = value
+        self.assertEqual(self.store["write_behind"], 100)
+        self.assertEqual(self.stored()["write_behind"], 0)
+        self.assertEqual(self.store.dirty, 1)
+        self.assertTrue(self.store.flush())
+        self.assertFalse(self.store.flush())
+        self.assertEqual(self.stored()["write_behind"], 100)
+
+    def test_flusher(self):
+        self.store.enable_write_behind(interval=0.05)
+        self.store["flusher"] = 1
+        time.sleep(0.2)
+        self.assertEqual(self.stored()["flusher"], 1)
+        # Stopping the flusher writes the remaining changes
+        self.store["flusher"] = 2
+        self.store.disable_write_behind()
+        self.assertFalse(self.store.write_behind)
+        self.assertEqual(self.stored()["flusher"], 2)
+
+    def test_failed_write(self):
+        engine = FailingStorage()
+        self.store = temporary_store(self, engine)
+        self.store.enable_write_behind(interval=60)
+        self.store["first"] = 1
+        self.store["second"] = 2
+        with self.assertRaises(OSError):
+            self.store.flush()
+        # The changes are kept for the next flush
+        self.assertEqual(self.store.dirty, 2)
+        self.store["third"] = 3
+        engine.failing = False
+        self.assertTrue(self.store.flush())
+        self.assertEqual(engine.writes, [{"first": 1, "second": 2, "third": 3}])
+        self.assertEqual(self.store.dirty, 0)
+
+    def test_failed_write_on_stop(self):
+        engine = FailingStorage()
+        self.store = temporary_store(self, engine)
+        self.store.enable_write_behind(interval=60)
+        self.store["key"] = 1
+        flusher = VariableStoreFlusher(self.store, 60)
+        flusher.start()
+        # Stopping logs the failure instead of raising, so the workers stopped after it still stop
+        with self.assertLogs(LOGGER, "ERROR"):
+            flusher.stop()
+            flusher.join()
+        self.assertEqual(self.store.dirty, 1)
+        engine.failing = False
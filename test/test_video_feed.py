@@ -0,0 +1,154 @@
+import time
+import unittest
+
+import numpy as np
+
+from main.camera.frame_source import SyntheticFrameSource
+from main.camera.video_feed import VideoFeed, VideoFrame, RING_BUFFER_SIZE
+from main.threading.worker_manager import WorkerManager
+from main.threading.worker_thread import Worker
+
+class TestVideoFrame(unittest.TestCase):
+
+    def setUp(self):
+        _, image = SyntheticFrameSource(width=64, height=32, realtime=False).read()
+        self.frame = VideoFrame(image, 1)
+
+    def test_views(self):
+        rgb = self.frame.rgb
+        self.assertIs(self.frame.rgb, rgb)
+        self.assertTrue(np.array_equal(rgb, self.frame.image[..., ::-1]))
+        self.assertEqual(self.frame.gray.shape, (32, 64))
+        self.assertEqual(self.frame.half.shape, (16, 32, 3))
+        self.assertEqual(self.frame.quarter.shape, (8, 16, 3))
+        # Views are shared by every consumer, so they cannot be changed
+        for view in (rgb, self.frame.gray, self.frame.half, self.frame.quarter):
+            self.assertFalse(view.flags.writeable)
+        with self.assertRaises(ValueError):
+            rgb[0, 0] = 0
+
+    def test_drop_cache(self):
+        self.assertEqual(self.frame.cached_bytes, 0)
+        rgb = self.frame.rgb
+        gray = self.frame.gray
+        self.assertEqual(self.frame.cached_bytes, rgb.nbytes + gray.nbytes)
+        self.frame.drop_cache()
+        self.assertEqual(self.frame.cached_bytes, 0)
+        # Views are computed again after the cache is dropped
+        self.assertIsNot(self.frame.rgb, rgb)
+        self.assertTrue(np.array_equal(self.frame.rgb, rgb))
+
+class TestVideoFeed(unittest.TestCase):
+
+    def setUp(self):
+        Worker.set_manager(WorkerManager())
+        self.feed = VideoFeed()
+        self.idle_timeout = self.feed.idle_timeout
+
+    def tearDown(self):
+        worker = self.feed._capture_worker
+        self.feed.stop_background_capture()
+        if worker is not None:
+            worker.join()
+        self.feed.idle_timeout = self.idle_timeout
+        self.feed.set_source(None)
+
+    def use_source(self, **kwargs):
+        source = SyntheticFrameSource(width=64, height=32, **kwargs)
+        self.feed.set_source(source)
+        return source
+
+    def test_foreground_capture(self):
+        self.use_source(realtime=False)
+        first = self.feed.capture()
+        second = self.feed.capture()
+        self.assertFalse(self.feed.is_capturing_in_background())
+        self.assertEqual(first.image.shape, (32, 64, 3))
+        self.assertEqual(second.sequence, first.sequence + 1)
+
+    def test_background_capture(self):
+        self.use_source(fps=200)
+        self.feed.start_background_capture()
+        self.assertTrue(self.feed.is_capturing_in_background())
+        first = self.feed.wait_for_next(0, timeout=2)
+        self.assertIsNotNone(first)
+        # The worker keeps reading into the ring buffer, only the newest frames are kept
+        latest = self.feed.wait_for_next(first.sequence + RING_BUFFER_SIZE, timeout=2)
+        self.assertIsNotNone(latest)
+        with self.feed._frames_condition:
+            frames = list(self.feed._frames)
+        self.assertEqual(len(frames), RING_BUFFER_SIZE)
+        self.assertEqual([frame.sequence for frame in frames], sorted(frame.sequence for frame in frames))
+        self.assertGreaterEqual(self.feed.capture().sequence, latest.sequence)
+
+    def test_wait_for_next(self):
+        self.use_source(fps=200, count=5)
+        self.feed.start_background_capture()
+        frame = self.feed.wait_for_next(0, timeout=2)
+        self.assertIsNotNone(frame)
+        # Only a frame newer than the given sequence is returned, until the five frames run out
+        newer = self.feed.wait_for_next(frame.sequence, timeout=0.5)
+        while newer is not None:
+            self.assertGreater(newer.sequence, frame.sequence)
+            self.assertGreaterEqual(newer.timestamp, frame.timestamp)
+            frame = newer
+            newer = self.feed.wait_for_next(frame.sequence, timeout=0.5)
+        self.assertIs(self.feed.capture(), frame)
+        start = time.monotonic()
+        self.assertIsNone(self.feed.wait_for_next(frame.sequence, timeout=0.1))
+        self.assertGreaterEqual(time.monotonic() - start, 0.1)
+
+    def test_stale_on_read_failure(self):
+        self.use_source(realtime=False, count=1)
+        frame = self.feed.capture()
+        self.assertFalse(frame.stale)
+        self.assertLess(frame.age, 1)
+        rgb = frame.rgb
+        # The source runs out, so the last frame is repeated marked as stale
+        stale = self.feed.capture()
+        self.assertTrue(stale.stale)
+        self.assertEqual(stale.sequence, frame.sequence)
+        self.assertEqual(stale.timestamp, frame.timestamp)
+        self.assertIs(stale.image, frame.image)
+        self.assertIs(stale.rgb, rgb)
+
+    def test_ring_buffer_drops_views(self):
+        self.use_source(fps=200)
+        self.feed.start_background_capture()
+        frame = self.feed.wait_for_next(0, timeout=2)
+        frame.rgb
+        self.assertGreater(self.feed.cached_bytes, 0)
+        # Once the frame ages out of the ring buffer its views are released
+        self.assertIsNotNone(self.feed.wait_for_next(frame.sequence + RING_BUFFER_SIZE, timeout=2))
+        self.assertEqual(frame.cached_bytes, 0)
+
+    def test_lazy_open(self):
+        self.use_source(realtime=False)
+        self.assertFalse(self.feed.is_open())
+        self.assertIsNotNone(self.feed.capture())
+        self.assertTrue(self.feed.is_open())
+        self.feed.close()
+        self.assertFalse(self.feed.is_open())
+
+    def test_idle_release(self):
+        self.use_source(fps=200)
+        self.feed.idle_timeout = 0.1
+        self.feed.start_background_capture()
+        frame = self.feed.wait_for_next(0, timeout=2)
+        self.assertTrue(self.feed.is_open())
+
+        # Nothing is requested, so the worker releases the source and empties the ring buffer
+        deadline = time.monotonic() + 2
+        while self.feed.is_open() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(self.feed.is_open())
+        self.assertTrue(self.feed.is_idle())
+        self.assertEqual(self.feed.cached_bytes, 0)
+
+        # The next request reopens it
+        self.feed.idle_timeout = 10
+        reopened = self.feed.capture()
+        self.assertIsNotNone(reopened)
+        self.assertGreater(reopened.sequence, frame.sequence)
+        self.assertTrue(self.feed.is_open())
+        self.assertFalse(self.feed.is_idle())